@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# File: audit_indexes.py
+"""
+MongoDB index audit script.
+Run this from the project root directory to check that every registered
+query shape (services/indexes.py) is served by an index. Each shape is
+explained against the configured database; collection scans and in-memory
+sorts are flagged and the script exits with status 1 if any are found.
+Connecting creates any declared index that is missing, as at app startup.
+
+Usage:
+    python audit_indexes.py [--json]
+"""
+import asyncio
+import argparse
+import json
+import sys
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+import config
+from dependencies.database import db_service
+from services.indexes import audit_query_shapes
+
+async def run_audit(args) -> int:
+    """Explain the registered query shapes and print the findings."""
+    await db_service.connect()
+    try:
+        results = await audit_query_shapes(db_service.db)
+    finally:
+        await db_service.close()
+
+    flagged = [result for result in results if result["problems"]]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 1 if flagged else 0
+
+    print(f"🔍 Explained {len(results)} query shapes on {config.DB_NAME}")
+    for result in results:
+        mark = "❌" if result["problems"] else "✅"
+        plan = " > ".join(result["stages"]) or "-"
+        print(f"{mark} {result['collection']}: {result['name']} [{plan}] index={result['index'] or '-'}")
+        if result["problems"]:
+            print(f"     {', '.join(result['problems'])} (used by {result['source']})")
+
+    if flagged:
+        print(f"⚠️  {len(flagged)} query shapes are not fully served by an index")
+        return 1
+    print("✅ Every query shape uses an index")
+    return 0
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Flag collection scans and in-memory sorts in the hot queries")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run_audit(parse_arguments())))
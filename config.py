@@ -13,6 +13,19 @@ load_dotenv()
 # Database settings
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "kryptopedia")
+# Connection pool shared by the whole application
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS")) if os.getenv("MONGO_MAX_IDLE_TIME_MS") else None
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "20000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS")) if os.getenv("MONGO_SOCKET_TIMEOUT_MS") else None
+# Wire compression in order of preference; zstd and snappy are skipped if their module is missing
+MONGO_COMPRESSORS = [c for c in os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib").split(",") if c.strip()]
+# e.g. "primary", "primaryPreferred", "secondaryPreferred", "nearest"
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+# Per-collection command counts and latencies (GET /api/admin/database/stats and /api/admin/database/metrics)
+MONGO_MONITOR_COMMANDS = os.getenv("MONGO_MONITOR_COMMANDS", "True").lower() == "true"
 
 # JWT settings
 JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-this-in-production")
@@ -54,6 +67,47 @@ USE_REDIS = os.getenv("USE_REDIS", "False").lower() == "true"
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost") if USE_REDIS else None
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379")) if USE_REDIS else None
 
+# In-memory cache limits (used when Redis is disabled)
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Per-worker L1 cache in front of Redis (used when Redis is enabled)
+CACHE_L1_ENABLED = os.getenv("CACHE_L1_ENABLED", "True").lower() == "true"
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "2000"))
+CACHE_L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", str(16 * 1024 * 1024)))
+CACHE_L1_TTL = int(os.getenv("CACHE_L1_TTL", "30"))  # seconds
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+# Compression of large cached values: "zlib", "zstd" (needs zstandard) or "none"
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib").lower()
+CACHE_COMPRESSION_THRESHOLD = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", "1024"))  # bytes
+CACHE_COMPRESSION_LEVEL = int(os.getenv("CACHE_COMPRESSION_LEVEL")) if os.getenv("CACHE_COMPRESSION_LEVEL") else None
+# Also compress the in-memory cache (used when Redis is disabled)
+CACHE_MEMORY_COMPRESSION = os.getenv("CACHE_MEMORY_COMPRESSION", "False").lower() == "true"
+# Per-prefix hit/miss/latency metrics (GET /api/admin/cache/stats and /api/admin/cache/metrics)
+CACHE_METRICS_ENABLED = os.getenv("CACHE_METRICS_ENABLED", "True").lower() == "true"
+# Full-page HTML cache for anonymous readers
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "True").lower() == "true"
+# Part of every page key; change it when templates change to retire cached pages
+PAGE_CACHE_VERSION = os.getenv("PAGE_CACHE_VERSION", "1")
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(1024 * 1024)))
+# Cache warm-up at startup (also: python warm_cache.py)
+CACHE_WARMUP_ENABLED = os.getenv("CACHE_WARMUP_ENABLED", "True").lower() == "true"
+CACHE_WARMUP_ARTICLES = int(os.getenv("CACHE_WARMUP_ARTICLES", "100"))  # most-viewed articles
+CACHE_WARMUP_CONCURRENCY = int(os.getenv("CACHE_WARMUP_CONCURRENCY", "8"))
+CACHE_WARMUP_BUDGET = float(os.getenv("CACHE_WARMUP_BUDGET", "20"))  # seconds before serving anyway
+# Prepended to every Redis key so clearing the cache only touches this app's keys
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "kryptopedia:")
+
+# Wiki markup rendering settings
+RENDER_POOL_WORKERS = int(os.getenv("RENDER_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+RENDER_INLINE_THRESHOLD = int(os.getenv("RENDER_INLINE_THRESHOLD", "20000"))  # characters
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "10"))  # seconds
+RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", "32"))
+RENDER_CACHE_ENTRIES = int(os.getenv("RENDER_CACHE_ENTRIES", "512"))
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RENDER_CACHE_TTL = int(os.getenv("RENDER_CACHE_TTL", "3600"))  # seconds, copies in the cache backend only
+PAGE_INDEX_REFRESH_INTERVAL = int(os.getenv("PAGE_INDEX_REFRESH_INTERVAL", "300"))  # seconds, red-link page index
+
 # Template directory and settings
 TEMPLATES_DIR = os.getenv("TEMPLATES_DIR", "templates")
 TEMPLATES_AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", "True").lower() == "true"
@@ -71,6 +125,15 @@ def get_settings():
     return {
         "mongo_uri": MONGO_URI,
         "db_name": DB_NAME,
+        "mongo_max_pool_size": MONGO_MAX_POOL_SIZE,
+        "mongo_min_pool_size": MONGO_MIN_POOL_SIZE,
+        "mongo_max_idle_time_ms": MONGO_MAX_IDLE_TIME_MS,
+        "mongo_connect_timeout_ms": MONGO_CONNECT_TIMEOUT_MS,
+        "mongo_server_selection_timeout_ms": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "mongo_socket_timeout_ms": MONGO_SOCKET_TIMEOUT_MS,
+        "mongo_compressors": MONGO_COMPRESSORS,
+        "mongo_read_preference": MONGO_READ_PREFERENCE,
+        "mongo_monitor_commands": MONGO_MONITOR_COMMANDS,
         "jwt_secret": JWT_SECRET,
         "jwt_algorithm": JWT_ALGORITHM,
         "jwt_expiration_hours": JWT_EXPIRATION_HOURS,
@@ -86,6 +149,27 @@ def get_settings():
         "use_redis": USE_REDIS,
         "redis_host": REDIS_HOST,
         "redis_port": REDIS_PORT,
+        "cache_max_entries": CACHE_MAX_ENTRIES,
+        "cache_max_bytes": CACHE_MAX_BYTES,
+        "cache_l1_enabled": CACHE_L1_ENABLED,
+        "cache_l1_max_entries": CACHE_L1_MAX_ENTRIES,
+        "cache_l1_max_bytes": CACHE_L1_MAX_BYTES,
+        "cache_l1_ttl": CACHE_L1_TTL,
+        "cache_invalidation_channel": CACHE_INVALIDATION_CHANNEL,
+        "cache_key_prefix": CACHE_KEY_PREFIX,
+        "cache_compression": CACHE_COMPRESSION,
+        "cache_compression_threshold": CACHE_COMPRESSION_THRESHOLD,
+        "cache_memory_compression": CACHE_MEMORY_COMPRESSION,
+        "cache_metrics_enabled": CACHE_METRICS_ENABLED,
+        "page_cache_enabled": PAGE_CACHE_ENABLED,
+        "page_cache_version": PAGE_CACHE_VERSION,
+        "cache_warmup_enabled": CACHE_WARMUP_ENABLED,
+        "cache_warmup_budget": CACHE_WARMUP_BUDGET,
+        "render_pool_workers": RENDER_POOL_WORKERS,
+        "render_inline_threshold": RENDER_INLINE_THRESHOLD,
+        "render_timeout": RENDER_TIMEOUT,
+        "render_cache_entries": RENDER_CACHE_ENTRIES,
+        "page_index_refresh_interval": PAGE_INDEX_REFRESH_INTERVAL,
         "templates_dir": TEMPLATES_DIR,
         "api_prefix": API_PREFIX,
         "api_debug": API_DEBUG,
@@ -7,6 +7,7 @@ from .auth import get_current_user, get_current_admin, get_current_editor, oauth
 from .storage import get_storage
 from .cache import get_cache
 from .search import get_search
+from .loaders import get_loaders
 
 __all__ = [
     'get_db',
@@ -17,5 +18,6 @@ __all__ = [
     'get_user_or_anonymous',
     'get_storage',
     'get_cache',
-    'get_search'
+    'get_search',
+    'get_loaders'
 ]
@@ -8,7 +8,20 @@ from services.cache import get_cache_service, CacheInterface
 cache_service = get_cache_service(
     use_redis=config.USE_REDIS,
     redis_host=config.REDIS_HOST,
-    redis_port=config.REDIS_PORT
+    redis_port=config.REDIS_PORT,
+    max_entries=config.CACHE_MAX_ENTRIES,
+    max_bytes=config.CACHE_MAX_BYTES,
+    local_cache=config.CACHE_L1_ENABLED,
+    local_max_entries=config.CACHE_L1_MAX_ENTRIES,
+    local_max_bytes=config.CACHE_L1_MAX_BYTES,
+    local_ttl=config.CACHE_L1_TTL,
+    invalidation_channel=config.CACHE_INVALIDATION_CHANNEL,
+    key_prefix=config.CACHE_KEY_PREFIX,
+    compression=config.CACHE_COMPRESSION,
+    compression_threshold=config.CACHE_COMPRESSION_THRESHOLD,
+    compression_level=config.CACHE_COMPRESSION_LEVEL,
+    memory_compression=config.CACHE_MEMORY_COMPRESSION,
+    metrics=config.CACHE_METRICS_ENABLED
 )
 
 async def get_cache() -> CacheInterface:
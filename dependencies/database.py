@@ -6,8 +6,21 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 import config
 from services.database import Database
 
-# Initialize database service
-db_service = Database(mongo_uri=config.MONGO_URI, db_name=config.DB_NAME)
+# The application's one database service and connection pool; main.py
+# connects it at startup and closes it at shutdown
+db_service = Database(
+    mongo_uri=config.MONGO_URI,
+    db_name=config.DB_NAME,
+    max_pool_size=config.MONGO_MAX_POOL_SIZE,
+    min_pool_size=config.MONGO_MIN_POOL_SIZE,
+    max_idle_time_ms=config.MONGO_MAX_IDLE_TIME_MS,
+    connect_timeout_ms=config.MONGO_CONNECT_TIMEOUT_MS,
+    server_selection_timeout_ms=config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    socket_timeout_ms=config.MONGO_SOCKET_TIMEOUT_MS,
+    compressors=config.MONGO_COMPRESSORS,
+    read_preference=config.MONGO_READ_PREFERENCE,
+    monitor_commands=config.MONGO_MONITOR_COMMANDS
+)
 
 async def get_db() -> AsyncIOMotorDatabase:
     """
@@ -17,7 +30,8 @@ async def get_db() -> AsyncIOMotorDatabase:
     Returns:
         AsyncIOMotorDatabase: The MongoDB database object
     """
-    # Ensure database is connected
+    # Connected at startup; this only runs outside the app (scripts, tests),
+    # and connect() makes sure concurrent callers share one client
     if db_service.db is None:
         await db_service.connect()
     
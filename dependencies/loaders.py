@@ -0,0 +1,21 @@
+# File: dependencies/loaders.py
+"""
+Batch loader dependencies for FastAPI.
+"""
+from fastapi import Depends
+from dependencies.database import get_db
+from services.loaders import Loaders
+
+async def get_loaders(db=Depends(get_db)) -> Loaders:
+    """
+    Dependency to get the batch loaders of the current request.
+    FastAPI resolves it once per request, so everything handling a request
+    shares the same loaders and the documents they have fetched.
+    
+    Args:
+        db: MongoDB database dependency
+        
+    Returns:
+        Loaders: User and article loaders
+    """
+    return Loaders(db)
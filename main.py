@@ -13,7 +13,12 @@ from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
 
 import config
-from services.database import Database
+from services.render import render_executor
+from services.links import page_index
+from services.warmup import warm_cache_within
+from dependencies.database import get_db, db_service
+from dependencies.cache import cache_service
+from services.cache import PageCacheMiddleware
 from utils.template_filters import strftime_filter, truncate_filter, strip_html_filter, format_number_filter, escapejs_filter, pluralize_filter
 
 # Configure logging
@@ -37,6 +42,16 @@ app = FastAPI(
     debug=config.API_DEBUG
 )
 
+# Serve cached pages to anonymous readers before routing
+# (added before CORS so CORS headers are applied per request, not cached)
+if config.PAGE_CACHE_ENABLED:
+    app.add_middleware(
+        PageCacheMiddleware,
+        cache=cache_service,
+        version=config.PAGE_CACHE_VERSION,
+        max_bytes=config.PAGE_CACHE_MAX_BYTES
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -63,9 +78,6 @@ if config.API_DEBUG:
             logger.exception(f"Error handling request: {e}")
             raise
 
-# Initialize database service
-db_service = Database(mongo_uri=config.MONGO_URI, db_name=config.DB_NAME)
-
 # Initialize templates - create the global instance that all routes will use
 templates = Jinja2Templates(directory=config.TEMPLATES_DIR)
 
@@ -129,6 +141,27 @@ async def startup_event():
     # Connect to database
     await db_service.connect()
     
+    # Track which pages exist, for red links
+    page_index.start(await get_db())
+    
+    # Subscribe to cache invalidations from other workers
+    await cache_service.start()
+    
+    # Warm the cache before accepting traffic, waiting at most the budget
+    if config.CACHE_WARMUP_ENABLED:
+        try:
+            warmup = await warm_cache_within(
+                config.CACHE_WARMUP_BUDGET,
+                await get_db(),
+                cache_service,
+                article_limit=config.CACHE_WARMUP_ARTICLES,
+                concurrency=config.CACHE_WARMUP_CONCURRENCY
+            )
+            if warmup is not None:
+                logger.info(f"Cache warmed: {warmup}")
+        except Exception as e:
+            logger.error(f"Cache warm-up failed: {e}")
+    
     # Create required directories
     os.makedirs("static", exist_ok=True)
     os.makedirs(config.TEMPLATES_DIR, exist_ok=True)
@@ -146,8 +179,17 @@ async def shutdown_event():
     """
     Clean up resources on application shutdown.
     """
+    # Stop the red-link page index before its connection closes
+    await page_index.stop()
+    
+    # Close the cache and its invalidation subscription
+    await cache_service.close()
+    
     # Close database connection
     await db_service.close()
+    
+    # Stop wiki markup render workers
+    render_executor.close()
 
 if __name__ == "__main__":
     import uvicorn
@@ -137,6 +137,8 @@ class Article(ArticleBase, DBModel):
     Complete article model with database fields.
     """
     slug: str
+    source: Optional[str] = None  # Wiki markup that content was rendered from
+    parser_version: Optional[int] = Field(default=None, alias="parserVersion")
     created_by: PyObjectId = Field(..., alias="createdBy")
     created_at: datetime = Field(default_factory=datetime.now, alias="createdAt")
     last_updated_at: Optional[datetime] = Field(default=None, alias="lastUpdatedAt")
@@ -5,14 +5,19 @@ Admin page routes for the Kryptopedia application.
 Handles rendering of admin dashboard, user management, and other admin functionality.
 """
 from fastapi import APIRouter, Request, Depends, Path, Query, HTTPException, Body
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse
 from typing import Dict, Any, List, Optional
+from functools import partial
 import logging
 from bson import ObjectId
 from datetime import datetime, timedelta
 
 from dependencies import get_db, get_current_admin, get_current_editor, get_cache
+from dependencies.database import db_service
 from models.user import UserUpdate
+from services.cache import CACHE_CATEGORIES, InstrumentedCache
+from services.render import render_executor, render_cache
+from services.links import page_index
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -188,6 +193,21 @@ async def get_recent_activity(db, limit=10):
         logger.error(f"Error getting recent activity: {e}")
         return []
 
+async def build_dashboard_data(db) -> Dict[str, Any]:
+    """
+    Compute the admin dashboard page data.
+    
+    Args:
+        db: Database connection
+        
+    Returns:
+        Dict[str, Any]: Dashboard statistics and recent activity
+    """
+    return {
+        "stats": await get_dashboard_stats(db),
+        "recent_activity": await get_recent_activity(db)
+    }
+
 @router.get("/admin", response_class=HTMLResponse)
 async def admin_dashboard_page(
     request: Request,
@@ -213,25 +233,12 @@ async def admin_dashboard_page(
             }
         )
     
-    # Try to get dashboard data from cache
-    cache_key = "admin_dashboard_data"
-    dashboard_data = await cache.get(cache_key)
-    
-    if not dashboard_data:
-        # Fetch dashboard statistics
-        stats = await get_dashboard_stats(db)
-        
-        # Fetch recent activity
-        recent_activity = await get_recent_activity(db)
-        
-        # Combine data
-        dashboard_data = {
-            "stats": stats,
-            "recent_activity": recent_activity
-        }
-        
-        # Cache for 5 minutes
-        await cache.set(cache_key, dashboard_data, 300)
+    # Get dashboard data from cache; concurrent requests at expiry share one computation
+    dashboard_data = await cache.get_or_compute(
+        "admin_dashboard_data",
+        partial(build_dashboard_data, db),
+        300  # Cache for 5 minutes
+    )
     
     # User is an admin, render the dashboard with data
     return templates.TemplateResponse(
@@ -594,13 +601,21 @@ async def delete_user(
 
 @router.post("/api/admin/system/clear-cache")
 async def clear_system_cache(
+    category: Optional[str] = Query(None, description="Only clear one category: " + ", ".join(CACHE_CATEGORIES)),
     current_user: Dict[str, Any] = Depends(get_current_admin),
     cache=Depends(get_cache)
 ):
     """
-    Clear the application cache (admin only).
+    Clear the application cache, or one category of it (admin only).
     """
+    if category is not None and category not in CACHE_CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Unknown cache category: {category}")
+    
     try:
+        if category is not None:
+            deleted = await cache.clear_prefix(CACHE_CATEGORIES[category])
+            return {"message": f"Cleared {deleted} {category} cache entries", "deleted": deleted}
+        
         # Clear cache
         result = await cache.clear()
         
@@ -608,6 +623,51 @@ async def clear_system_cache(
             return {"message": "Cache cleared successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to clear cache")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error clearing cache: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
+
+@router.get("/api/admin/cache/stats")
+async def get_cache_stats(current_user: Dict[str, Any] = Depends(get_current_admin), cache=Depends(get_cache)):
+    """
+    Get cache hit, eviction and compression statistics (admin only).
+    """
+    return cache.get_stats()
+
+@router.get("/api/admin/cache/metrics", response_class=PlainTextResponse)
+async def get_cache_metrics(current_user: Dict[str, Any] = Depends(get_current_admin), cache=Depends(get_cache)):
+    """
+    Get per-prefix cache metrics in the Prometheus text format (admin only).
+    """
+    if not isinstance(cache, InstrumentedCache):
+        raise HTTPException(status_code=404, detail="Cache metrics are disabled")
+    return cache.render_metrics()
+
+@router.get("/api/admin/database/stats")
+async def get_database_stats(current_user: Dict[str, Any] = Depends(get_current_admin)):
+    """
+    Get MongoDB pool settings and per-collection command statistics (admin only).
+    """
+    return db_service.get_stats()
+
+@router.get("/api/admin/database/metrics", response_class=PlainTextResponse)
+async def get_database_metrics(current_user: Dict[str, Any] = Depends(get_current_admin)):
+    """
+    Get per-collection MongoDB command metrics in the Prometheus text format (admin only).
+    """
+    if db_service.metrics is None:
+        raise HTTPException(status_code=404, detail="Database command monitoring is disabled")
+    return db_service.metrics.render_metrics()
+
+@router.get("/api/admin/render/stats")
+async def get_render_stats(current_user: Dict[str, Any] = Depends(get_current_admin)):
+    """
+    Get wiki markup render executor, preview cache and red-link page index statistics (admin only).
+    """
+    return {
+        **render_executor.get_stats(),
+        "preview_cache": render_cache.get_stats(),
+        "page_index": page_index.get_stats()
+    }
@@ -3,21 +3,48 @@
 """
 Article page routes for the Kryptopedia application.
 """
-from fastapi import APIRouter, Request, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Request, Depends, HTTPException, Path, Query, BackgroundTasks
 from fastapi.responses import HTMLResponse, RedirectResponse
 from typing import Optional, Dict, Any
 import logging
 from bson import ObjectId
 
 from dependencies import get_db, get_current_user, get_cache
-from utils.wiki_parser import parse_wiki_markup
+from services.cache import article_tag, cache_page, register_hit_handler
+from services.render import render_wiki_markup, needs_rerender, rerender_article
+from utils.wiki_parser import extract_short_description
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+async def count_article_view(article_id: str) -> None:
+    """
+    Count a view of an article page served from the page cache.
+    
+    Args:
+        article_id: The article ID
+    """
+    db = await get_db()
+    await db["articles"].update_one({"_id": ObjectId(article_id)}, {"$inc": {"views": 1}})
+
+register_hit_handler("article_view", count_article_view)
+
+async def cache_article(cache, key: str, article: Dict[str, Any]) -> None:
+    """
+    Cache an article document for its page.
+    
+    Args:
+        cache: Cache service
+        key: The slug or ID the article is requested by
+        article: The article document
+    """
+    # Tagged so that the id and slug keys are invalidated together
+    await cache.set(f"article:{key}", article, 3600, tags=[article_tag(article["_id"])])  # Cache for 1 hour
+
 @router.get("/articles/{slug_or_id}", response_class=HTMLResponse)
 async def article_page(
     request: Request,
+    background_tasks: BackgroundTasks,
     slug_or_id: str = Path(..., description="Article slug or ID"),
     mode: str = Query("wiki", description="View mode: wiki or html"),
     db=Depends(get_db),
@@ -69,8 +96,7 @@ async def article_page(
                     status_code=404
                 )
             
-            # Cache article
-            await cache.set(cache_key, article, 3600)  # Cache for 1 hour
+            await cache_article(cache, slug_or_id, article)
             
             # Update view count
             await db["articles"].update_one(
@@ -91,10 +117,27 @@ async def article_page(
                     status_code=403
                 )
         
+        # Refresh HTML rendered by an older parser after responding
+        if needs_rerender(article):
+            background_tasks.add_task(rerender_article, db, article, cache)
+        else:
+            # Anonymous readers get the rendered page; views are still counted on hits
+            cache_page(
+                request,
+                3600,
+                tags=[article_tag(article["_id"])],
+                on_hit=("article_view", str(article["_id"]))
+            )
+        
         # Choose template based on mode
         if mode == "wiki":
-            # Parse wiki markup if using wiki mode
-            parsed_content, short_description = parse_wiki_markup(article["content"])
+            if article.get("source") is not None:
+                # Stored HTML was rendered from the saved source markup
+                parsed_content = article["content"]
+                _, short_description = extract_short_description(article["source"])
+            else:
+                # Articles saved before source markup was stored
+                parsed_content, short_description = await render_wiki_markup(article["content"])
             
             return templates.TemplateResponse(
                 "article_wiki.html",
@@ -7,7 +7,8 @@ from bson import ObjectId
 from typing import Optional, Dict, Any
 import logging
 
-from dependencies import get_db, get_current_user, get_cache
+from dependencies import get_db, get_current_user, get_cache, get_loaders
+from services.cache import ARTICLE_LISTINGS
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -104,7 +105,7 @@ async def articles_list_page(
     
     # Cache the result if no filters
     if cache_key:
-        await cache.set(cache_key, template_data, 300)
+        await cache.set(cache_key, template_data, 300, tags=[ARTICLE_LISTINGS])
     
     return templates.TemplateResponse(
         "articles_list.html",
@@ -542,7 +543,8 @@ async def proposals_list_page(
     article_id: Optional[str] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db=Depends(get_db)
+    db=Depends(get_db),
+    loaders=Depends(get_loaders)
 ):
     """
     Render the page listing edit proposals.
@@ -565,20 +567,24 @@ async def proposals_list_page(
     total_count = await db["proposals"].count_documents(query)
     
     # Enhance proposals with article info
+    articles = await loaders.articles.load_many(prop["articleId"] for prop in proposals)
+    users = await loaders.users.load_many(
+        [prop["proposedBy"] for prop in proposals] + [prop.get("reviewedBy") for prop in proposals]
+    )
     enhanced_proposals = []
     for prop in proposals:
         # Get article info
-        article = await db["articles"].find_one({"_id": prop["articleId"]})
+        article = articles.get(prop["articleId"])
         article_title = article["title"] if article else "Unknown Article"
         
         # Get user info
-        proposer = await db["users"].find_one({"_id": prop["proposedBy"]})
+        proposer = users.get(prop["proposedBy"])
         proposer_username = proposer["username"] if proposer else "Unknown"
         
         # Get reviewer info if available
         reviewer_username = None
         if prop.get("reviewedBy"):
-            reviewer = await db["users"].find_one({"_id": prop["reviewedBy"]})
+            reviewer = users.get(prop["reviewedBy"])
             reviewer_username = reviewer["username"] if reviewer else "Unknown"
         
         # Add enhanced info
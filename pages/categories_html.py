@@ -9,6 +9,7 @@ from typing import Optional
 import logging
 
 from dependencies import get_db, get_current_user, get_cache
+from services.cache import CATEGORY_LISTINGS
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -111,7 +112,7 @@ async def categories_list_page(
         
         # Cache the result if no filters
         if cache_key:
-            await cache.set(cache_key, template_data, 600)  # Cache for 10 minutes
+            await cache.set(cache_key, template_data, 600, tags=[CATEGORY_LISTINGS])  # Cache for 10 minutes
         
         return templates.TemplateResponse(
             "categories.html",
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Request, Depends, Query, HTTPException
 from fastapi.responses import HTMLResponse
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from functools import partial
 import logging
 
 from dependencies import get_db, get_current_user, get_cache
@@ -13,32 +14,14 @@ from dependencies import get_db, get_current_user, get_cache
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.get("/community", response_class=HTMLResponse)
-async def community_page(request: Request, db=Depends(get_db), cache=Depends(get_cache)):
-    """
-    Render the community portal page.
+def empty_community_dashboard() -> Dict[str, Any]:
     """
-    templates = request.app.state.templates
-    
-    # Try to get from cache first
-    cache_key = "community_dashboard"
-    cached_data = await cache.get(cache_key)
-    
-    if cached_data:
-        return templates.TemplateResponse(
-            "community.html",
-            {
-                "request": request,
-                "stats": cached_data["stats"],
-                "recent_activities": cached_data["recent_activities"],
-                "announcements": cached_data["announcements"],
-                "events": cached_data["events"],
-                "top_contributors": cached_data["top_contributors"]
-            }
-        )
+    Community dashboard data with every section empty.
     
-    # Initialize data with defaults
-    dashboard_data = {
+    Returns:
+        Dict[str, Any]: Default dashboard data
+    """
+    return {
         "stats": {
             "articles": 0,
             "users": 0,
@@ -50,113 +33,139 @@ async def community_page(request: Request, db=Depends(get_db), cache=Depends(get
         "events": [],
         "top_contributors": []
     }
+
+async def build_community_dashboard(db) -> Dict[str, Any]:
+    """
+    Compute the community dashboard data.
     
-    try:
-        # Get article stats
-        dashboard_data["stats"]["articles"] = await db["articles"].count_documents({"status": "published"})
-        
-        # Get user stats
-        dashboard_data["stats"]["users"] = await db["users"].count_documents({})
-        
-        # Get edit stats
-        dashboard_data["stats"]["edits"] = await db["revisions"].count_documents({})
-        
-        # Get category count using aggregation
-        pipeline = [
-            {"$match": {"status": "published"}},
-            {"$unwind": "$categories"},
-            {"$group": {"_id": "$categories"}},
-            {"$count": "total"}
-        ]
-        
-        categories_count = await db["articles"].aggregate(pipeline).to_list(length=1)
-        if categories_count and len(categories_count) > 0:
-            dashboard_data["stats"]["categories"] = categories_count[0]["total"]
-        
-        # Get recent activity
-        # Get recent revisions
-        revisions_cursor = db["revisions"].find().sort("createdAt", -1).limit(5)
-        revisions = await revisions_cursor.to_list(length=5)
-        
-        for rev in revisions:
-            article = await db["articles"].find_one({"_id": rev["articleId"]})
-            user = await db["users"].find_one({"_id": rev["createdBy"]})
-            
-            if article and user:
-                dashboard_data["recent_activities"].append({
-                    "type": "Edit",
-                    "timestamp": rev["createdAt"],
-                    "articleId": str(rev["articleId"]),
-                    "articleTitle": article["title"],
-                    "username": user["username"]
-                })
-        
-        # Get recent proposals
-        proposals_cursor = db["proposals"].find().sort("proposedAt", -1).limit(5)
-        proposals = await proposals_cursor.to_list(length=5)
+    Args:
+        db: Database connection
         
-        for prop in proposals:
-            article = await db["articles"].find_one({"_id": prop["articleId"]})
-            user = await db["users"].find_one({"_id": prop["proposedBy"]})
-            
-            if article and user:
-                dashboard_data["recent_activities"].append({
-                    "type": "Proposal",
-                    "timestamp": prop["proposedAt"],
-                    "articleId": str(prop["articleId"]),
-                    "articleTitle": article["title"],
-                    "username": user["username"]
-                })
-        
-        # Sort activities by timestamp
-        dashboard_data["recent_activities"].sort(key=lambda x: x["timestamp"], reverse=True)
-        dashboard_data["recent_activities"] = dashboard_data["recent_activities"][:10]
-        
-        # Get sample announcements
-        dashboard_data["announcements"] = [
-            {
-                "title": "New Article Categories Added",
-                "date": datetime.now() - timedelta(days=2),
-                "content": "We've added new categories to better organize our growing collection of articles."
-            },
-            {
-                "title": "Community Call for Contributors",
-                "date": datetime.now() - timedelta(days=5),
-                "content": "We're looking for experts in various fields to contribute to our knowledge base."
-            }
-        ]
-        
-        # Get sample events
-        dashboard_data["events"] = [
-            {
-                "title": "Monthly Community Meeting",
-                "date": datetime.now() + timedelta(days=7),
-                "description": "Join us for our monthly community meeting to discuss the future of Kryptopedia.",
-                "link": "#"
-            },
-            {
-                "title": "Contributor Workshop",
-                "date": datetime.now() + timedelta(days=14),
-                "description": "Learn how to effectively contribute to Kryptopedia in this online workshop.",
-                "link": "#"
-            }
-        ]
-        
-        # Get top contributors
-        contributors_cursor = db["users"].find().sort("contributions.editsPerformed", -1).limit(5)
-        dashboard_data["top_contributors"] = await contributors_cursor.to_list(length=5)
-        
-        # Remove sensitive information from contributors
-        for contributor in dashboard_data["top_contributors"]:
-            if "passwordHash" in contributor:
-                del contributor["passwordHash"]
+    Returns:
+        Dict[str, Any]: Dashboard data for the template
+    """
+    dashboard_data = empty_community_dashboard()
+    
+    # Get article stats
+    dashboard_data["stats"]["articles"] = await db["articles"].count_documents({"status": "published"})
+    
+    # Get user stats
+    dashboard_data["stats"]["users"] = await db["users"].count_documents({})
+    
+    # Get edit stats
+    dashboard_data["stats"]["edits"] = await db["revisions"].count_documents({})
+    
+    # Get category count using aggregation
+    pipeline = [
+        {"$match": {"status": "published"}},
+        {"$unwind": "$categories"},
+        {"$group": {"_id": "$categories"}},
+        {"$count": "total"}
+    ]
+    
+    categories_count = await db["articles"].aggregate(pipeline).to_list(length=1)
+    if categories_count and len(categories_count) > 0:
+        dashboard_data["stats"]["categories"] = categories_count[0]["total"]
+    
+    # Get recent activity
+    # Get recent revisions
+    revisions_cursor = db["revisions"].find().sort("createdAt", -1).limit(5)
+    revisions = await revisions_cursor.to_list(length=5)
+    
+    for rev in revisions:
+        article = await db["articles"].find_one({"_id": rev["articleId"]})
+        user = await db["users"].find_one({"_id": rev["createdBy"]})
         
-        # Cache the dashboard data
-        await cache.set(cache_key, dashboard_data, 900)  # Cache for 15 minutes
+        if article and user:
+            dashboard_data["recent_activities"].append({
+                "type": "Edit",
+                "timestamp": rev["createdAt"],
+                "articleId": str(rev["articleId"]),
+                "articleTitle": article["title"],
+                "username": user["username"]
+            })
+    
+    # Get recent proposals
+    proposals_cursor = db["proposals"].find().sort("proposedAt", -1).limit(5)
+    proposals = await proposals_cursor.to_list(length=5)
+    
+    for prop in proposals:
+        article = await db["articles"].find_one({"_id": prop["articleId"]})
+        user = await db["users"].find_one({"_id": prop["proposedBy"]})
         
+        if article and user:
+            dashboard_data["recent_activities"].append({
+                "type": "Proposal",
+                "timestamp": prop["proposedAt"],
+                "articleId": str(prop["articleId"]),
+                "articleTitle": article["title"],
+                "username": user["username"]
+            })
+    
+    # Sort activities by timestamp
+    dashboard_data["recent_activities"].sort(key=lambda x: x["timestamp"], reverse=True)
+    dashboard_data["recent_activities"] = dashboard_data["recent_activities"][:10]
+    
+    # Get sample announcements
+    dashboard_data["announcements"] = [
+        {
+            "title": "New Article Categories Added",
+            "date": datetime.now() - timedelta(days=2),
+            "content": "We've added new categories to better organize our growing collection of articles."
+        },
+        {
+            "title": "Community Call for Contributors",
+            "date": datetime.now() - timedelta(days=5),
+            "content": "We're looking for experts in various fields to contribute to our knowledge base."
+        }
+    ]
+    
+    # Get sample events
+    dashboard_data["events"] = [
+        {
+            "title": "Monthly Community Meeting",
+            "date": datetime.now() + timedelta(days=7),
+            "description": "Join us for our monthly community meeting to discuss the future of Kryptopedia.",
+            "link": "#"
+        },
+        {
+            "title": "Contributor Workshop",
+            "date": datetime.now() + timedelta(days=14),
+            "description": "Learn how to effectively contribute to Kryptopedia in this online workshop.",
+            "link": "#"
+        }
+    ]
+    
+    # Get top contributors
+    contributors_cursor = db["users"].find().sort("contributions.editsPerformed", -1).limit(5)
+    dashboard_data["top_contributors"] = await contributors_cursor.to_list(length=5)
+    
+    # Remove sensitive information from contributors
+    for contributor in dashboard_data["top_contributors"]:
+        if "passwordHash" in contributor:
+            del contributor["passwordHash"]
+    
+    return dashboard_data
+
+@router.get("/community", response_class=HTMLResponse)
+async def community_page(request: Request, db=Depends(get_db), cache=Depends(get_cache)):
+    """
+    Render the community portal page.
+    """
+    templates = request.app.state.templates
+    
+    try:
+        # Refreshed in the background after 15 minutes; stale data is served for up to an hour
+        dashboard_data = await cache.get_or_compute(
+            "community_dashboard",
+            partial(build_community_dashboard, db),
+            900,
+            hard_expiration=3600
+        )
     except Exception as e:
         logger.error(f"Error getting community dashboard data: {e}")
         # Use default data in case of errors
+        dashboard_data = empty_community_dashboard()
     
     # Render template with our data, ensuring we pass the individual fields 
     # rather than unpacking dashboard_data
@@ -172,6 +181,77 @@ async def community_page(request: Request, db=Depends(get_db), cache=Depends(get
         }
     )
 
+async def build_community_portal(db) -> Dict[str, Any]:
+    """
+    Compute the community portal data.
+    
+    Args:
+        db: Database connection
+        
+    Returns:
+        Dict[str, Any]: Active users, recent revisions and top contributors
+    """
+    # Get active users (users who logged in within the last 7 days)
+    active_users_cursor = db["users"].find({
+        "lastLogin": {"$gte": datetime.now() - timedelta(days=7)}
+    }).sort("lastLogin", -1).limit(10)
+    
+    active_users = await active_users_cursor.to_list(length=10)
+    
+    # Remove sensitive info
+    for user in active_users:
+        if "passwordHash" in user:
+            del user["passwordHash"]
+    
+    # Get recent revisions
+    recent_revisions_cursor = db["revisions"].find().sort("createdAt", -1).limit(10)
+    recent_revisions = await recent_revisions_cursor.to_list(length=10)
+    
+    # Enhance with article and user info
+    enhanced_revisions = []
+    for rev in recent_revisions:
+        article = await db["articles"].find_one({"_id": rev["articleId"]})
+        user = await db["users"].find_one({"_id": rev["createdBy"]})
+        
+        if article and user:
+            enhanced_revisions.append({
+                "timestamp": rev["createdAt"],
+                "articleId": str(rev["articleId"]),
+                "articleTitle": article.get("title", "Unknown Article"),
+                "articleSlug": article.get("slug"),
+                "username": user.get("username", "Unknown User"),
+                "comment": rev.get("comment", "")
+            })
+    
+    # Get top contributors
+    top_contributors_cursor = db["users"].find().sort(
+        "contributions.editsPerformed", -1
+    ).limit(5)
+    
+    top_contributors = await top_contributors_cursor.to_list(length=5)
+    
+    # Remove sensitive info
+    for user in top_contributors:
+        if "passwordHash" in user:
+            del user["passwordHash"]
+    
+    # Get recent discussions (placeholder - would be implemented with a discussions/forum system)
+    recent_discussions = []
+    
+    # Get upcoming events (placeholder - would be implemented with an events system)
+    upcoming_events = []
+    
+    # Combine data
+    portal_data = {
+        "active_users": active_users,
+        "recent_revisions": enhanced_revisions,
+        "top_contributors": top_contributors,
+        "recent_discussions": recent_discussions,
+        "upcoming_events": upcoming_events
+    }
+    
+    return portal_data
+
 @router.get("/community/extra", response_class=HTMLResponse)
 async def community_portal(
     request: Request,
@@ -184,78 +264,13 @@ async def community_portal(
     templates = request.app.state.templates
     
     try:
-        # Try to get data from cache
-        cache_key = "community_portal"
-        cached_data = await cache.get(cache_key)
-        
-        if not cached_data:
-            # Get active users (users who logged in within the last 7 days)
-            active_users_cursor = db["users"].find({
-                "lastLogin": {"$gte": datetime.now() - timedelta(days=7)}
-            }).sort("lastLogin", -1).limit(10)
-            
-            active_users = await active_users_cursor.to_list(length=10)
-            
-            # Remove sensitive info
-            for user in active_users:
-                if "passwordHash" in user:
-                    del user["passwordHash"]
-            
-            # Get recent revisions
-            recent_revisions_cursor = db["revisions"].find().sort("createdAt", -1).limit(10)
-            recent_revisions = await recent_revisions_cursor.to_list(length=10)
-            
-            # Enhance with article and user info
-            enhanced_revisions = []
-            for rev in recent_revisions:
-                article = await db["articles"].find_one({"_id": rev["articleId"]})
-                user = await db["users"].find_one({"_id": rev["createdBy"]})
-                
-                if article and user:
-                    enhanced_revisions.append({
-                        "timestamp": rev["createdAt"],
-                        "articleId": str(rev["articleId"]),
-                        "articleTitle": article.get("title", "Unknown Article"),
-                        "articleSlug": article.get("slug"),
-                        "username": user.get("username", "Unknown User"),
-                        "comment": rev.get("comment", "")
-                    })
-            
-            # Get top contributors
-            top_contributors_cursor = db["users"].find().sort(
-                "contributions.editsPerformed", -1
-            ).limit(5)
-            
-            top_contributors = await top_contributors_cursor.to_list(length=5)
-            
-            # Remove sensitive info
-            for user in top_contributors:
-                if "passwordHash" in user:
-                    del user["passwordHash"]
-            
-            # Get recent discussions (placeholder - would be implemented with a discussions/forum system)
-            recent_discussions = []
-            
-            # Get upcoming events (placeholder - would be implemented with an events system)
-            upcoming_events = []
-            
-            # Combine data
-            portal_data = {
-                "active_users": active_users,
-                "recent_revisions": enhanced_revisions,
-                "top_contributors": top_contributors,
-                "recent_discussions": recent_discussions,
-                "upcoming_events": upcoming_events
-            }
-            
-            # Cache data for 15 minutes
-            await cache.set(cache_key, portal_data, 900)
-            
-            # Use the fetched data
-            data = portal_data
-        else:
-            # Use cached data
-            data = cached_data
+        # Refreshed in the background after 15 minutes; stale data is served for up to an hour
+        data = await cache.get_or_compute(
+            "community_portal",
+            partial(build_community_portal, db),
+            900,
+            hard_expiration=3600
+        )
 
         # Add stats dictionary to be compatible with the first endpoint
         stats = {
@@ -4,144 +4,180 @@ Home page and core navigation routes for the Kryptopedia application.
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Dict
 import logging
 from bson import ObjectId
 
 from dependencies import get_db, get_cache
+from services.cache import ARTICLE_LISTINGS, article_tag, cache_page
+from services.loaders import Loaders
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.get("/", response_class=HTMLResponse)
-async def homepage(request: Request, db=Depends(get_db), cache=Depends(get_cache)):
+async def build_homepage_data(db, cache) -> Dict[str, Any]:
     """
-    Render the homepage template with dynamic content.
+    Compute the homepage data.
+    
+    Args:
+        db: Database connection
+        cache: Cache holding the featured article
+        
+    Returns:
+        Dict[str, Any]: Featured and recent articles, recent changes and counts
     """
-    # Get the templates instance from the app state
-    templates = request.app.state.templates
+    # Get featured article from cache or database
+    featured_article = await cache.get("featured_article")
     
-    try:
-        # Try to get data from cache first
-        cache_key = "homepage_data"
-        cached_data = await cache.get(cache_key)
+    # If not in cache, fetch from database
+    if not featured_article:
+        # Find featured articles (featuredUntil > now)
+        featured_article = await db["articles"].find_one({
+            "featuredUntil": {"$gt": datetime.now()},
+            "status": "published"
+        })
         
-        if cached_data:
-            return templates.TemplateResponse(
-                "index.html",
-                {
-                    "request": request,
-                    **cached_data
-                }
+        # If no featured article, get most viewed article
+        if not featured_article:
+            featured_article = await db["articles"].find_one(
+                {"status": "published"},
+                sort=[("views", -1)]
             )
         
-        # Get featured article from cache or database
-        featured_article = await cache.get("featured_article")
+        # Cache featured article for 1 hour
+        if featured_article:
+            await cache.set("featured_article", featured_article, 3600, tags=[article_tag(featured_article["_id"])])
+    
+    # Get multiple featured articles for the home page
+    featured_articles_cursor = db["articles"].find(
+        {"status": "published"}
+    ).sort("views", -1).limit(3)
+    
+    featured_articles = await featured_articles_cursor.to_list(length=3)
+    
+    # Get recent articles
+    recent_articles_cursor = db["articles"].find(
+        {"status": "published"}
+    ).sort("createdAt", -1).limit(5)
+    
+    recent_articles = await recent_articles_cursor.to_list(length=5)
+    
+    # Get recent changes
+    recent_changes = []
+    
+    # Get recent revisions
+    revisions_cursor = db["revisions"].find().sort("createdAt", -1).limit(5)
+    revisions = await revisions_cursor.to_list(length=5)
+    
+    # Get new articles
+    new_articles_cursor = db["articles"].find(
+        {"status": "published"}
+    ).sort("createdAt", -1).limit(5)
+    
+    new_articles = await new_articles_cursor.to_list(length=5)
+    
+    # Fetch the articles and authors of both lists in one query each
+    loaders = Loaders(db)
+    articles = await loaders.articles.load_many(rev["articleId"] for rev in revisions)
+    users = await loaders.users.load_many(
+        [rev["createdBy"] for rev in revisions] + [article.get("createdBy") for article in new_articles]
+    )
+    
+    for rev in revisions:
+        article = articles.get(rev["articleId"])
+        user = users.get(rev["createdBy"])
         
-        # If not in cache, fetch from database
-        if not featured_article:
-            # Find featured articles (featuredUntil > now)
-            featured_article = await db["articles"].find_one({
-                "featuredUntil": {"$gt": datetime.now()},
-                "status": "published"
+        if article and user:
+            recent_changes.append({
+                "type": "edit",
+                "title": article["title"],
+                "slug": article.get("slug", str(article["_id"])),
+                "user": user["username"],
+                "comment": rev.get("comment", ""),
+                "timestamp": rev["createdAt"]
             })
-            
-            # If no featured article, get most viewed article
-            if not featured_article:
-                featured_article = await db["articles"].find_one(
-                    {"status": "published"},
-                    sort=[("views", -1)]
-                )
-            
-            # Cache featured article for 1 hour
-            if featured_article:
-                await cache.set("featured_article", featured_article, 3600)
-        
-        # Get multiple featured articles for the home page
-        featured_articles_cursor = db["articles"].find(
-            {"status": "published"}
-        ).sort("views", -1).limit(3)
-        
-        featured_articles = await featured_articles_cursor.to_list(length=3)
-        
-        # Get recent articles
-        recent_articles_cursor = db["articles"].find(
-            {"status": "published"}
-        ).sort("createdAt", -1).limit(5)
-        
-        recent_articles = await recent_articles_cursor.to_list(length=5)
-        
-        # Get recent changes
-        recent_changes = []
-        
-        # Get recent revisions
-        revisions_cursor = db["revisions"].find().sort("createdAt", -1).limit(5)
-        revisions = await revisions_cursor.to_list(length=5)
-        
-        for rev in revisions:
-            article = await db["articles"].find_one({"_id": rev["articleId"]})
-            user = await db["users"].find_one({"_id": rev["createdBy"]})
-            
-            if article and user:
-                recent_changes.append({
-                    "type": "edit",
-                    "title": article["title"],
-                    "slug": article.get("slug", str(article["_id"])),
-                    "user": user["username"],
-                    "comment": rev.get("comment", ""),
-                    "timestamp": rev["createdAt"]
-                })
-        
-        # Get new articles
-        new_articles_cursor = db["articles"].find(
-            {"status": "published"}
-        ).sort("createdAt", -1).limit(5)
-        
-        new_articles = await new_articles_cursor.to_list(length=5)
-        
-        for article in new_articles:
-            user = await db["users"].find_one({"_id": article["createdBy"]})
-            
-            if user:
-                recent_changes.append({
-                    "type": "new",
-                    "title": article["title"],
-                    "slug": article.get("slug", str(article["_id"])),
-                    "user": user["username"],
-                    "comment": "New article created",
-                    "timestamp": article["createdAt"]
-                })
-        
-        # Sort combined changes by timestamp (newest first)
-        recent_changes.sort(key=lambda x: x["timestamp"], reverse=True)
-        recent_changes = recent_changes[:5]  # Limit to 5 items
-        
-        # Get article counts for stats
-        article_count = await db["articles"].count_documents({"status": "published"})
-        edit_count = await db["revisions"].count_documents({})
-        user_count = await db["users"].count_documents({})
+    
+    for article in new_articles:
+        user = users.get(article["createdBy"])
         
-        # Prepare data for template
-        homepage_data = {
-            "featured_article": featured_article,
-            "featured_articles": featured_articles,
-            "recent_articles": recent_articles,
-            "recent_changes": recent_changes,
-            "article_count": article_count,
-            "edit_count": edit_count,
-            "user_count": user_count
-        }
+        if user:
+            recent_changes.append({
+                "type": "new",
+                "title": article["title"],
+                "slug": article.get("slug", str(article["_id"])),
+                "user": user["username"],
+                "comment": "New article created",
+                "timestamp": article["createdAt"]
+            })
+    
+    # Sort combined changes by timestamp (newest first)
+    recent_changes.sort(key=lambda x: x["timestamp"], reverse=True)
+    recent_changes = recent_changes[:5]  # Limit to 5 items
+    
+    # Get article counts for stats
+    article_count = await db["articles"].count_documents({"status": "published"})
+    edit_count = await db["revisions"].count_documents({})
+    user_count = await db["users"].count_documents({})
+    
+    # Prepare data for template
+    homepage_data = {
+        "featured_article": featured_article,
+        "featured_articles": featured_articles,
+        "recent_articles": recent_articles,
+        "recent_changes": recent_changes,
+        "article_count": article_count,
+        "edit_count": edit_count,
+        "user_count": user_count
+    }
+    
+    return homepage_data
+
+async def get_homepage_data(db, cache) -> Dict[str, Any]:
+    """
+    Get the homepage data from the cache, computing it if needed.
+    
+    Refreshed in the background after 5 minutes; stale data is served for
+    up to an hour.
+    
+    Args:
+        db: Database connection
+        cache: Cache service
         
-        # Cache the homepage data
-        await cache.set(cache_key, homepage_data, 300)  # Cache for 5 minutes
+    Returns:
+        Dict[str, Any]: Featured and recent articles, recent changes and counts
+    """
+    return await cache.get_or_compute(
+        "homepage_data",
+        partial(build_homepage_data, db, cache),
+        300,
+        tags=[ARTICLE_LISTINGS],
+        hard_expiration=3600
+    )
+
+@router.get("/", response_class=HTMLResponse)
+async def homepage(request: Request, db=Depends(get_db), cache=Depends(get_cache)):
+    """
+    Render the homepage template with dynamic content.
+    """
+    # Get the templates instance from the app state
+    templates = request.app.state.templates
+    
+    try:
+        homepage_data = await get_homepage_data(db, cache)
         
         # Render template with our data
-        return templates.TemplateResponse(
+        response = templates.TemplateResponse(
             "index.html",
             {
                 "request": request,
                 **homepage_data
             }
         )
+        
+        # Anonymous readers get the rendered page for up to 5 minutes
+        cache_page(request, 300, tags=[ARTICLE_LISTINGS])
+        return response
     except Exception as e:
         logger.error(f"Error rendering homepage: {e}")
         # Fallback to minimal template with error handling
@@ -5,11 +5,13 @@ from fastapi import APIRouter, Request, Depends, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
+from functools import partial
 import random
 import logging
 from bson import ObjectId
 
-from dependencies import get_db, get_cache
+from dependencies import get_db, get_cache, get_loaders
+from services.cache import ARTICLE_LISTINGS, cache_page
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -21,7 +23,8 @@ async def recent_changes_page(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     db=Depends(get_db),
-    cache=Depends(get_cache)
+    cache=Depends(get_cache),
+    loaders=Depends(get_loaders)
 ):
     """
     Render the recent changes page.
@@ -41,15 +44,21 @@ async def recent_changes_page(
         # Combine and sort by date
         changes = []
         
+        # Fetch the articles and users of every row in one query each
+        articles = await loaders.articles.load_many(
+            [rev["articleId"] for rev in revisions] + [prop["articleId"] for prop in proposals]
+        )
+        users = await loaders.users.load_many(
+            [rev["createdBy"] for rev in revisions] + [prop["proposedBy"] for prop in proposals]
+        )
+        
         # Process revisions
         for rev in revisions:
-            # Get article
-            article = await db["articles"].find_one({"_id": rev["articleId"]})
+            article = articles.get(rev["articleId"])
             if not article:
                 continue
                 
-            # Get user
-            user = await db["users"].find_one({"_id": rev["createdBy"]})
+            user = users.get(rev["createdBy"])
             username = user["username"] if user else "Unknown"
             
             changes.append({
@@ -64,13 +73,11 @@ async def recent_changes_page(
         
         # Process proposals
         for prop in proposals:
-            # Get article
-            article = await db["articles"].find_one({"_id": prop["articleId"]})
+            article = articles.get(prop["articleId"])
             if not article:
                 continue
                 
-            # Get user
-            user = await db["users"].find_one({"_id": prop["proposedBy"]})
+            user = users.get(prop["proposedBy"])
             username = user["username"] if user else "Unknown"
             
             changes.append({
@@ -104,7 +111,7 @@ async def recent_changes_page(
         changes = changes[skip:skip+limit]
         
         # Render template
-        return templates.TemplateResponse(
+        response = templates.TemplateResponse(
             "recent_changes.html",
             {
                 "request": request,
@@ -115,6 +122,10 @@ async def recent_changes_page(
                 "filter": filter
             }
         )
+        
+        # New proposals do not invalidate listings, so keep this short
+        cache_page(request, 60, tags=[ARTICLE_LISTINGS])
+        return response
     except Exception as e:
         logger.error(f"Error getting recent changes: {e}")
         # Return empty results on error
@@ -210,6 +221,75 @@ async def generate_sample_changes(db) -> List[Dict[str, Any]]:
     
     return sample_changes
 
+async def build_statistics(db) -> Dict[str, Any]:
+    """
+    Compute the statistics page data.
+    
+    Args:
+        db: Database connection
+        
+    Returns:
+        Dict[str, Any]: Statistics for the template
+    """
+    # Get statistics
+    statistics = {}
+    
+    # Article stats
+    statistics["total_articles"] = await db["articles"].count_documents({"status": "published"})
+    statistics["total_edits"] = await db["revisions"].count_documents({})
+    statistics["total_proposals"] = await db["proposals"].count_documents({})
+    
+    # User stats
+    statistics["total_users"] = await db["users"].count_documents({})
+    statistics["new_users_today"] = await db["users"].count_documents({
+        "joinDate": {"$gte": datetime.now() - timedelta(days=1)}
+    })
+    
+    # Most active users
+    top_editors_cursor = db["users"].find().sort("contributions.editsPerformed", -1).limit(5)
+    statistics["top_editors"] = await top_editors_cursor.to_list(length=5)
+    
+    # Most viewed articles
+    top_articles_cursor = db["articles"].find({"status": "published"}).sort("views", -1).limit(5)
+    statistics["top_articles"] = await top_articles_cursor.to_list(length=5)
+    
+    # Recent activity (last 24 hours)
+    recent_revisions = await db["revisions"].count_documents({
+        "createdAt": {"$gte": datetime.now() - timedelta(days=1)}
+    })
+    recent_proposals = await db["proposals"].count_documents({
+        "proposedAt": {"$gte": datetime.now() - timedelta(days=1)}
+    })
+    
+    statistics["recent_activity"] = {
+        "revisions": recent_revisions,
+        "proposals": recent_proposals,
+        "total": recent_revisions + recent_proposals
+    }
+    
+    return statistics
+
+async def get_statistics(db, cache) -> Dict[str, Any]:
+    """
+    Get the statistics page data from the cache, computing it if needed.
+    
+    Refreshed in the background after 30 minutes; stale data is served for
+    up to 2 hours.
+    
+    Args:
+        db: Database connection
+        cache: Cache service
+        
+    Returns:
+        Dict[str, Any]: Statistics for the template
+    """
+    return await cache.get_or_compute(
+        "statistics_page",
+        partial(build_statistics, db),
+        1800,
+        hard_expiration=7200
+    )
+
 @router.get("/special/statistics", response_class=HTMLResponse)
 async def statistics_page(
     request: Request,
@@ -221,67 +301,20 @@ async def statistics_page(
     """
     templates = request.app.state.templates
     
-    # Try to get from cache
-    cache_key = "statistics_page"
-    cached_data = await cache.get(cache_key)
-    
-    if cached_data:
-        return templates.TemplateResponse(
-            "statistics.html",
-            {
-                "request": request,
-                "statistics": cached_data
-            }
-        )
-    
     try:
-        # Get statistics
-        statistics = {}
-        
-        # Article stats
-        statistics["total_articles"] = await db["articles"].count_documents({"status": "published"})
-        statistics["total_edits"] = await db["revisions"].count_documents({})
-        statistics["total_proposals"] = await db["proposals"].count_documents({})
-        
-        # User stats
-        statistics["total_users"] = await db["users"].count_documents({})
-        statistics["new_users_today"] = await db["users"].count_documents({
-            "joinDate": {"$gte": datetime.now() - timedelta(days=1)}
-        })
-        
-        # Most active users
-        top_editors_cursor = db["users"].find().sort("contributions.editsPerformed", -1).limit(5)
-        statistics["top_editors"] = await top_editors_cursor.to_list(length=5)
-        
-        # Most viewed articles
-        top_articles_cursor = db["articles"].find({"status": "published"}).sort("views", -1).limit(5)
-        statistics["top_articles"] = await top_articles_cursor.to_list(length=5)
-        
-        # Recent activity (last 24 hours)
-        recent_revisions = await db["revisions"].count_documents({
-            "createdAt": {"$gte": datetime.now() - timedelta(days=1)}
-        })
-        recent_proposals = await db["proposals"].count_documents({
-            "proposedAt": {"$gte": datetime.now() - timedelta(days=1)}
-        })
-        
-        statistics["recent_activity"] = {
-            "revisions": recent_revisions,
-            "proposals": recent_proposals,
-            "total": recent_revisions + recent_proposals
-        }
-        
-        # Cache the results
-        await cache.set(cache_key, statistics, 1800)  # Cache for 30 minutes
+        statistics = await get_statistics(db, cache)
         
         # Render template
-        return templates.TemplateResponse(
+        response = templates.TemplateResponse(
             "statistics.html",
             {
                 "request": request,
                 "statistics": statistics
             }
         )
+        
+        cache_page(request, 600)
+        return response
     except Exception as e:
         logger.error(f"Error getting statistics: {e}")
         # Return empty results on error
@@ -5,10 +5,12 @@ User profile page routes for the Kryptopedia application.
 from fastapi import APIRouter, Request, Depends, Path, Query, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from typing import Optional, Dict, Any
+from functools import partial
 import logging
 from bson import ObjectId
 
 from dependencies import get_db, get_current_user, get_cache
+from services.cache import user_tag
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -102,6 +104,82 @@ async def profile_settings_page(
     
     return RedirectResponse(url="/profile?tab=settings")
 
+async def build_profile_lists(
+    db,
+    user_id: ObjectId,
+    articles_skip: int,
+    articles_limit: int,
+    contributions_skip: int,
+    contributions_limit: int,
+    proposals_skip: int,
+    proposals_limit: int,
+    rewards_skip: int,
+    rewards_limit: int
+) -> Dict[str, Any]:
+    """
+    Build one page of a user's articles, contributions, proposals and rewards.
+    
+    Args:
+        db: Database connection
+        user_id: The profile user's ID
+        articles_skip, articles_limit: Page of the user's articles
+        contributions_skip, contributions_limit: Page of the user's edits
+        proposals_skip, proposals_limit: Page of the user's proposals
+        rewards_skip, rewards_limit: Page of the user's rewards
+        
+    Returns:
+        Dict[str, Any]: The lists and their totals, with IDs as strings
+    """
+    # Get user's articles with pagination
+    articles_cursor = db["articles"].find({"authorId": user_id})
+    total_articles = await db["articles"].count_documents({"authorId": user_id})
+    articles = await articles_cursor.skip(articles_skip).limit(articles_limit).to_list(length=articles_limit)
+    
+    # Get user's contributions (edit history) with pagination  
+    contributions_cursor = db["revisions"].find({"editorId": user_id})
+    total_contributions = await db["revisions"].count_documents({"editorId": user_id})
+    contributions = await contributions_cursor.skip(contributions_skip).limit(contributions_limit).to_list(length=contributions_limit)
+    
+    # Get user's proposals with pagination (if they have any)
+    proposals_cursor = db["proposals"].find({"proposerId": user_id})
+    total_proposals = await db["proposals"].count_documents({"proposerId": user_id})
+    proposals = await proposals_cursor.skip(proposals_skip).limit(proposals_limit).to_list(length=proposals_limit)
+    
+    # Get user's rewards with pagination (if they have any)
+    rewards_cursor = db["rewards"].find({"userId": user_id})
+    total_rewards = await db["rewards"].count_documents({"userId": user_id})
+    rewards = await rewards_cursor.skip(rewards_skip).limit(rewards_limit).to_list(length=rewards_limit)
+    
+    # Convert ObjectIds to strings for template rendering
+    for article in articles:
+        article["_id"] = str(article["_id"])
+        article["authorId"] = str(article["authorId"])
+    
+    for contribution in contributions:
+        contribution["_id"] = str(contribution["_id"])
+        contribution["articleId"] = str(contribution["articleId"])
+        contribution["editorId"] = str(contribution["editorId"])
+    
+    for proposal in proposals:
+        proposal["_id"] = str(proposal["_id"])
+        proposal["articleId"] = str(proposal["articleId"])
+        proposal["proposerId"] = str(proposal["proposerId"])
+    
+    for reward in rewards:
+        reward["_id"] = str(reward["_id"])
+        reward["userId"] = str(reward["userId"])
+    
+    return {
+        "articles": articles,
+        "contributions": contributions,
+        "proposals": proposals,
+        "rewards": rewards,
+        "total_articles": total_articles,
+        "total_contributions": total_contributions,
+        "total_proposals": total_proposals,
+        "total_rewards": total_rewards
+    }
+
 # Now define the parameterized routes with a regex constraint to avoid conflicts
 # Use regex to make sure username doesn't match the other static routes
 @router.get("/profile", response_class=HTMLResponse)
@@ -118,7 +196,8 @@ async def profile_page(
     proposals_limit: int = Query(10, ge=1, le=50),
     rewards_skip: int = Query(0, ge=0),
     rewards_limit: int = Query(10, ge=1, le=50),
-    db=Depends(get_db)
+    db=Depends(get_db),
+    cache=Depends(get_cache)
 ):
     """
     Render the user profile page.
@@ -150,44 +229,20 @@ async def profile_page(
         profile_user = current_user
         is_self = True
     
-    # Get user's articles with pagination
-    articles_cursor = db["articles"].find({"authorId": profile_user["_id"]})
-    total_articles = await db["articles"].count_documents({"authorId": profile_user["_id"]})
-    articles = await articles_cursor.skip(articles_skip).limit(articles_limit).to_list(length=articles_limit)
-    
-    # Get user's contributions (edit history) with pagination  
-    contributions_cursor = db["revisions"].find({"editorId": profile_user["_id"]})
-    total_contributions = await db["revisions"].count_documents({"editorId": profile_user["_id"]})
-    contributions = await contributions_cursor.skip(contributions_skip).limit(contributions_limit).to_list(length=contributions_limit)
-    
-    # Get user's proposals with pagination (if they have any)
-    proposals_cursor = db["proposals"].find({"proposerId": profile_user["_id"]})
-    total_proposals = await db["proposals"].count_documents({"proposerId": profile_user["_id"]})
-    proposals = await proposals_cursor.skip(proposals_skip).limit(proposals_limit).to_list(length=proposals_limit)
-    
-    # Get user's rewards with pagination (if they have any)
-    rewards_cursor = db["rewards"].find({"userId": profile_user["_id"]})
-    total_rewards = await db["rewards"].count_documents({"userId": profile_user["_id"]})
-    rewards = await rewards_cursor.skip(rewards_skip).limit(rewards_limit).to_list(length=rewards_limit)
-    
-    # Convert ObjectIds to strings for template rendering
-    for article in articles:
-        article["_id"] = str(article["_id"])
-        article["authorId"] = str(article["authorId"])
-    
-    for contribution in contributions:
-        contribution["_id"] = str(contribution["_id"])
-        contribution["articleId"] = str(contribution["articleId"])
-        contribution["editorId"] = str(contribution["editorId"])
-    
-    for proposal in proposals:
-        proposal["_id"] = str(proposal["_id"])
-        proposal["articleId"] = str(proposal["articleId"])
-        proposal["proposerId"] = str(proposal["proposerId"])
-    
-    for reward in rewards:
-        reward["_id"] = str(reward["_id"])
-        reward["userId"] = str(reward["userId"])
+    # The lists change with the user's articles, edits, proposals, rewards
+    # and votes; those writes invalidate the user's tag
+    profile_lists = await cache.get_or_compute(
+        f"user_profile:{profile_user['_id']}:{articles_skip}:{articles_limit}:"
+        f"{contributions_skip}:{contributions_limit}:{proposals_skip}:{proposals_limit}:"
+        f"{rewards_skip}:{rewards_limit}",
+        partial(
+            build_profile_lists, db, profile_user["_id"],
+            articles_skip, articles_limit, contributions_skip, contributions_limit,
+            proposals_skip, proposals_limit, rewards_skip, rewards_limit
+        ),
+        300,
+        tags=[user_tag(profile_user["_id"])]
+    )
     
     # Convert profile user ID to string
     profile_user["_id"] = str(profile_user["_id"])
@@ -200,14 +255,7 @@ async def profile_page(
             "current_user": current_user,
             "is_self": is_self,
             "active_tab": tab or "overview",
-            "articles": articles,
-            "contributions": contributions,
-            "proposals": proposals,
-            "rewards": rewards,
-            "total_articles": total_articles,
-            "total_contributions": total_contributions, 
-            "total_proposals": total_proposals,
-            "total_rewards": total_rewards,
+            **profile_lists,
             "articles_skip": articles_skip,
             "articles_limit": articles_limit,
             "contributions_skip": contributions_skip,
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# File: rerender_articles.py
+"""
+Bulk re-render script for article HTML.
+Run this from the project root directory after a parser or template change.
+
+Articles are streamed from MongoDB in _id order, rendered across a process
+pool and written back with batched bulk_write calls. Progress is saved to a
+checkpoint file after every batch so an interrupted run can be resumed.
+
+Usage:
+    python rerender_articles.py [--workers 4] [--batch-size 200] [--force] [--restart]
+"""
+import asyncio
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+# Load environment variables
+load_dotenv()
+
+from utils.wiki_parser import (
+    parse_wiki_markup,
+    compile_template,
+    transclude_templates,
+    normalize_template_name,
+    PARSER_VERSION
+)
+from services.links import iter_link_targets, checked_link_target, page_key
+
+DEFAULT_CHECKPOINT = ".rerender_checkpoint.json"
+
+# Compiled Template: pages and existing page keys, set once per worker
+# process by init_worker
+_templates: Dict[str, list] = {}
+_pages: Set[str] = set()
+
+def init_worker(templates: Dict[str, list], pages: Set[str]) -> None:
+    """Store the compiled templates and existing pages in a worker process."""
+    global _templates, _pages
+    _templates = templates
+    _pages = pages
+
+def render_source(source: str) -> Tuple[str, List[str]]:
+    """
+    Render article source markup to HTML (runs in a worker process).
+
+    Args:
+        source: The article's wiki markup
+
+    Returns:
+        Tuple[str, List[str]]: The rendered HTML and the templates it transcludes
+    """
+    used = set()
+    expanded = transclude_templates(source, _templates, used) if _templates else source
+
+    # Red links are decided from the page set loaded at startup
+    missing = set()
+    for target in iter_link_targets(expanded):
+        normalized = checked_link_target(target)
+        if normalized is not None and page_key(*normalized) not in _pages:
+            missing.add(target)
+
+    html, _ = parse_wiki_markup(source, _templates, missing)
+    return html, sorted(used)
+
+async def load_templates(db) -> Dict[str, list]:
+    """
+    Compile every Template: page.
+
+    Args:
+        db: Database connection
+
+    Returns:
+        Dict[str, list]: Compiled templates by normalized name
+    """
+    templates = {}
+    cursor = db["articles"].find(
+        {"namespace": "Template", "status": {"$ne": "deleted"}},
+        {"title": 1, "source": 1, "content": 1}
+    )
+    async for page in cursor:
+        source = page.get("source")
+        if source is None:
+            source = page.get("content", "")
+        templates[normalize_template_name(page["title"])] = compile_template(source)
+    return templates
+
+async def load_pages(db) -> Set[str]:
+    """
+    Collect the keys of every existing page, for red links.
+
+    Args:
+        db: Database connection
+
+    Returns:
+        Set[str]: Page keys (see services.links.page_key)
+    """
+    pages = set()
+    cursor = db["articles"].find({"status": {"$ne": "deleted"}}, {"_id": 0, "namespace": 1, "title": 1})
+    async for page in cursor:
+        pages.add(page_key(page.get("namespace") or "", page["title"]))
+    return pages
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a checkpoint written by a previous run for the current parser version.
+
+    Args:
+        path: Checkpoint file path
+
+    Returns:
+        Optional[Dict[str, Any]]: The checkpoint, or None if there is nothing to resume
+    """
+    if not os.path.exists(path):
+        return None
+
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+
+    if checkpoint.get("parser_version") != PARSER_VERSION:
+        print(f"⚠️  Ignoring checkpoint for parser version {checkpoint.get('parser_version')}")
+        return None
+
+    return checkpoint
+
+def save_checkpoint(path: str, last_id: ObjectId, stats: Dict[str, Any]) -> None:
+    """
+    Atomically write the checkpoint file.
+
+    Args:
+        path: Checkpoint file path
+        last_id: _id of the last article in the completed batch
+        stats: Running totals
+    """
+    checkpoint = {
+        "parser_version": PARSER_VERSION,
+        "last_id": str(last_id),
+        "processed": stats["processed"],
+        "updated": stats["updated"],
+        "saved_at": datetime.now().isoformat()
+    }
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, path)
+
+def build_query(force: bool, adopt_content: bool, after: Optional[ObjectId]) -> Dict[str, Any]:
+    """
+    Build the article selection query.
+
+    Args:
+        force: Re-render articles already at the current parser version
+        adopt_content: Treat content as source for articles saved without source
+        after: Resume after this _id
+
+    Returns:
+        Dict[str, Any]: MongoDB filter
+    """
+    query: Dict[str, Any] = {}
+
+    if not adopt_content:
+        query["source"] = {"$exists": True}
+    if not force:
+        query["parserVersion"] = {"$ne": PARSER_VERSION}
+    if after is not None:
+        query["_id"] = {"$gt": after}
+
+    return query
+
+async def render_batch(loop, pool: ProcessPoolExecutor, articles: List[Dict[str, Any]]) -> List[UpdateOne]:
+    """
+    Render a batch of articles in the process pool and build the write operations.
+
+    Each update is conditional on the source and parser version that were
+    read, so articles edited during the run are left untouched.
+
+    Args:
+        loop: The running event loop
+        pool: Worker pool
+        articles: Article documents with _id, source/content and parserVersion
+
+    Returns:
+        List[UpdateOne]: Bulk write operations
+    """
+    sources = [
+        article["source"] if article.get("source") is not None else article.get("content") or ""
+        for article in articles
+    ]
+    rendered = await asyncio.gather(*[
+        loop.run_in_executor(pool, render_source, source) for source in sources
+    ])
+
+    now = datetime.now()
+    operations = []
+    for article, source, (html, templates) in zip(articles, sources, rendered):
+        match = {"_id": article["_id"], "parserVersion": article.get("parserVersion")}
+        if article.get("source") is not None:
+            match["source"] = source
+        else:
+            match["source"] = {"$exists": False}
+            match["content"] = source
+
+        operations.append(UpdateOne(match, {"$set": {
+            "content": html,
+            "source": source,
+            "parserVersion": PARSER_VERSION,
+            "templates": templates,
+            "renderedAt": now
+        }}))
+
+    return operations
+
+async def rerender_articles(args):
+    """Run the bulk re-render."""
+
+    # Database connection
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+    db_name = os.getenv("DB_NAME", "kryptopedia")
+
+    client = AsyncIOMotorClient(mongo_uri)
+    db = client[db_name]
+
+    print("🚀 Starting bulk re-render...")
+    print(f"📁 Database: {db_name}")
+    print(f"🔧 Parser version: {PARSER_VERSION}, workers: {args.workers}, batch size: {args.batch_size}")
+
+    stats = {
+        "processed": 0,
+        "updated": 0,
+        "batches": 0,
+        "errors": []
+    }
+
+    after = None
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    else:
+        checkpoint = load_checkpoint(args.checkpoint)
+        if checkpoint:
+            after = ObjectId(checkpoint["last_id"])
+            stats["processed"] = checkpoint["processed"]
+            stats["updated"] = checkpoint["updated"]
+            print(f"⏩ Resuming after {after} ({stats['processed']} articles already processed)")
+
+    query = build_query(args.force, args.adopt_content, after)
+    total = stats["processed"] + await db["articles"].count_documents(query)
+    print(f"📊 {total} articles to re-render")
+
+    templates = await load_templates(db)
+    print(f"🧩 {len(templates)} templates loaded")
+    pages = await load_pages(db)
+    print(f"📚 {len(pages)} pages indexed for red links")
+
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    run_processed = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker, initargs=(templates, pages)) as pool:
+            cursor = db["articles"].find(
+                query,
+                {"_id": 1, "source": 1, "content": 1, "parserVersion": 1}
+            ).sort("_id", 1).batch_size(args.batch_size)
+
+            batch: List[Dict[str, Any]] = []
+            async for article in cursor:
+                batch.append(article)
+                if len(batch) >= args.batch_size:
+                    run_processed += await process_batch(db, loop, pool, batch, stats, args)
+                    report_progress(stats, total, run_processed, started)
+                    batch = []
+
+            if batch:
+                run_processed += await process_batch(db, loop, pool, batch, stats, args)
+                report_progress(stats, total, run_processed, started)
+
+        # Completed runs leave nothing to resume
+        if os.path.exists(args.checkpoint) and not stats["errors"]:
+            os.remove(args.checkpoint)
+
+        elapsed = time.monotonic() - started
+        print(f"\n✅ Re-render completed in {elapsed:.1f}s!")
+        print(f"   • Articles processed: {stats['processed']}")
+        print(f"   • Articles updated: {stats['updated']}")
+        print(f"   • Batches written: {stats['batches']}")
+        print(f"   • Errors: {len(stats['errors'])}")
+
+        if stats["errors"]:
+            print(f"\n❌ Errors encountered:")
+            for error in stats["errors"]:
+                print(f"   • {error}")
+
+    except KeyboardInterrupt:
+        print(f"\n⏸️  Interrupted; rerun to resume from {args.checkpoint}")
+
+    except Exception as e:
+        print(f"❌ Re-render failed: {str(e)}")
+        print(f"   Rerun to resume from {args.checkpoint}")
+
+    finally:
+        client.close()
+
+async def process_batch(db, loop, pool, batch, stats, args) -> int:
+    """
+    Render and write one batch, then record the checkpoint.
+
+    Returns:
+        int: Number of articles in the batch
+    """
+    try:
+        operations = await render_batch(loop, pool, batch)
+        if not args.dry_run:
+            result = await db["articles"].bulk_write(operations, ordered=False)
+            stats["updated"] += result.modified_count
+    except Exception as e:
+        # Keep going; the checkpoint stops advancing so a later run retries this batch
+        error_msg = f"Batch ending at {batch[-1]['_id']} failed: {str(e)}"
+        stats["errors"].append(error_msg)
+        print(f"❌ {error_msg}")
+
+    stats["processed"] += len(batch)
+    stats["batches"] += 1
+    if not args.dry_run and not stats["errors"]:
+        save_checkpoint(args.checkpoint, batch[-1]["_id"], stats)
+
+    return len(batch)
+
+def report_progress(stats: Dict[str, Any], total: int, run_processed: int, started: float) -> None:
+    """Print progress and throughput."""
+    elapsed = max(time.monotonic() - started, 1e-6)
+    rate = run_processed / elapsed
+    remaining = max(total - stats["processed"], 0)
+    eta = remaining / rate if rate else 0
+    percent = (stats["processed"] / total * 100) if total else 100
+    print(
+        f"⏳ {stats['processed']}/{total} ({percent:.1f}%) • "
+        f"{rate:.1f} articles/s • ETA {eta:.0f}s"
+    )
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Re-render stored article HTML with the current parser")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    parser.add_argument("--batch-size", type=int, default=200, help="Articles per bulk write")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file for resuming")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--force", action="store_true", help="Also re-render articles already at the current parser version")
+    parser.add_argument(
+        "--adopt-content",
+        action="store_true",
+        help="For articles saved without source, treat content as the source markup"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Render without writing results")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(rerender_articles(parse_arguments()))
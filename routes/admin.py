@@ -8,13 +8,66 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Body, Path
 from typing import Dict, Any, List, Optional
 from bson import ObjectId
 from datetime import datetime, timedelta
+from functools import partial
 import logging
 
 from dependencies import get_db, get_current_admin, get_cache
+from services.cache import CACHE_CATEGORIES
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+async def build_admin_statistics(db) -> Dict[str, Any]:
+    """
+    Compute the admin dashboard statistics.
+    
+    Args:
+        db: Database connection
+        
+    Returns:
+        Dict[str, Any]: Article, user and activity counts
+    """
+    # Calculate statistics
+    statistics = {}
+    
+    # Article stats
+    statistics["total_articles"] = await db["articles"].count_documents({})
+    statistics["published_articles"] = await db["articles"].count_documents({"status": "published"})
+    statistics["draft_articles"] = await db["articles"].count_documents({"status": "draft"})
+    statistics["hidden_articles"] = await db["articles"].count_documents({"status": "hidden"})
+    statistics["archived_articles"] = await db["articles"].count_documents({"status": "archived"})
+    
+    # User stats
+    statistics["total_users"] = await db["users"].count_documents({})
+    statistics["admin_users"] = await db["users"].count_documents({"role": "admin"})
+    statistics["editor_users"] = await db["users"].count_documents({"role": "editor"})
+    statistics["regular_users"] = await db["users"].count_documents({"role": "user"})
+    
+    # Activity stats
+    statistics["total_edits"] = await db["revisions"].count_documents({})
+    statistics["total_proposals"] = await db["proposals"].count_documents({})
+    statistics["pending_proposals"] = await db["proposals"].count_documents({"status": "pending"})
+    
+    # Recent activity (last 24 hours)
+    recent_revisions = await db["revisions"].count_documents({
+        "createdAt": {"$gte": datetime.now() - timedelta(days=1)}
+    })
+    recent_proposals = await db["proposals"].count_documents({
+        "proposedAt": {"$gte": datetime.now() - timedelta(days=1)}
+    })
+    recent_users = await db["users"].count_documents({
+        "joinDate": {"$gte": datetime.now() - timedelta(days=1)}
+    })
+    
+    statistics["recent_activity"] = {
+        "revisions": recent_revisions,
+        "proposals": recent_proposals,
+        "users": recent_users,
+        "total": recent_revisions + recent_proposals + recent_users
+    }
+    
+    return statistics
+
 @router.get("/statistics")
 async def get_admin_statistics(
     current_user: Dict[str, Any] = Depends(get_current_admin),
@@ -25,56 +78,12 @@ async def get_admin_statistics(
     Get dashboard statistics for the admin dashboard.
     """
     try:
-        # Check if stats are cached
-        cache_key = "admin_dashboard_stats"
-        cached_stats = await cache.get(cache_key)
-        
-        if cached_stats:
-            return cached_stats
-        
-        # Calculate statistics
-        statistics = {}
-        
-        # Article stats
-        statistics["total_articles"] = await db["articles"].count_documents({})
-        statistics["published_articles"] = await db["articles"].count_documents({"status": "published"})
-        statistics["draft_articles"] = await db["articles"].count_documents({"status": "draft"})
-        statistics["hidden_articles"] = await db["articles"].count_documents({"status": "hidden"})
-        statistics["archived_articles"] = await db["articles"].count_documents({"status": "archived"})
-        
-        # User stats
-        statistics["total_users"] = await db["users"].count_documents({})
-        statistics["admin_users"] = await db["users"].count_documents({"role": "admin"})
-        statistics["editor_users"] = await db["users"].count_documents({"role": "editor"})
-        statistics["regular_users"] = await db["users"].count_documents({"role": "user"})
-        
-        # Activity stats
-        statistics["total_edits"] = await db["revisions"].count_documents({})
-        statistics["total_proposals"] = await db["proposals"].count_documents({})
-        statistics["pending_proposals"] = await db["proposals"].count_documents({"status": "pending"})
-        
-        # Recent activity (last 24 hours)
-        recent_revisions = await db["revisions"].count_documents({
-            "createdAt": {"$gte": datetime.now() - timedelta(days=1)}
-        })
-        recent_proposals = await db["proposals"].count_documents({
-            "proposedAt": {"$gte": datetime.now() - timedelta(days=1)}
-        })
-        recent_users = await db["users"].count_documents({
-            "joinDate": {"$gte": datetime.now() - timedelta(days=1)}
-        })
-        
-        statistics["recent_activity"] = {
-            "revisions": recent_revisions,
-            "proposals": recent_proposals,
-            "users": recent_users,
-            "total": recent_revisions + recent_proposals + recent_users
-        }
-        
-        # Cache results for 5 minutes
-        await cache.set(cache_key, statistics, 300)
-        
-        return statistics
+        # Concurrent requests at expiry share one computation
+        return await cache.get_or_compute(
+            "admin_dashboard_stats",
+            partial(build_admin_statistics, db),
+            300  # Cache results for 5 minutes
+        )
     except Exception as e:
         logger.error(f"Error getting admin statistics: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get statistics: {str(e)}")
@@ -224,13 +233,21 @@ async def delete_user(
 
 @router.post("/cache/clear")
 async def clear_cache(
+    category: Optional[str] = Query(None, description="Only clear one category: " + ", ".join(CACHE_CATEGORIES)),
     current_user: Dict[str, Any] = Depends(get_current_admin),
     cache=Depends(get_cache)
 ):
     """
-    Clear the application cache (admin only).
+    Clear the application cache, or one category of it (admin only).
     """
+    if category is not None and category not in CACHE_CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Unknown cache category: {category}")
+    
     try:
+        if category is not None:
+            deleted = await cache.clear_prefix(CACHE_CATEGORIES[category])
+            return {"message": f"Cleared {deleted} {category} cache entries", "deleted": deleted}
+        
         # Clear cache
         result = await cache.clear()
         
@@ -238,6 +255,8 @@ async def clear_cache(
             return {"message": "Cache cleared successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to clear cache")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error clearing cache: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to clear cache: {str(e)}")
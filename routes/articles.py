@@ -2,16 +2,31 @@
 """
 Article API routes with namespace support.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, BackgroundTasks
 from bson import ObjectId
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from models.article import Article, ArticleCreate, ArticleUpdate, parse_title_namespace
 from models.base import PyObjectId
-from dependencies import get_db, get_current_user
+from dependencies import get_db, get_current_user, get_cache
 from utils.slug import generate_namespace_slug
-from utils.wiki_parser import parse_wiki_markup, extract_categories_from_content
+from utils.wiki_parser import extract_categories_from_content
+from services.cache import ARTICLE_LISTINGS, CATEGORY_LISTINGS, article_tag, user_tag
+from services.render import (
+    RenderTimeoutError,
+    article_render_fields,
+    needs_rerender,
+    rerender_article
+)
+from services.templates import render_with_templates, rerender_template_dependents, template_registry, TEMPLATE_NAMESPACE
+from services.links import (
+    update_article_links,
+    remove_article_links,
+    get_backlinks,
+    page_index,
+    rerender_link_sources
+)
 from utils.namespace import (
     is_valid_namespace, 
     get_namespace_info, 
@@ -24,8 +39,10 @@ router = APIRouter(prefix="/api/articles", tags=["articles"])
 @router.post("/", response_model=Article)
 async def create_article(
     article_data: ArticleCreate,
+    background_tasks: BackgroundTasks,
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    cache=Depends(get_cache)
 ):
     """
     Create a new article with namespace support and duplicate prevention.
@@ -81,13 +98,17 @@ async def create_article(
         slug_counter += 1
     
     # Parse wiki markup
-    parsed_content, short_description = parse_wiki_markup(article_data.content)
+    try:
+        parsed_content, short_description, used_templates = await render_with_templates(db, article_data.content)
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     # Create article document
     article_dict = article_data.model_dump(by_alias=True)
     article_dict.update({
         "slug": slug,
-        "content": parsed_content,  # Store parsed HTML
+        # Store parsed HTML together with the source markup
+        **article_render_fields(article_data.content, parsed_content, used_templates),
         "summary": short_description or article_data.summary,
         "createdBy": current_user["_id"],
         "createdAt": datetime.now(),
@@ -102,10 +123,25 @@ async def create_article(
     # Insert into database
     result = await db["articles"].insert_one(article_dict)
     
+    # Record outgoing links for "What links here" and red-link checks
+    await update_article_links(db, result.inserted_id, article_data.content)
+    
+    # Red links to the new page turn blue
+    page_index.add(article_data.namespace, article_data.title)
+    background_tasks.add_task(rerender_link_sources, db, article_data.namespace, article_data.title, cache)
+    
     # Update category counts for any categories used
     for category_name in article_data.categories:
         await update_category_counts_for_article_change(db, category_name)
     
+    # Listings and the author's profile now include the new article
+    await cache.invalidate_tags([ARTICLE_LISTINGS, CATEGORY_LISTINGS, user_tag(current_user["_id"])])
+    
+    # A new template may fill in calls that previously had no page
+    if article_data.namespace == TEMPLATE_NAMESPACE:
+        template_registry.invalidate(article_data.title)
+        background_tasks.add_task(rerender_template_dependents, db, article_data.title, cache)
+    
     # Retrieve and return created article
     created_article = await db["articles"].find_one({"_id": result.inserted_id})
     return created_article
@@ -224,8 +260,10 @@ async def list_articles(
 
 @router.get("/{article_id}", response_model=Article)
 async def get_article(
+    background_tasks: BackgroundTasks,
     article_id: str = Path(..., description="Article ID or slug"),
-    db=Depends(get_db)
+    db=Depends(get_db),
+    cache=Depends(get_cache)
 ):
     """
     Get a single article by ID or slug, with support for namespace:title format.
@@ -279,14 +317,20 @@ async def get_article(
         {"$inc": {"views": 1}}
     )
     
+    # Refresh HTML rendered by an older parser after responding
+    if needs_rerender(article):
+        background_tasks.add_task(rerender_article, db, article, cache)
+    
     return article
 
 @router.put("/{article_id}", response_model=Article)
 async def update_article(
     article_id: str,
     article_update: ArticleUpdate,
+    background_tasks: BackgroundTasks,
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    cache=Depends(get_cache)
 ):
     """
     Update an existing article.
@@ -357,8 +401,13 @@ async def update_article(
     
     # Handle content changes
     if article_update.content is not None:
-        parsed_content, short_description = parse_wiki_markup(article_update.content)
-        update_data["content"] = parsed_content
+        try:
+            parsed_content, short_description, used_templates = await render_with_templates(
+                db, article_update.content
+            )
+        except RenderTimeoutError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        update_data.update(article_render_fields(article_update.content, parsed_content, used_templates))
         
         # Update summary with short description if found
         if short_description:
@@ -394,11 +443,43 @@ async def update_article(
         {"$set": update_data}
     )
     
+    # Only the links that were added or removed are written
+    if article_update.content is not None:
+        await update_article_links(db, ObjectId(article_id), article_update.content)
+    
+    # A rename or (un)deletion changes which links to this page are red
+    old_page = (existing_article.get("namespace", ""), existing_article["title"])
+    new_page = (update_data.get("namespace", old_page[0]), update_data.get("title", old_page[1]))
+    was_deleted = existing_article.get("status") == "deleted"
+    is_deleted = update_data.get("status", existing_article.get("status")) == "deleted"
+    if old_page != new_page or was_deleted != is_deleted:
+        page_index.discard(*old_page)
+        if not is_deleted:
+            page_index.add(*new_page)
+        for namespace, title in {old_page, new_page}:
+            background_tasks.add_task(rerender_link_sources, db, namespace, title, cache)
+    
     # Update category counts for changed categories
     affected_categories = set(old_categories + new_categories)
     for category_name in affected_categories:
         await update_category_counts_for_article_change(db, category_name)
     
+    # Purge the cached article under both its id and slug, the listings and the author's profile
+    tags = [article_tag(article_id), ARTICLE_LISTINGS, CATEGORY_LISTINGS]
+    if existing_article.get("createdBy"):
+        tags.append(user_tag(existing_article["createdBy"]))
+    await cache.invalidate_tags(tags)
+    
+    # Re-render only the articles that transclude an edited template
+    template_titles = set()
+    if existing_article.get("namespace") == TEMPLATE_NAMESPACE:
+        template_titles.add(existing_article["title"])
+    if update_data.get("namespace", existing_article.get("namespace")) == TEMPLATE_NAMESPACE:
+        template_titles.add(update_data.get("title", existing_article["title"]))
+    for template_title in template_titles:
+        template_registry.invalidate(template_title)
+        background_tasks.add_task(rerender_template_dependents, db, template_title, cache)
+    
     # Return updated article
     updated_article = await db["articles"].find_one({"_id": ObjectId(article_id)})
     return updated_article
@@ -406,8 +487,10 @@ async def update_article(
 @router.delete("/{article_id}")
 async def delete_article(
     article_id: str,
+    background_tasks: BackgroundTasks,
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    cache=Depends(get_cache)
 ):
     """
     Delete an article (soft delete by setting status to 'deleted').
@@ -429,8 +512,46 @@ async def delete_article(
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Article not found")
     
+    await remove_article_links(db, ObjectId(article_id))
+    tags = [article_tag(article_id), ARTICLE_LISTINGS, CATEGORY_LISTINGS]
+    deleted = await db["articles"].find_one({"_id": ObjectId(article_id)}, {"createdBy": 1})
+    if deleted and deleted.get("createdBy"):
+        tags.append(user_tag(deleted["createdBy"]))
+    await cache.invalidate_tags(tags)
+    
+    # Links to the deleted page turn red
+    article = await db["articles"].find_one({"_id": ObjectId(article_id)}, {"namespace": 1, "title": 1})
+    if article:
+        page_index.discard(article.get("namespace", ""), article["title"])
+        background_tasks.add_task(rerender_link_sources, db, article.get("namespace", ""), article["title"], cache)
+    
     return {"message": "Article deleted successfully"}
 
+@router.get("/{page_title}/backlinks", response_model=List[Dict[str, Any]])
+async def list_backlinks(
+    page_title: str = Path(..., description="Full page title, e.g. Help:Editing or Bitcoin_Basics"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db=Depends(get_db)
+):
+    """
+    List the articles linking to a page ("What links here").
+    
+    The page does not need to exist, so links to missing pages can be listed too.
+    """
+    namespace, title = parse_title_namespace(page_title.replace("_", " "))
+    backlinks = await get_backlinks(db, namespace, title, skip=skip, limit=limit)
+    
+    return [
+        {
+            "_id": str(article["_id"]),
+            "title": article["title"],
+            "namespace": article.get("namespace", ""),
+            "slug": article.get("slug")
+        }
+        for article in backlinks
+    ]
+
 @router.get("/namespace/{namespace}")
 async def list_articles_by_namespace(
     namespace: str,
@@ -9,9 +9,10 @@ from datetime import datetime
 
 from models.category import Category, CategoryCreate, CategoryUpdate, CategoryWithArticles
 from models.base import PyObjectId
-from dependencies import get_db, get_current_user
+from dependencies import get_db, get_current_user, get_cache
+from services.cache import CATEGORY_LISTINGS
 from utils.slug import generate_slug
-from utils.wiki_parser import parse_wiki_markup
+from services.render import render_wiki_markup
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
@@ -19,7 +20,8 @@ router = APIRouter(prefix="/api/categories", tags=["categories"])
 async def create_category(
     category_data: CategoryCreate,
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    cache=Depends(get_cache)
 ):
     """
     Create a new category with description content.
@@ -40,7 +42,7 @@ async def create_category(
     slug = generate_slug(category_data.name, timestamp)
     
     # Parse description content as wiki markup
-    parsed_description, _ = parse_wiki_markup(category_data.description)
+    parsed_description, _ = await render_wiki_markup(category_data.description)
     
     # Create category document
     category_dict = category_data.model_dump(by_alias=True)
@@ -63,6 +65,9 @@ async def create_category(
     if category_data.parent_category:
         await update_category_counts(db, category_data.parent_category)
     
+    # Drop cached category listings and pages
+    await cache.invalidate_tag(CATEGORY_LISTINGS)
+    
     # Retrieve and return created category
     created_category = await db["categories"].find_one({"_id": result.inserted_id})
     return created_category
@@ -169,7 +174,8 @@ async def update_category(
     category_id: str,
     category_update: CategoryUpdate,
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    cache=Depends(get_cache)
 ):
     """
     Update an existing category.
@@ -207,7 +213,7 @@ async def update_category(
     
     # Handle description changes
     if category_update.description is not None:
-        parsed_description, _ = parse_wiki_markup(category_update.description)
+        parsed_description, _ = await render_wiki_markup(category_update.description)
         update_data["description"] = parsed_description
     
     # Handle other fields
@@ -236,6 +242,9 @@ async def update_category(
         if new_parent:
             await update_category_counts(db, new_parent)
     
+    # Drop cached category listings and pages
+    await cache.invalidate_tag(CATEGORY_LISTINGS)
+    
     # Return updated category
     updated_category = await db["categories"].find_one({"_id": ObjectId(category_id)})
     return updated_category
@@ -245,7 +254,8 @@ async def delete_category(
     category_id: str,
     force: bool = Query(False, description="Force delete even if category has articles"),
     db=Depends(get_db),
-    current_user=Depends(get_current_user)
+    current_user=Depends(get_current_user),
+    cache=Depends(get_cache)
 ):
     """
     Delete a category (soft delete by setting status to 'deleted').
@@ -298,6 +308,9 @@ async def delete_category(
     if category.get("parent_category"):
         await update_category_counts(db, category["parent_category"])
     
+    # Drop cached category listings and pages
+    await cache.invalidate_tag(CATEGORY_LISTINGS)
+    
     return {"message": "Category deleted successfully"}
 
 @router.post("/{category_name}/refresh-counts")
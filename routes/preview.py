@@ -2,19 +2,29 @@
 Preview-related routes for the Kryptopedia application.
 """
 from fastapi import APIRouter, Depends, HTTPException, Body
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from functools import partial
+import hashlib
 import logging
 
-from utils.wiki_parser import parse_wiki_markup
-from dependencies import get_current_user
+from services.render import render_cache, RenderTimeoutError
+from services.templates import template_registry
+from services.links import find_missing_links, page_index
+from dependencies import get_current_user, get_cache, get_db
+from utils.wiki_parser import PARSER_VERSION
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# How long the section state of a previewed document is kept for patching
+SECTION_STATE_TTL = 900
+
 @router.post("/preview")
 async def preview_wiki_markup(
     data: Dict[str, Any] = Body(...),
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    cache=Depends(get_cache),
+    db=Depends(get_db)
 ):
     """
     Generate HTML preview of wiki markup.
@@ -23,8 +33,14 @@ async def preview_wiki_markup(
         - content: The wiki markup content
         - summary: Optional article summary for short description
         - proposalSummary: Optional context for proposal previews
+        - sections: If true, also return per-section HTML fragments and a base_hash
+        - base_hash, section, section_content: Re-render only one section of a
+          previously previewed document (see preview_section_patch)
     """
     try:
+        if data.get("base_hash") is not None:
+            return await preview_section_patch(data, cache, db)
+
         content = data.get("content")
         if not content:
             raise HTTPException(status_code=400, detail="Content is required")
@@ -37,14 +53,33 @@ async def preview_wiki_markup(
         if summary and not content.startswith("{{Short description|"):
             content = f"{{{{Short description|{summary}}}}}\n\n{content}"
         
-        # Parse wiki markup
-        html, short_description = parse_wiki_markup(content)
-        
-        # Prepare response with both HTML and extracted short description
-        response = {
-            "html": html,
-            "short_description": short_description
-        }
+        if data.get("sections"):
+            templates, missing_links = await resolve_render_context(db, content)
+            sections, fragments, short_description = await render_cache.render_sections(
+                content, templates, missing_links
+            )
+            base_hash = await save_section_state(cache, sections, fragments, short_description)
+            response = {
+                "html": "\n".join(fragments),
+                "short_description": short_description,
+                "base_hash": base_hash,
+                "sections": fragments
+            }
+        else:
+            # Parse wiki markup, reusing earlier renders of identical content.
+            # Templates and red links are only looked up on a cache miss.
+            html, short_description = await render_cache.render_resolved(
+                content,
+                partial(resolve_render_context, db, content),
+                f"t{template_registry.version}.p{page_index.version}",
+                shared_cache=cache
+            )
+            
+            # Prepare response with both HTML and extracted short description
+            response = {
+                "html": html,
+                "short_description": short_description
+            }
         
         # If this is a proposal preview, add context
         proposal_summary = data.get("proposalSummary")
@@ -56,6 +91,128 @@ async def preview_wiki_markup(
         return response
     except HTTPException:
         raise
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating preview: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate preview: {str(e)}")
+
+async def preview_section_patch(data: Dict[str, Any], cache, db=None) -> Dict[str, Any]:
+    """
+    Re-render one edited section of a previously previewed document.
+
+    The edited section may add or remove headings, so the result is described
+    as a splice: replace.old_count sections starting at replace.start become
+    replace.new_count sections. fragments holds the HTML of every section (by
+    new index) whose output changed, including sections whose reference
+    numbers or reference list moved.
+
+    Args:
+        data: Request body with base_hash, section and section_content
+        cache: Cache holding the section state of previewed documents
+        db: Optional database connection for loading templates
+
+    Returns:
+        Dict[str, Any]: The new base_hash, the splice and the changed fragments
+    """
+    state = await cache.get(f"preview:sections:{data['base_hash']}")
+    if not state:
+        raise HTTPException(
+            status_code=409,
+            detail="Unknown or expired base_hash; send the full content with sections=true"
+        )
+
+    old_sections: List[str] = state["sections"]
+    old_fragments: List[str] = state["fragments"]
+
+    try:
+        index = int(data.get("section"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Section index is required")
+    if not 0 <= index < len(old_sections):
+        raise HTTPException(status_code=400, detail=f"Section index out of range: {index}")
+
+    section_content = data.get("section_content")
+    if section_content is None:
+        raise HTTPException(status_code=400, detail="Section content is required")
+
+    body = "\n".join(old_sections[:index] + [section_content] + old_sections[index + 1:])
+    templates, missing_links = await resolve_render_context(db, body)
+    sections, fragments, short_description = await render_cache.render_sections(body, templates, missing_links)
+    short_description = short_description or state.get("short_description")
+    base_hash = await save_section_state(cache, sections, fragments, short_description)
+
+    # Align unchanged sections at both ends of the document
+    limit = min(len(sections), len(old_sections))
+    prefix = 0
+    while prefix < limit and sections[prefix] == old_sections[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and sections[-1 - suffix] == old_sections[-1 - suffix]:
+        suffix += 1
+
+    changed = []
+    offset = len(old_sections) - len(sections)
+    for i, fragment in enumerate(fragments):
+        old_index: Optional[int] = None
+        if i < prefix:
+            old_index = i
+        elif i >= len(sections) - suffix:
+            old_index = i + offset
+        if old_index is None or old_fragments[old_index] != fragment:
+            changed.append({"index": i, "html": fragment})
+
+    return {
+        "base_hash": base_hash,
+        "short_description": short_description,
+        "section_count": len(sections),
+        "replace": {
+            "start": prefix,
+            "old_count": len(old_sections) - prefix - suffix,
+            "new_count": len(sections) - prefix - suffix
+        },
+        "fragments": changed
+    }
+
+async def resolve_render_context(db, markup: str) -> Tuple[Dict[str, list], frozenset]:
+    """
+    Load the templates and red links markup is rendered with.
+
+    Args:
+        db: Database connection, or None to render without either
+        markup: The wiki markup
+
+    Returns:
+        Tuple[Dict[str, list], frozenset]: Compiled templates and red link targets
+    """
+    if db is None:
+        return {}, frozenset()
+    templates = await template_registry.resolve(db, markup)
+    return templates, await find_missing_links(db, markup, templates)
+
+async def save_section_state(
+    cache,
+    sections: List[str],
+    fragments: List[str],
+    short_description: Optional[str]
+) -> str:
+    """
+    Store the sections and fragments of a previewed document for later patches.
+
+    Args:
+        cache: The cache service
+        sections: Section sources from split_sections
+        fragments: The rendered fragment of each section
+        short_description: The document's short description (if any)
+
+    Returns:
+        str: The base_hash identifying this state
+    """
+    digest = hashlib.sha256("\n".join(sections).encode("utf-8")).hexdigest()
+    base_hash = f"v{PARSER_VERSION}:{digest}"
+    await cache.set(
+        f"preview:sections:{base_hash}",
+        {"sections": sections, "fragments": fragments, "short_description": short_description},
+        SECTION_STATE_TTL
+    )
+    return base_hash
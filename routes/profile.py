@@ -9,7 +9,7 @@ from typing import Optional, Dict, Any
 import logging
 
 import config
-from dependencies import get_db, get_current_user, get_cache
+from dependencies import get_db, get_current_user, get_cache, get_loaders
 from utils.security import verify_password, hash_password
 
 router = APIRouter()
@@ -30,6 +30,7 @@ async def profile_page(
     rewards_skip: int = Query(0, ge=0),
     rewards_limit: int = Query(10, ge=1, le=50),
     db=Depends(get_db),
+    loaders=Depends(get_loaders),
     current_user: Optional[Dict[str, Any]] = Depends(get_current_user)
 ):
     """
@@ -66,10 +67,26 @@ async def profile_page(
     contributions = await contributions_cursor.to_list(length=contributions_limit)
     contributions_total = await db["revisions"].count_documents({"createdBy": user["_id"]})
     
+    # Get user's proposals
+    proposals_cursor = db["proposals"].find({"proposedBy": user["_id"]}).sort("proposedAt", -1).skip(proposals_skip).limit(proposals_limit)
+    proposals = await proposals_cursor.to_list(length=proposals_limit)
+    proposals_total = await db["proposals"].count_documents({"proposedBy": user["_id"]})
+    
+    # Get user's rewards
+    rewards_cursor = db["rewards"].find({"rewardedUser": user["_id"]}).sort("rewardedAt", -1).skip(rewards_skip).limit(rewards_limit)
+    rewards = await rewards_cursor.to_list(length=rewards_limit)
+    rewards_total = await db["rewards"].count_documents({"rewardedUser": user["_id"]})
+    
+    # Fetch the articles and rewarders of every tab in one query each
+    related_articles = await loaders.articles.load_many(
+        [item["articleId"] for item in contributions + proposals + rewards]
+    )
+    rewarders = await loaders.users.load_many(reward["rewardedBy"] for reward in rewards)
+    
     # Enhance contributions with article info
     enhanced_contributions = []
     for contribution in contributions:
-        article = await db["articles"].find_one({"_id": contribution["articleId"]})
+        article = related_articles.get(contribution["articleId"])
         if article:
             enhanced_contributions.append({
                 **contribution,
@@ -77,15 +94,10 @@ async def profile_page(
                 "articleSlug": article.get("slug")
             })
     
-    # Get user's proposals
-    proposals_cursor = db["proposals"].find({"proposedBy": user["_id"]}).sort("proposedAt", -1).skip(proposals_skip).limit(proposals_limit)
-    proposals = await proposals_cursor.to_list(length=proposals_limit)
-    proposals_total = await db["proposals"].count_documents({"proposedBy": user["_id"]})
-    
     # Enhance proposals with article info
     enhanced_proposals = []
     for proposal in proposals:
-        article = await db["articles"].find_one({"_id": proposal["articleId"]})
+        article = related_articles.get(proposal["articleId"])
         if article:
             enhanced_proposals.append({
                 **proposal,
@@ -93,16 +105,11 @@ async def profile_page(
                 "articleSlug": article.get("slug")
             })
     
-    # Get user's rewards
-    rewards_cursor = db["rewards"].find({"rewardedUser": user["_id"]}).sort("rewardedAt", -1).skip(rewards_skip).limit(rewards_limit)
-    rewards = await rewards_cursor.to_list(length=rewards_limit)
-    rewards_total = await db["rewards"].count_documents({"rewardedUser": user["_id"]})
-    
     # Enhance rewards with article and user info
     enhanced_rewards = []
     for reward in rewards:
-        article = await db["articles"].find_one({"_id": reward["articleId"]})
-        rewarder = await db["users"].find_one({"_id": reward["rewardedBy"]})
+        article = related_articles.get(reward["articleId"])
+        rewarder = rewarders.get(reward["rewardedBy"])
         
         if article and rewarder:
             enhanced_rewards.append({
@@ -2,14 +2,18 @@
 """
 Proposal-related routes for the Kryptopedia application.
 """
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status, BackgroundTasks
 from bson import ObjectId
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
 from models import Proposal, ProposalCreate
-from dependencies import get_db, get_current_user, get_current_editor, get_search, get_cache
+from dependencies import get_db, get_current_user, get_current_editor, get_search, get_cache, get_loaders
+from services.cache import ARTICLE_LISTINGS, article_tag, user_tag
+from services.render import article_render_fields, RenderTimeoutError
+from services.templates import render_with_templates, rerender_template_dependents, template_registry, TEMPLATE_NAMESPACE
+from services.links import update_article_links
 
 # Initialize router
 router = APIRouter()
@@ -20,7 +24,8 @@ async def create_proposal(
     article_id: str,
     proposal: ProposalCreate,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db),
+    cache=Depends(get_cache)
 ):
     """
     Create a new edit proposal for an article.
@@ -54,6 +59,9 @@ async def create_proposal(
         
         logger.info(f"Created proposal with ID: {result.inserted_id}")
         
+        # The proposer's profile lists their proposals
+        await cache.invalidate_tag(user_tag(current_user["_id"]))
+        
         # Return created proposal
         created_proposal = await db["proposals"].find_one({"_id": result.inserted_id})
         return created_proposal
@@ -74,7 +82,8 @@ async def get_article_proposals(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db),
+    loaders=Depends(get_loaders)
 ):
     """
     Get all proposals for an article.
@@ -98,16 +107,19 @@ async def get_article_proposals(
         proposals = await cursor.to_list(length=limit)
         
         # Enhance with user info
+        users = await loaders.users.load_many(
+            [prop["proposedBy"] for prop in proposals] + [prop.get("reviewedBy") for prop in proposals]
+        )
         enhanced_proposals = []
         for prop in proposals:
             # Get proposer info
-            proposer = await db["users"].find_one({"_id": prop["proposedBy"]})
+            proposer = users.get(prop["proposedBy"])
             proposer_username = proposer["username"] if proposer else "Unknown"
             
             # Get reviewer info if available
             reviewer_username = None
             if prop.get("reviewedBy"):
-                reviewer = await db["users"].find_one({"_id": prop["reviewedBy"]})
+                reviewer = users.get(prop["reviewedBy"])
                 reviewer_username = reviewer["username"] if reviewer else "Unknown"
             
             # Add to enhanced list
@@ -181,6 +193,7 @@ async def get_proposal(
 async def review_proposal(
     article_id: str,
     proposal_id: str,
+    background_tasks: BackgroundTasks,
     status: str = Query(..., regex="^(approved|rejected)$"),
     comment: Optional[str] = None,
     current_user: Dict[str, Any] = Depends(get_current_editor),
@@ -209,6 +222,14 @@ async def review_proposal(
         if proposal["status"] != "pending":
             raise HTTPException(status_code=400, detail=f"Proposal already {proposal['status']}")
         
+        # Render the proposed markup before the review is recorded, so a
+        # render timeout leaves the proposal pending
+        if status == "approved":
+            try:
+                parsed_content, _, used_templates = await render_with_templates(db, proposal["content"])
+            except RenderTimeoutError as e:
+                raise HTTPException(status_code=503, detail=str(e))
+        
         # Update proposal status
         await db["proposals"].update_one(
             {"_id": ObjectId(proposal_id)},
@@ -225,15 +246,16 @@ async def review_proposal(
             # Get the article
             article = await db["articles"].find_one({"_id": ObjectId(article_id)})
             
-            # Update the article content
+            # Update the article content with the rendered proposal
             await db["articles"].update_one(
                 {"_id": ObjectId(article_id)},
                 {"$set": {
-                    "content": proposal["content"],
+                    **article_render_fields(proposal["content"], parsed_content, used_templates),
                     "lastUpdatedAt": datetime.now(),
                     "lastUpdatedBy": proposal["proposedBy"]
                 }}
             )
+            await update_article_links(db, ObjectId(article_id), proposal["content"])
 # Create a revision
             revision = {
                 "articleId": ObjectId(article_id),
@@ -256,9 +278,12 @@ async def review_proposal(
             )
             
             # Invalidate cache
-            await cache.delete(f"article:{article_id}")
-            if article.get("slug"):
-                await cache.delete(f"article:{article['slug']}")
+            await cache.invalidate_tags([article_tag(article_id), ARTICLE_LISTINGS])
+            
+            # Approving a template edit re-renders the articles that use it
+            if article.get("namespace") == TEMPLATE_NAMESPACE:
+                template_registry.invalidate(article["title"])
+                background_tasks.add_task(rerender_template_dependents, db, article["title"], cache)
             
             # Update user's contribution count
             await db["users"].update_one(
@@ -266,6 +291,9 @@ async def review_proposal(
                 {"$inc": {"contributions.editsPerformed": 1}}
             )
         
+        # The proposer's profile shows the proposal's status and their edits
+        await cache.invalidate_tag(user_tag(proposal["proposedBy"]))
+        
         # Get updated proposal
         updated_proposal = await db["proposals"].find_one({"_id": ObjectId(proposal_id)})
         
@@ -299,7 +327,8 @@ async def get_all_proposals(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db),
+    loaders=Depends(get_loaders)
 ):
     """
     Get all proposals across articles.
@@ -319,20 +348,24 @@ async def get_all_proposals(
         proposals = await cursor.to_list(length=limit)
         
         # Enhance with article and user info
+        articles = await loaders.articles.load_many(prop["articleId"] for prop in proposals)
+        users = await loaders.users.load_many(
+            [prop["proposedBy"] for prop in proposals] + [prop.get("reviewedBy") for prop in proposals]
+        )
         enhanced_proposals = []
         for prop in proposals:
             # Get article info
-            article = await db["articles"].find_one({"_id": prop["articleId"]})
+            article = articles.get(prop["articleId"])
             article_title = article["title"] if article else "Unknown Article"
             
             # Get proposer info
-            proposer = await db["users"].find_one({"_id": prop["proposedBy"]})
+            proposer = users.get(prop["proposedBy"])
             proposer_username = proposer["username"] if proposer else "Unknown"
             
             # Get reviewer info if available
             reviewer_username = None
             if prop.get("reviewedBy"):
-                reviewer = await db["users"].find_one({"_id": prop["reviewedBy"]})
+                reviewer = users.get(prop["reviewedBy"])
                 reviewer_username = reviewer["username"] if reviewer else "Unknown"
             
             # Add to enhanced list
@@ -358,7 +391,8 @@ async def get_pending_proposals(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     current_user: Dict[str, Any] = Depends(get_current_editor),
-    db=Depends(get_db)
+    db=Depends(get_db),
+    loaders=Depends(get_loaders)
 ):
     """
     Get all pending proposals (editor/admin only).
@@ -372,14 +406,16 @@ async def get_pending_proposals(
         proposals = await cursor.to_list(length=limit)
         
         # Enhance with article and user info
+        articles = await loaders.articles.load_many(prop["articleId"] for prop in proposals)
+        users = await loaders.users.load_many(prop["proposedBy"] for prop in proposals)
         enhanced_proposals = []
         for prop in proposals:
             # Get article info
-            article = await db["articles"].find_one({"_id": prop["articleId"]})
+            article = articles.get(prop["articleId"])
             article_title = article["title"] if article else "Unknown Article"
             
             # Get proposer info
-            proposer = await db["users"].find_one({"_id": prop["proposedBy"]})
+            proposer = users.get(prop["proposedBy"])
             proposer_username = proposer["username"] if proposer else "Unknown"
             
             # Add to enhanced list
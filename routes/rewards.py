@@ -7,7 +7,8 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from models import Reward, RewardCreate
-from dependencies import get_db, get_current_user
+from dependencies import get_db, get_current_user, get_cache
+from services.cache import user_tag
 
 router = APIRouter()
 
@@ -17,7 +18,8 @@ async def create_reward(
     reward: RewardCreate,
     revision_id: Optional[str] = None,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    db=Depends(get_db)
+    db=Depends(get_db),
+    cache=Depends(get_cache)
 ):
     """
     Create a reward for an article or specific revision.
@@ -81,6 +83,9 @@ async def create_reward(
         }}
     )
     
+    # The rewarded user's profile lists their rewards
+    await cache.invalidate_tag(user_tag(rewarded_user_id))
+    
     # Get created reward
     created_reward = await db["rewards"].find_one({"_id": result.inserted_id})
     
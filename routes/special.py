@@ -13,6 +13,7 @@ import logging
 from dependencies.database import get_db
 from dependencies.auth import get_current_user, get_current_admin, get_current_editor
 from dependencies.cache import get_cache
+from services.cache import ARTICLE_LISTINGS
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -379,7 +380,7 @@ async def get_recent_changes(
         changes = changes[:limit]
         
         # Cache for 5 minutes
-        await cache.set(cache_key, changes, 300)
+        await cache.set(cache_key, changes, 300, tags=[ARTICLE_LISTINGS])
         
         return changes
         
@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional
 import logging
 
 from dependencies import get_db, get_current_user, get_cache
+from services.cache import ARTICLE_LISTINGS, article_tag, user_tag
 
 # Initialize router
 router = APIRouter()
@@ -151,13 +152,13 @@ async def vote_article(
         
         # Invalidate cache
         if cache:
-            await cache.delete(f"article:{article_id}")
-            if article.get("slug"):
-                await cache.delete(f"article:{article['slug']}")
+            tags = [article_tag(article_id), ARTICLE_LISTINGS]
                 
             # Also invalidate creator's profile cache if applicable
             if article_creator_id:
-                await cache.delete(f"user:{article_creator_id}")
+                tags.append(user_tag(article_creator_id))
+            
+            await cache.invalidate_tags(tags)
         
         # Get updated article
         updated_article = await db["articles"].find_one({"_id": ObjectId(article_id)})
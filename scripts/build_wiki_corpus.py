@@ -0,0 +1,261 @@
+# File: scripts/build_wiki_corpus.py
+
+"""
+Build the wiki parser compatibility corpus from database exports.
+
+Articles and revisions in db_exports/ store rendered HTML, so each document is
+converted back into wiki markup (headings, lists, tables, links, bold/italic)
+and written to test/fixtures/wiki_corpus/. test/test_wiki_parser_compat.py
+renders every corpus file with both the legacy and the current parser and
+requires identical output.
+
+Usage:
+    python scripts/build_wiki_corpus.py [--exports db_exports] [--output test/fixtures/wiki_corpus]
+"""
+
+import re
+import sys
+import json
+import argparse
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import unquote
+
+# Collections whose documents carry article content
+CONTENT_COLLECTIONS = ["articles", "revisions"]
+
+# Elements whose text never reaches the page
+SKIPPED_TAGS = {"style", "script", "head", "title", "noscript", "template"}
+
+BLOCK_TAGS = {"p", "div", "section", "blockquote", "figure", "figcaption", "pre", "dl", "dd", "dt", "center"}
+
+INTERNAL_HREF_PREFIXES = ("/wiki/", "/articles/")
+
+class WikiMarkupWriter(HTMLParser):
+    """
+    Convert rendered article HTML back into Kryptopedia wiki markup.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[str] = []
+        self.line: List[str] = []
+        self.skip_depth = 0
+        self.list_stack: List[str] = []
+        self.table_depth = 0
+        self.link_stack: List[Optional[str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+
+        attrs = dict(attrs)
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._end_block()
+        elif tag in BLOCK_TAGS:
+            self._end_block()
+        elif tag == "br":
+            self._end_line()
+        elif tag in ("b", "strong"):
+            self.line.append("'''")
+        elif tag in ("i", "em"):
+            self.line.append("''")
+        elif tag in ("ul", "ol"):
+            self._end_line()
+            self.list_stack.append("*" if tag == "ul" else "#")
+        elif tag == "li":
+            self._end_line()
+            if self.list_stack and not self.table_depth:
+                self.line.append(f"{self.list_stack[-1]} ")
+        elif tag == "table":
+            self._end_block()
+            self.table_depth += 1
+            if self.table_depth == 1:
+                table_class = attrs.get("class")
+                self.blocks.append(f'{{| class="{table_class}"' if table_class else "{|")
+        elif tag == "caption" and self.table_depth == 1:
+            self._end_line()
+            self.line.append("|+ ")
+        elif tag == "tr" and self.table_depth == 1:
+            self._end_line()
+            self.blocks.append("|-")
+        elif tag in ("th", "td") and self.table_depth == 1:
+            self._end_line()
+            self.line.append("! " if tag == "th" else "| ")
+        elif tag == "a":
+            self.link_stack.append(self._link_target(attrs.get("href") or ""))
+            self.line.append("\x00")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth:
+            return
+
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            text = self._take_line()
+            if text:
+                marks = "=" * int(tag[1])
+                self.blocks.append(f"{marks} {text} {marks}")
+            self._end_block()
+        elif tag in BLOCK_TAGS:
+            self._end_block()
+        elif tag in ("b", "strong"):
+            self.line.append("'''")
+        elif tag in ("i", "em"):
+            self.line.append("''")
+        elif tag in ("ul", "ol"):
+            self._end_line()
+            if self.list_stack:
+                self.list_stack.pop()
+            if not self.list_stack:
+                self._end_block()
+        elif tag == "li":
+            self._end_line()
+        elif tag == "table" and self.table_depth:
+            self._end_line()
+            self.table_depth -= 1
+            if self.table_depth == 0:
+                self.blocks.append("|}")
+                self._end_block()
+        elif tag in ("th", "td", "caption") and self.table_depth == 1:
+            self._end_line()
+        elif tag == "a" and self.link_stack:
+            self._close_link(self.link_stack.pop())
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.line.append(re.sub(r"\s+", " ", data))
+
+    def getvalue(self) -> str:
+        self._end_block()
+        markup = "\n".join(self.blocks)
+        return re.sub(r"\n{3,}", "\n\n", markup).strip() + "\n"
+
+    def _link_target(self, href: str) -> Optional[str]:
+        if href.startswith(INTERNAL_HREF_PREFIXES):
+            target = unquote(href.split("/", 2)[2].split("#")[0]).replace("_", " ")
+            return f"[[{target}" if target else None
+        if href.startswith(("http://", "https://")):
+            return f"[{href.replace(' ', '%20')}"
+        return None
+
+    def _close_link(self, target: Optional[str]) -> None:
+        # Rewrite the text collected since the opening marker
+        for index in range(len(self.line) - 1, -1, -1):
+            if self.line[index] == "\x00":
+                break
+        else:
+            return
+
+        text = "".join(self.line[index + 1:]).strip()
+        del self.line[index:]
+
+        if target is None or not text:
+            self.line.append(text)
+        elif target.startswith("[["):
+            self.line.append(f"{target}|{text}]]")
+        else:
+            self.line.append(f"{target} {text}]")
+
+    def _take_line(self) -> str:
+        text = "".join(part for part in self.line if part != "\x00")
+        self.line = []
+        return text.strip()
+
+    def _end_line(self) -> None:
+        text = self._take_line()
+        if text and text not in ("*", "#", "!", "|"):
+            self.blocks.append(text)
+
+    def _end_block(self) -> None:
+        self._end_line()
+        if not self.table_depth and self.blocks and self.blocks[-1] != "":
+            self.blocks.append("")
+
+def html_to_wiki_markup(html: str) -> str:
+    """
+    Convert rendered article HTML into wiki markup.
+
+    Args:
+        html: The stored article HTML
+
+    Returns:
+        str: Equivalent wiki markup
+    """
+    writer = WikiMarkupWriter()
+    writer.feed(html)
+    writer.close()
+    return writer.getvalue()
+
+def corpus_name(export_dir: Path, collection: str, index: int, document: dict) -> str:
+    """Build a stable file name for a corpus document."""
+    title = document.get("title") or document.get("comment") or "untitled"
+    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")[:40] or "untitled"
+    return f"{export_dir.name}_{collection}_{index:03d}_{slug}.wiki"
+
+def build_corpus(exports: Path, output: Path) -> int:
+    """
+    Convert every exported article and revision into a corpus file.
+
+    Args:
+        exports: Directory containing timestamped export folders
+        output: Directory to write .wiki files into
+
+    Returns:
+        int: Number of corpus files written
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    seen = set()
+    written = 0
+
+    for export_dir in sorted(path for path in exports.iterdir() if path.is_dir()):
+        for collection in CONTENT_COLLECTIONS:
+            source = export_dir / f"{collection}.json"
+            if not source.exists():
+                continue
+
+            with open(source, encoding="utf-8") as f:
+                documents = json.load(f)
+
+            for index, document in enumerate(documents):
+                markup = html_to_wiki_markup(document.get("content") or "")
+
+                # Revisions often repeat the article body verbatim
+                if not markup.strip() or markup in seen:
+                    continue
+                seen.add(markup)
+
+                target = output / corpus_name(export_dir, collection, index, document)
+                target.write_text(markup, encoding="utf-8")
+                written += 1
+                print(f"Wrote {target} ({len(markup)} chars)")
+
+    return written
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build the wiki parser compatibility corpus")
+    parser.add_argument("--exports", default="db_exports", help="Directory containing database exports")
+    parser.add_argument("--output", default="test/fixtures/wiki_corpus", help="Directory for generated .wiki files")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+
+    exports = Path(args.exports)
+    if not exports.is_dir():
+        print(f"Export directory not found: {exports}")
+        sys.exit(1)
+
+    written = build_corpus(exports, Path(args.output))
+    print(f"Corpus contains {written} documents")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,23 @@
 """
 Cache services package for the Kryptopedia application.
 """
+from typing import Optional
+
 from .base import CacheInterface
+from .codec import CacheCodec, SnapshotCodec, BsonCodec, CompressingCodec, freeze, thaw
 from .memory import InMemoryCache
 from .redis import RedisCache
+from .tiered import TieredCache
+from .instrumented import InstrumentedCache
+from .page import PageCacheMiddleware, cache_page, register_hit_handler
+from .tags import ARTICLE_LISTINGS, CATEGORY_LISTINGS, CACHE_CATEGORIES, article_tag, user_tag
 
-__all__ = ['CacheInterface', 'InMemoryCache', 'RedisCache']
+__all__ = [
+    'CacheInterface', 'InMemoryCache', 'RedisCache', 'TieredCache', 'InstrumentedCache',
+    'CacheCodec', 'SnapshotCodec', 'BsonCodec', 'CompressingCodec', 'freeze', 'thaw',
+    'ARTICLE_LISTINGS', 'CATEGORY_LISTINGS', 'CACHE_CATEGORIES', 'article_tag', 'user_tag',
+    'PageCacheMiddleware', 'cache_page', 'register_hit_handler'
+]
 
 def get_cache_service(use_redis: bool = False, **kwargs) -> CacheInterface:
     """
@@ -18,14 +30,59 @@ def get_cache_service(use_redis: bool = False, **kwargs) -> CacheInterface:
     Returns:
         CacheInterface: An instance of the appropriate cache service
     """
+    cache = _build_cache(use_redis, kwargs)
+    if not kwargs.get("metrics", True):
+        return cache
+    
+    # Group metrics by the prefixes the admin API clears by
+    prefixes = [prefix for category in CACHE_CATEGORIES.values() for prefix in category]
+    return InstrumentedCache(cache, prefixes)
+
+def _build_cache(use_redis: bool, kwargs) -> CacheInterface:
+    """Build the uninstrumented cache service."""
     if use_redis:
         # Get Redis connection parameters
         host = kwargs.get("redis_host", "localhost")
         port = kwargs.get("redis_port", 6379)
         password = kwargs.get("redis_password")
         db = kwargs.get("redis_db", 0)
+        # Namespaces every key, including the invalidation channel
+        prefix = kwargs.get("key_prefix", "")
         
-        return RedisCache(host=host, port=port, password=password, db=db)
+        remote = RedisCache(
+            host=host, port=port, password=password, db=db, prefix=prefix,
+            codec=_compressing_codec(kwargs)
+        )
+        if not kwargs.get("local_cache", True):
+            return remote
+        
+        # Per-worker L1 in front of Redis, invalidated over pub/sub
+        return TieredCache(
+            remote,
+            local=InMemoryCache(
+                max_entries=kwargs.get("local_max_entries", 2000),
+                max_bytes=kwargs.get("local_max_bytes", 16 * 1024 * 1024)
+            ),
+            local_ttl=kwargs.get("local_ttl", 30),
+            channel=prefix + kwargs.get("invalidation_channel", "cache:invalidate")
+        )
     else:
-        # Use in-memory cache
-        return InMemoryCache()
+        # Use a bounded in-memory cache
+        # Compression keeps a large working set within max_bytes, at CPU cost per hit
+        return InMemoryCache(
+            max_entries=kwargs.get("max_entries", 10000),
+            max_bytes=kwargs.get("max_bytes", 64 * 1024 * 1024),
+            codec=_compressing_codec(kwargs) if kwargs.get("memory_compression") else None
+        )
+
+def _compressing_codec(kwargs) -> Optional[CacheCodec]:
+    """Build the compressing codec configured in kwargs, or None when disabled."""
+    algorithm = kwargs.get("compression", "zlib")
+    if not algorithm or algorithm == "none":
+        return None
+    return CompressingCodec(
+        BsonCodec(),
+        threshold=kwargs.get("compression_threshold", 1024),
+        algorithm=algorithm,
+        level=kwargs.get("compression_level")
+    )
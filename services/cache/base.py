@@ -1,8 +1,21 @@
 """
 Base interface for caching services used in the Cryptopedia application.
 """
+import asyncio
+import logging
+import math
+import random
+import time
+import uuid
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Marks the envelope get_or_compute stores around computed values
+COMPUTED_MARKER = "__computed__"
+# Seconds between checks while another process holds a compute lock
+LOCK_POLL_INTERVAL = 0.05
 
 class CacheInterface(ABC):
     """
@@ -15,6 +28,9 @@ class CacheInterface(ABC):
         """
         Get a value from the cache.
         
+        Dicts and lists come back read-only (FrozenDict and FrozenList, see
+        services.cache.codec) from every backend; use thaw() for a mutable copy.
+        
         Args:
             key: The cache key
             
@@ -24,7 +40,13 @@ class CacheInterface(ABC):
         pass
     
     @abstractmethod
-    async def set(self, key: str, value: Any, expiration: Optional[int] = None) -> bool:
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
         """
         Set a value in the cache.
         
@@ -32,6 +54,7 @@ class CacheInterface(ABC):
             key: The cache key
             value: The value to cache
             expiration: Optional expiration time in seconds
+            tags: Optional tags; invalidating any of them deletes the key
             
         Returns:
             bool: True if the value was set successfully
@@ -74,9 +97,301 @@ class CacheInterface(ABC):
         """
         pass
     
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values at once.
+        Implementations override this to use a single round trip.
+        
+        Args:
+            keys: The cache keys
+            
+        Returns:
+            Dict[str, Any]: Cached values by key; missing keys are left out
+        """
+        values = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+    
+    async def set_many(
+        self,
+        values: Mapping[str, Any],
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set several values at once.
+        
+        Args:
+            values: Values to cache by key
+            expiration: Optional expiration time in seconds, applied to every key
+            tags: Optional tags, applied to every key
+            
+        Returns:
+            bool: True if every value was set successfully
+        """
+        tags = list(tags or [])
+        results = [await self.set(key, value, expiration, tags) for key, value in values.items()]
+        return all(results)
+    
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several values at once.
+        
+        Args:
+            keys: The cache keys
+            
+        Returns:
+            int: Number of keys that were deleted
+        """
+        deleted = 0
+        for key in keys:
+            if await self.delete(key):
+                deleted += 1
+        return deleted
+    
+    @abstractmethod
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Delete every key set with any of the given tags.
+        
+        Args:
+            tags: The tags to invalidate
+            
+        Returns:
+            int: Number of keys that were deleted
+        """
+        pass
+    
+    @abstractmethod
+    async def clear_prefix(self, prefixes: Iterable[str]) -> int:
+        """
+        Delete every key starting with any of the given prefixes.
+        
+        Args:
+            prefixes: The key prefixes
+            
+        Returns:
+            int: Number of keys that were deleted
+        """
+        pass
+    
+    async def invalidate_tag(self, tag: str) -> int:
+        """
+        Delete every key set with the given tag.
+        
+        Args:
+            tag: The tag to invalidate
+            
+        Returns:
+            int: Number of keys that were deleted
+        """
+        return await self.invalidate_tags([tag])
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expiration: int,
+        tags: Optional[Iterable[str]] = None,
+        beta: float = 1.0,
+        lock_timeout: float = 10.0,
+        hard_expiration: Optional[int] = None
+    ) -> Any:
+        """
+        Get a value, computing and caching it on a miss.
+        
+        Concurrent misses for the same key in this process share one call to
+        compute, and across processes only the holder of a short lock
+        computes while the others wait for its result. Values are refreshed
+        early with a probability that rises towards expiry (scaled by how
+        long compute took and by beta), so a busy key is usually recomputed
+        by one request before it expires; the others keep getting the
+        current value meanwhile.
+        
+        With hard_expiration, expiration becomes a soft TTL: the entry is
+        kept until the hard TTL, and a request that finds it due for refresh
+        gets the stale value immediately while compute runs in a background
+        task. Only requests after the hard TTL wait for compute.
+        
+        The key holds an envelope around the value, so it should only be
+        read through this method.
+        
+        Args:
+            key: The cache key
+            compute: Coroutine function producing the value
+            expiration: Expiration time in seconds (the soft TTL with hard_expiration)
+            tags: Optional tags for the cached value
+            beta: Early refresh eagerness; 0 disables early refresh
+            lock_timeout: Longest time in seconds to wait for another process
+            hard_expiration: Optional time in seconds a stale value may still be served
+            
+        Returns:
+            Any: The cached or computed value
+        """
+        envelope = await self.get(key)
+        current = None
+        if isinstance(envelope, dict) and envelope.get(COMPUTED_MARKER):
+            current = envelope
+            if not _should_refresh(envelope, beta):
+                return envelope["value"]
+        
+        flights = self._compute_flights()
+        if current is not None and (hard_expiration is not None or key in flights):
+            # Serve the stale value; at most one refresh runs per process
+            if key not in flights:
+                self._refresh_in_background(key, compute, expiration, tags, current, lock_timeout, hard_expiration)
+            return current["value"]
+        
+        return await self._compute_shared(key, compute, expiration, tags, current, lock_timeout, hard_expiration)
+    
+    def _compute_flights(self) -> Dict[str, "asyncio.Task"]:
+        flights = getattr(self, "_flights", None)
+        if flights is None:
+            flights = self._flights = {}
+        return flights
+    
+    def _refresh_in_background(self, key: str, *args) -> None:
+        def done(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"Background refresh of {key} failed: {task.exception()}")
+        self._start_flight(key, *args).add_done_callback(done)
+    
+    async def _compute_shared(self, key: str, *args) -> Any:
+        # Waiters are shielded: a cancelled caller stops waiting, the flight goes on
+        return await asyncio.shield(self._start_flight(key, *args))
+    
+    def _start_flight(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expiration: int,
+        tags: Optional[Iterable[str]],
+        current: Optional[Dict[str, Any]],
+        lock_timeout: float,
+        hard_expiration: Optional[int]
+    ) -> "asyncio.Task":
+        flights = self._compute_flights()
+        flight = flights.get(key)
+        if flight is not None:
+            # Someone in this process is already computing
+            return flight
+        
+        # Computed in its own task, so it outlives a caller that is cancelled
+        # (a client disconnecting) and every waiter still gets the value
+        flight = asyncio.create_task(
+            self._compute_once(key, compute, expiration, tags, current, lock_timeout, hard_expiration)
+        )
+        flights[key] = flight
+        
+        def done(task: asyncio.Task) -> None:
+            if flights.get(key) is task:
+                del flights[key]
+            if not task.cancelled():
+                # Mark the exception retrieved in case every waiter was cancelled
+                task.exception()
+        flight.add_done_callback(done)
+        return flight
+    
+    async def _compute_once(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expiration: int,
+        tags: Optional[Iterable[str]],
+        current: Optional[Dict[str, Any]],
+        lock_timeout: float,
+        hard_expiration: Optional[int]
+    ) -> Any:
+        token = await self.acquire_lock(key, lock_timeout)
+        if token is None:
+            # Another process is computing; serve the current value if any
+            if current is not None:
+                return current["value"]
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                envelope = await self.get(key)
+                if isinstance(envelope, dict) and envelope.get(COMPUTED_MARKER):
+                    return envelope["value"]
+            # The other process is stuck or gone; compute without the lock
+        
+        try:
+            started = time.monotonic()
+            value = await compute()
+            await self.set(key, {
+                COMPUTED_MARKER: True,
+                "value": value,
+                "delta": time.monotonic() - started,
+                "staleAt": time.time() + expiration
+            }, max(hard_expiration or 0, expiration), tags)
+            return value
+        finally:
+            if token is not None:
+                await self.release_lock(key, token)
+    
+    async def acquire_lock(self, name: str, timeout: float) -> Optional[str]:
+        """
+        Try to take a short lock shared by every process using this cache.
+        
+        Process-local caches have nothing to share, so this always succeeds
+        unless overridden.
+        
+        Args:
+            name: The lock name
+            timeout: Seconds after which the lock is released regardless
+            
+        Returns:
+            Optional[str]: A token for release_lock, or None if the lock is held elsewhere
+        """
+        return uuid.uuid4().hex
+    
+    async def release_lock(self, name: str, token: str) -> None:
+        """
+        Release a lock taken with acquire_lock, if it is still ours.
+        
+        Args:
+            name: The lock name
+            token: The token acquire_lock returned
+        """
+        pass
+    
+    async def start(self) -> None:
+        """
+        Start any background work the cache needs.
+        No-op unless overridden.
+        """
+        pass
+    
     @abstractmethod
     async def close(self) -> None:
         """
         Close the cache connection.
         """
         pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get implementation-specific cache statistics.
+        
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        return {}
+
+def _should_refresh(envelope: Dict[str, Any], beta: float) -> bool:
+    """
+    Decide whether to recompute a value before it expires.
+
+    Each read recomputes with a probability that rises as expiry gets
+    closer, measured in units of the time the last compute took.
+    """
+    remaining = envelope["staleAt"] - time.time()
+    if remaining <= 0:
+        return True
+    if beta <= 0:
+        return False
+    # 1 - random() is in (0, 1], so the log is defined
+    return envelope.get("delta", 0) * beta * -math.log(1.0 - random.random()) >= remaining
@@ -0,0 +1,332 @@
+"""
+Value codecs for the Cryptopedia cache services.
+
+A codec turns a value into its stored form on set() and back on get().
+SnapshotCodec keeps values in process as frozen copies, so a cache hit
+hands out the stored object itself instead of a deep copy. BsonCodec
+serializes to bytes for Redis and keeps ObjectId and datetime values
+intact, which the previous JSON encoding could not; it decodes into the
+same frozen dicts and lists, so a value reads the same whichever backend
+or tier returned it. CompressingCodec wraps a bytes codec and compresses
+large encoded values.
+"""
+import json
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+import bson
+from bson.codec_options import CodecOptions, TypeRegistry
+from bson.errors import InvalidDocument
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class CacheCodec(ABC):
+    """
+    Converts cached values to and from their stored form.
+    """
+
+    @abstractmethod
+    def encode(self, value: Any) -> Any:
+        """
+        Convert a value to its stored form.
+
+        Args:
+            value: The value to cache
+
+        Returns:
+            Any: The stored form
+
+        Raises:
+            TypeError: If the value cannot be encoded
+        """
+        pass
+
+    @abstractmethod
+    def decode(self, stored: Any) -> Any:
+        """
+        Convert a stored form back to a value.
+
+        Args:
+            stored: The stored form
+
+        Returns:
+            Any: The cached value
+        """
+        pass
+
+class FrozenDict(dict):
+    """
+    Read-only dict returned from the in-memory cache.
+
+    It is still a dict, so templates, JSON encoding and BSON encoding treat
+    it as one. Use dict(value) or thaw(value) for a mutable copy.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Cached values are read-only; use thaw() for a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+class FrozenList(list):
+    """
+    Read-only list returned from the in-memory cache.
+
+    Slicing and concatenation return plain lists.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Cached values are read-only; use thaw() for a mutable copy")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+# Values that are immutable and can be shared as they are
+_IMMUTABLE_TYPES = (
+    str, bytes, int, float, bool, type(None), datetime, date, uuid.UUID,
+    bson.ObjectId, bson.Decimal128, bson.Regex, bson.Timestamp, bson.MinKey, bson.MaxKey, bson.DBRef
+)
+
+def freeze(value: Any) -> Any:
+    """
+    Make a read-only copy of a value.
+
+    Dicts and lists become FrozenDict and FrozenList, sets become frozensets
+    and tuples are frozen element by element. Immutable leaves are shared.
+
+    Args:
+        value: The value to freeze
+
+    Returns:
+        Any: The frozen copy
+
+    Raises:
+        TypeError: If the value contains a type that cannot be frozen
+    """
+    if isinstance(value, _IMMUTABLE_TYPES) or isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    raise TypeError(f"Cannot cache a value of type {type(value).__name__}")
+
+def thaw(value: Any) -> Any:
+    """
+    Make a mutable deep copy of a frozen value.
+
+    Args:
+        value: A value returned from the cache
+
+    Returns:
+        Any: The mutable copy
+    """
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(thaw(item) for item in value)
+    if isinstance(value, frozenset):
+        return set(thaw(item) for item in value)
+    return value
+
+class SnapshotCodec(CacheCodec):
+    """
+    Stores frozen snapshots; decoding returns the snapshot itself.
+    """
+
+    def encode(self, value: Any) -> Any:
+        return freeze(value)
+
+    def decode(self, stored: Any) -> Any:
+        return stored
+
+def _encode_fallback(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+class BsonCodec(CacheCodec):
+    """
+    Serializes values to BSON bytes for Redis.
+
+    Values are wrapped in a one-field document behind a short prefix, so
+    scalars, lists and documents all round-trip. Entries written before
+    this codec (plain JSON or UTF-8 text) are still decoded. Sets come
+    back as lists, tuples as lists and datetimes at millisecond precision,
+    as they would from MongoDB. Decoded dicts and lists are frozen, like
+    those returned by SnapshotCodec.
+    """
+
+    PREFIX = b"\x00kc:bson\x00"
+
+    def __init__(self):
+        self.codec_options = CodecOptions(
+            type_registry=TypeRegistry(fallback_encoder=_encode_fallback)
+        )
+
+    def encode(self, value: Any) -> bytes:
+        try:
+            return self.PREFIX + bson.encode({"v": value}, codec_options=self.codec_options)
+        except (InvalidDocument, OverflowError) as e:
+            raise TypeError(str(e)) from e
+
+    def decode(self, stored: Any) -> Any:
+        if isinstance(stored, bytes) and stored.startswith(self.PREFIX):
+            return freeze(bson.decode(stored[len(self.PREFIX):], codec_options=self.codec_options)["v"])
+        return freeze(_decode_legacy(stored))
+
+def _decode_legacy(stored: Any) -> Any:
+    """Decode a value written as JSON or plain text."""
+    try:
+        text = stored.decode("utf-8") if isinstance(stored, bytes) else stored
+    except UnicodeDecodeError:
+        # Binary data, return as is
+        return stored
+    try:
+        return json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        return text
+
+class CompressingCodec(CacheCodec):
+    """
+    Compresses the bytes produced by another codec once they reach a size.
+
+    Compressed values start with a magic header naming the algorithm, so
+    values stored uncompressed (small ones, or ones written before
+    compression was enabled) still decode, and the algorithm can be
+    changed without flushing the cache. zstd needs the optional zstandard
+    package; without it the codec falls back to zlib.
+    """
+
+    ZLIB_MAGIC = b"\x00kc:zlib\x00"
+    ZSTD_MAGIC = b"\x00kc:zstd\x00"
+
+    def __init__(
+        self,
+        inner: Optional[CacheCodec] = None,
+        threshold: int = 1024,
+        algorithm: str = "zlib",
+        level: Optional[int] = None
+    ):
+        """
+        Initialize the compressing codec.
+
+        Args:
+            inner: Codec producing bytes (defaults to BsonCodec)
+            threshold: Smallest encoded size in bytes that is compressed
+            algorithm: "zlib" or "zstd"
+            level: Compression level (defaults to 6 for zlib, 3 for zstd)
+        """
+        if algorithm not in ("zlib", "zstd"):
+            raise ValueError(f"Unknown compression algorithm: {algorithm}")
+        if algorithm == "zstd" and zstandard is None:
+            algorithm = "zlib"
+        self.inner = inner or BsonCodec()
+        self.threshold = threshold
+        self.algorithm = algorithm
+
+        if algorithm == "zstd":
+            self.level = 3 if level is None else level
+            self._compressor = zstandard.ZstdCompressor(level=self.level)
+        else:
+            self.level = 6 if level is None else level
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+        self.stats = {
+            "compressed": 0,
+            "uncompressed": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "compress_seconds": 0.0,
+            "decompressed": 0,
+            "decompress_seconds": 0.0,
+        }
+
+    def encode(self, value: Any) -> bytes:
+        data = self.inner.encode(value)
+        if not isinstance(data, bytes) or len(data) < self.threshold:
+            self.stats["uncompressed"] += 1
+            return data
+
+        started = time.perf_counter()
+        if self.algorithm == "zstd":
+            compressed = self.ZSTD_MAGIC + self._compressor.compress(data)
+        else:
+            compressed = self.ZLIB_MAGIC + zlib.compress(data, self.level)
+        self.stats["compress_seconds"] += time.perf_counter() - started
+
+        if len(compressed) >= len(data):
+            # Incompressible; storing it as is saves decompressing on every hit
+            self.stats["uncompressed"] += 1
+            return data
+        self.stats["compressed"] += 1
+        self.stats["bytes_in"] += len(data)
+        self.stats["bytes_out"] += len(compressed)
+        return compressed
+
+    def decode(self, stored: Any) -> Any:
+        if isinstance(stored, bytes):
+            if stored.startswith(self.ZLIB_MAGIC):
+                started = time.perf_counter()
+                stored = zlib.decompress(stored[len(self.ZLIB_MAGIC):])
+                self._count_decompress(started)
+            elif stored.startswith(self.ZSTD_MAGIC):
+                if self._decompressor is None:
+                    raise ValueError("Cached value is zstd-compressed but zstandard is not installed")
+                started = time.perf_counter()
+                stored = self._decompressor.decompress(stored[len(self.ZSTD_MAGIC):])
+                self._count_decompress(started)
+        return self.inner.decode(stored)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get compression counts, ratio and time spent.
+
+        Returns:
+            Dict[str, Any]: Codec statistics
+        """
+        bytes_out = self.stats["bytes_out"]
+        return {
+            **self.stats,
+            "algorithm": self.algorithm,
+            "level": self.level,
+            "threshold": self.threshold,
+            "compression_ratio": round(self.stats["bytes_in"] / bytes_out, 3) if bytes_out else None,
+        }
+
+    def _count_decompress(self, started: float) -> None:
+        self.stats["decompressed"] += 1
+        self.stats["decompress_seconds"] += time.perf_counter() - started
@@ -0,0 +1,355 @@
+"""
+Instrumented cache wrapper for the Cryptopedia application.
+
+InstrumentedCache sits in front of any CacheInterface and records hits,
+misses, sets, deletes, stored value sizes and latency histograms, grouped
+by key prefix (article:, homepage_data, articles_list_, ...), so TTLs and
+cache placement can be tuned from data.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .base import CacheInterface
+from .memory import _estimate_size
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Upper bounds in bytes of the value size histogram buckets
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Group for keys that match no configured prefix and contain no ":"
+OTHER_GROUP = "other"
+
+class Histogram:
+    """
+    Fixed-bucket histogram, reported in the Prometheus cumulative layout.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        # One count per bucket plus the +Inf overflow bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        """Counts of observations at or below each bound, ending with +Inf."""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "buckets": dict(zip(bounds, self.cumulative())),
+        }
+
+class _GroupStats:
+    def __init__(self):
+        self.counters = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0, "set_failures": 0}
+        self.sizes = Histogram(SIZE_BUCKETS)
+        self.latency: Dict[str, Histogram] = {}
+
+    def observe_latency(self, operation: str, seconds: float) -> None:
+        histogram = self.latency.get(operation)
+        if histogram is None:
+            histogram = self.latency[operation] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+            "value_bytes": self.sizes.snapshot(),
+            "latency_seconds": {operation: histogram.snapshot() for operation, histogram in self.latency.items()},
+        }
+
+class InstrumentedCache(CacheInterface):
+    """
+    Records per-prefix cache metrics around another cache.
+
+    Keys are grouped by the longest configured prefix they start with, or
+    else by the text up to their first ":". Evictions and expirations are
+    only known to the backend, so they are reported with its own statistics
+    rather than per prefix. get_or_compute runs here, so the envelope reads
+    and writes it makes are counted against the page's key.
+    """
+
+    def __init__(self, inner: CacheInterface, prefixes: Iterable[str] = ()):
+        """
+        Initialize the instrumented cache.
+
+        Args:
+            inner: The cache that stores the values
+            prefixes: Key prefixes to group metrics by
+        """
+        self.inner = inner
+        # Longest first, so "articles_list_" wins over "article"
+        self.prefixes = sorted(set(prefixes), key=len, reverse=True)
+        self.groups: Dict[str, _GroupStats] = {}
+
+    def key_group(self, key: str) -> str:
+        """
+        Get the metrics group of a key.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            str: The group name
+        """
+        for prefix in self.prefixes:
+            if key.startswith(prefix):
+                return prefix
+        head, separator, _ = key.partition(":")
+        return head + separator if separator else OTHER_GROUP
+
+    async def start(self) -> None:
+        """
+        Start the wrapped cache.
+        """
+        await self.inner.start()
+
+    async def get(self, key: str) -> Any:
+        """
+        Get a value, counting a hit or miss for its prefix.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Any: The cached value, or None if not found
+        """
+        started = time.perf_counter()
+        value = await self.inner.get(key)
+        group = self._group(key)
+        group.observe_latency("get", time.perf_counter() - started)
+        group.counters["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set a value, recording its estimated size for its prefix.
+
+        Args:
+            key: The cache key
+            value: The value to cache
+            expiration: Optional expiration time in seconds
+            tags: Optional tags
+
+        Returns:
+            bool: True if the value was set successfully
+        """
+        started = time.perf_counter()
+        result = await self.inner.set(key, value, expiration, tags)
+        group = self._group(key)
+        group.observe_latency("set", time.perf_counter() - started)
+        self._count_set(group, value, result)
+        return result
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values, counting hits and misses per prefix.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            Dict[str, Any]: Cached values by key; missing keys are left out
+        """
+        keys = list(keys)
+        started = time.perf_counter()
+        values = await self.inner.get_many(keys)
+        elapsed = time.perf_counter() - started
+        for group_name, group_keys in self._by_group(keys).items():
+            group = self._group_named(group_name)
+            group.observe_latency("get_many", elapsed)
+            hits = sum(key in values for key in group_keys)
+            group.counters["hits"] += hits
+            group.counters["misses"] += len(group_keys) - hits
+        return values
+
+    async def set_many(
+        self,
+        values: Mapping[str, Any],
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set several values, recording their estimated sizes per prefix.
+
+        Args:
+            values: Values to cache by key
+            expiration: Optional expiration time in seconds, applied to every key
+            tags: Optional tags, applied to every key
+
+        Returns:
+            bool: True if every value was set successfully
+        """
+        started = time.perf_counter()
+        result = await self.inner.set_many(values, expiration, tags)
+        elapsed = time.perf_counter() - started
+        for group_name, group_keys in self._by_group(values).items():
+            group = self._group_named(group_name)
+            group.observe_latency("set_many", elapsed)
+            for key in group_keys:
+                self._count_set(group, values[key], result)
+        return result
+
+    async def delete(self, key: str) -> bool:
+        """
+        Delete a value.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            bool: True if the value was deleted
+        """
+        started = time.perf_counter()
+        result = await self.inner.delete(key)
+        group = self._group(key)
+        group.observe_latency("delete", time.perf_counter() - started)
+        group.counters["deletes"] += int(bool(result))
+        return result
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several values.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            int: Number of keys that were deleted
+        """
+        keys = list(keys)
+        started = time.perf_counter()
+        deleted = await self.inner.delete_many(keys)
+        elapsed = time.perf_counter() - started
+        for group_name, group_keys in self._by_group(keys).items():
+            group = self._group_named(group_name)
+            group.observe_latency("delete_many", elapsed)
+            # The backend only reports a total; count the keys asked for
+            group.counters["deletes"] += len(group_keys)
+        return deleted
+
+    # The remaining operations are passed through uncounted
+
+    async def exists(self, key: str) -> bool:
+        return await self.inner.exists(key)
+
+    async def clear(self) -> bool:
+        return await self.inner.clear()
+
+    async def clear_prefix(self, prefixes: Iterable[str]) -> int:
+        return await self.inner.clear_prefix(prefixes)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        return await self.inner.invalidate_tags(tags)
+
+    async def acquire_lock(self, name: str, timeout: float) -> Optional[str]:
+        return await self.inner.acquire_lock(name, timeout)
+
+    async def release_lock(self, name: str, token: str) -> None:
+        await self.inner.release_lock(name, token)
+
+    async def close(self) -> None:
+        """
+        Close the wrapped cache.
+        """
+        await self.inner.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-prefix metrics and the backend's own statistics.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        return {
+            "prefixes": {name: group.snapshot() for name, group in sorted(self.groups.items())},
+            "backend": self.inner.get_stats(),
+        }
+
+    def render_metrics(self, namespace: str = "kryptopedia_cache") -> str:
+        """
+        Render the per-prefix metrics in the Prometheus text format.
+
+        Args:
+            namespace: Prefix for the metric names
+
+        Returns:
+            str: The metrics, one sample per line
+        """
+        lines = []
+        for counter in ("hits", "misses", "sets", "deletes", "set_failures"):
+            lines.append(f"# TYPE {namespace}_{counter}_total counter")
+            for name, group in sorted(self.groups.items()):
+                lines.append(f'{namespace}_{counter}_total{{prefix="{prometheus_label(name)}"}} {group.counters[counter]}')
+
+        lines.append(f"# TYPE {namespace}_value_bytes histogram")
+        for name, group in sorted(self.groups.items()):
+            lines.extend(histogram_lines(f"{namespace}_value_bytes", f'prefix="{prometheus_label(name)}"', group.sizes))
+
+        lines.append(f"# TYPE {namespace}_latency_seconds histogram")
+        for name, group in sorted(self.groups.items()):
+            for operation, histogram in sorted(group.latency.items()):
+                labels = f'prefix="{prometheus_label(name)}",operation="{operation}"'
+                lines.extend(histogram_lines(f"{namespace}_latency_seconds", labels, histogram))
+        return "\n".join(lines) + "\n"
+
+    def _group(self, key: str) -> _GroupStats:
+        return self._group_named(self.key_group(key))
+
+    def _group_named(self, name: str) -> _GroupStats:
+        group = self.groups.get(name)
+        if group is None:
+            group = self.groups[name] = _GroupStats()
+        return group
+
+    def _by_group(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        groups: Dict[str, List[str]] = {}
+        for key in keys:
+            groups.setdefault(self.key_group(key), []).append(key)
+        return groups
+
+    def _count_set(self, group: _GroupStats, value: Any, result: bool) -> None:
+        if not result:
+            group.counters["set_failures"] += 1
+            return
+        group.counters["sets"] += 1
+        group.sizes.observe(_estimate_size(value))
+
+def prometheus_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def histogram_lines(metric: str, labels: str, histogram: Histogram) -> List[str]:
+    """Render a histogram's buckets, sum and count in the Prometheus text format."""
+    bounds = [str(bound) for bound in histogram.buckets] + ["+Inf"]
+    lines = [
+        f'{metric}_bucket{{{labels},le="{bound}"}} {count}'
+        for bound, count in zip(bounds, histogram.cumulative())
+    ]
+    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+    return lines
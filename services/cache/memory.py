@@ -1,157 +1,357 @@
 """
 In-memory cache implementation for the Cryptopedia application.
 """
-from datetime import datetime, timedelta
-import copy
-import json
-from typing import Any, Dict, Optional
+import heapq
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 from .base import CacheInterface
+from .codec import CacheCodec, SnapshotCodec
+
+logger = logging.getLogger(__name__)
+
+# Most expired entries removed by one set() call; cleanup_expired removes all
+SWEEP_BATCH = 64
 
 class InMemoryCache(CacheInterface):
     """
-    Simple in-memory cache implementation for development or small deployments.
+    Bounded in-memory cache for development or single-worker deployments.
+
+    Entries are kept in LRU order and evicted once either max_entries or
+    max_bytes (an estimate of the stored value sizes) is exceeded. Expiry
+    times are kept in a min-heap: every set() drops up to SWEEP_BATCH entries
+    whose time has passed, so expired keys do not accumulate even if they
+    are never read again. Tags are kept in a tag -> keys index that is
+    updated whenever an entry is stored or removed.
+
+    Values pass through a codec; the default SnapshotCodec stores a frozen
+    copy on set() and returns that same object on every hit, so callers
+    get read-only dicts and lists and must not mutate them. With a
+    CompressingCodec, entries are held as (possibly compressed) bytes and
+    count towards max_bytes at their stored size, trading CPU on every hit
+    for a smaller footprint.
     """
-    # Class level storage to persist across instances
-    _cache = {}
-    _expiry = {}
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        codec: Optional[CacheCodec] = None
+    ):
         """
         Initialize the in-memory cache.
+
+        Args:
+            max_entries: Maximum number of keys held
+            max_bytes: Maximum total estimated size of the held values
+            codec: Value codec (defaults to SnapshotCodec)
         """
-        # Use class-level variables for storage
-        # This allows the cache to persist across instances
-        pass
-    
+        self.max_entries = max_entries
+        self.codec = codec or SnapshotCodec()
+        self.max_bytes = max_bytes
+
+        # key -> (value, expires_at monotonic time or None, size estimate, tags)
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], int, frozenset]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        # (expires_at, key); entries for overwritten or deleted keys are skipped
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._bytes = 0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
     async def get(self, key: str) -> Any:
         """
         Get a value from the cache.
-        
+
         Args:
             key: The cache key
-            
+
         Returns:
             Any: The cached value, or None if not found/expired
         """
-        if key in self._cache:
-            # Check if expired
-            if key in self._expiry and self._expiry[key] < datetime.now():
-                # Expired, remove and return None
-                await self.delete(key)
-                return None
-                
-            # Try to deserialize JSON strings
-            value = self._cache[key]
-            if isinstance(value, str):
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    # Not JSON, return as is
-                    return value
-            
-            # Make a deep copy to avoid modifying the cached value
-            return copy.deepcopy(value)
-            
-        return None
-    
-    async def set(self, key: str, value: Any, expiration: Optional[int] = None) -> bool:
+        return self._get(key)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
         """
         Set a value in the cache.
-        
+
         Args:
             key: The cache key
             value: The value to cache
             expiration: Optional expiration time in seconds
-            
+            tags: Optional tags; invalidating any of them deletes the key
+
         Returns:
             bool: True if the value was set successfully
         """
-        # Try to serialize non-primitive types to JSON
-        if isinstance(value, (dict, list, tuple, set)):
-            try:
-                value = json.dumps(value)
-            except (TypeError, ValueError):
-                # If serialization fails, store as is
-                pass
-        
-        self._cache[key] = value
-        
-        if expiration:
-            self._expiry[key] = datetime.now() + timedelta(seconds=expiration)
-        elif key in self._expiry:
-            # Remove expiration if no longer needed
-            del self._expiry[key]
-        
-        return True
-    
+        return self._set(key, value, expiration, tags)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values at once.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            Dict[str, Any]: Cached values by key; missing keys are left out
+        """
+        values = {}
+        for key in keys:
+            value = self._get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    async def set_many(
+        self,
+        values: Mapping[str, Any],
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set several values at once.
+
+        Args:
+            values: Values to cache by key
+            expiration: Optional expiration time in seconds, applied to every key
+            tags: Optional tags, applied to every key
+
+        Returns:
+            bool: True if every value was set successfully
+        """
+        tags = frozenset(tags or ())
+        results = [self._set(key, value, expiration, tags) for key, value in values.items()]
+        return all(results)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several values at once.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            int: Number of keys that were deleted
+        """
+        return sum(self._remove(key) for key in keys)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Delete every key set with any of the given tags.
+
+        Args:
+            tags: The tags to invalidate
+
+        Returns:
+            int: Number of keys that were deleted
+        """
+        keys = set()
+        for tag in tags:
+            keys.update(self._tags.get(tag, ()))
+        return sum(self._remove(key) for key in keys)
+
+    async def clear_prefix(self, prefixes: Iterable[str]) -> int:
+        """
+        Delete every key starting with any of the given prefixes.
+
+        Args:
+            prefixes: The key prefixes
+
+        Returns:
+            int: Number of keys that were deleted
+        """
+        prefixes = tuple(prefixes)
+        if not prefixes:
+            return 0
+        keys = [key for key in self._entries if key.startswith(prefixes)]
+        return sum(self._remove(key) for key in keys)
+
     async def delete(self, key: str) -> bool:
         """
         Delete a value from the cache.
-        
+
         Args:
             key: The cache key
-            
+
         Returns:
             bool: True if the value was deleted, False if key not found
         """
-        if key in self._cache:
-            del self._cache[key]
-            if key in self._expiry:
-                del self._expiry[key]
-            return True
-            
-        return False
-    
+        return self._remove(key)
+
     async def exists(self, key: str) -> bool:
         """
         Check if a key exists in the cache and is not expired.
-        
+
         Args:
             key: The cache key
-            
+
         Returns:
             bool: True if the key exists and is not expired
         """
-        if key in self._cache:
-            # Check if expired
-            if key in self._expiry and self._expiry[key] < datetime.now():
-                await self.delete(key)
-                return False
-            return True
-            
-        return False
-    
+        return self._live_entry(key) is not None
+
     async def clear(self) -> bool:
         """
         Clear all cached values.
-        
+
         Returns:
             bool: True always
         """
-        self._cache.clear()
-        self._expiry.clear()
+        self._entries.clear()
+        self._tags.clear()
+        self._expiry_heap.clear()
+        self._bytes = 0
         return True
-    
+
     async def close(self) -> None:
         """
         Close the cache connection.
         For in-memory cache, this is a no-op.
         """
         pass
-    
+
     async def cleanup_expired(self) -> int:
         """
         Delete all expired keys.
-        
+
         Returns:
             int: Number of keys deleted
         """
-        now = datetime.now()
-        expired_keys = [k for k, exp in self._expiry.items() if exp < now]
-        
-        count = 0
-        for key in expired_keys:
-            if await self.delete(key):
-                count += 1
-                
-        return count
+        return self._sweep()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters, size and hit rate.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        lookups = self.stats["hits"] + self.stats["misses"]
+        get_codec_stats = getattr(self.codec, "get_stats", None)
+        return {
+            **self.stats,
+            **({"codec": get_codec_stats()} if get_codec_stats else {}),
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "tags": len(self._tags),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def _get(self, key: str) -> Any:
+        entry = self._live_entry(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return self.codec.decode(entry[0])
+
+    def _set(self, key: str, value: Any, expiration: Optional[int], tags: Optional[Iterable[str]] = None) -> bool:
+        try:
+            value = self.codec.encode(value)
+        except TypeError as e:
+            logger.warning(f"Not caching {key}: {e}")
+            return False
+
+        self._sweep(SWEEP_BATCH)
+
+        size = len(key) + _estimate_size(value)
+        if size > self.max_bytes:
+            # Would evict everything else and still not fit
+            self._remove(key)
+            return False
+
+        expires_at = None
+        if expiration:
+            expires_at = time.monotonic() + expiration
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+
+        self._remove(key)
+        tags = frozenset(tags or ())
+        self._entries[key] = (value, expires_at, size, tags)
+        self._bytes += size
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self.stats["sets"] += 1
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            evicted_key = next(iter(self._entries))
+            self._remove(evicted_key)
+            self.stats["evictions"] += 1
+
+        self._compact_heap()
+        return True
+
+    def _live_entry(self, key: str) -> Optional[Tuple[Any, Optional[float], int, frozenset]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+        return entry
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        for tag in entry[3]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def _sweep(self, limit: Optional[int] = None) -> int:
+        now = time.monotonic()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            if limit is not None and removed >= limit:
+                break
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            # Skip heap items left behind by overwritten or deleted keys
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self.stats["expirations"] += 1
+                removed += 1
+        return removed
+
+    def _compact_heap(self) -> None:
+        # Overwriting keys leaves stale heap items; rebuild once they dominate
+        if len(self._expiry_heap) > 2 * len(self._entries) + SWEEP_BATCH:
+            self._expiry_heap = [
+                (entry[1], key) for key, entry in self._entries.items() if entry[1] is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+
+def _estimate_size(value: Any) -> int:
+    """Approximate the memory held by a cached value, in bytes."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items()) + 64
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(_estimate_size(item) for item in value) + 56
+    return sys.getsizeof(value)
@@ -0,0 +1,205 @@
+"""
+Full-page output cache for the Cryptopedia application.
+
+PageCacheMiddleware serves the final HTML of pages that opted in with
+cache_page() to anonymous readers straight from the cache, without
+running the router, the page's database calls or Jinja. Entries carry the
+page's cache tags, so the invalidate_tags() calls made when articles
+change purge the cached HTML along with the data.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.requests import Request
+
+from .base import CacheInterface
+
+logger = logging.getLogger(__name__)
+
+# Cached pages live under this key prefix
+PAGE_KEY_PREFIX = "page:"
+# Response headers that are never stored with a page
+_UNCACHED_HEADERS = {b"content-length", b"date", b"server", b"set-cookie"}
+
+# Name -> coroutine run in the background when a cached page is served
+_hit_handlers: Dict[str, Callable[[Any], Awaitable[None]]] = {}
+
+def cache_page(
+    request: Request,
+    expiration: int,
+    tags: Optional[Iterable[str]] = None,
+    on_hit: Optional[Tuple[str, Any]] = None
+) -> None:
+    """
+    Let PageCacheMiddleware store the response to this request.
+
+    Only successful HTML responses to anonymous GET requests are stored,
+    so pages call this on their success path and can do so unconditionally.
+
+    Args:
+        request: The request being answered
+        expiration: Seconds the page may be served from the cache
+        tags: Cache tags; invalidating any of them drops the page
+        on_hit: Optional (handler name, argument) for register_hit_handler,
+            run whenever the cached page is served
+    """
+    request.state.page_cache = {
+        "expiration": expiration,
+        "tags": list(tags or []),
+        "on_hit": list(on_hit) if on_hit else None,
+    }
+
+def register_hit_handler(name: str, handler: Callable[[Any], Awaitable[None]]) -> None:
+    """
+    Register work to do when a cached page is served, such as counting a view.
+
+    Args:
+        name: The name pages pass to cache_page(on_hit=...)
+        handler: Coroutine function taking the argument given to cache_page
+    """
+    _hit_handlers[name] = handler
+
+def is_anonymous(request: Request) -> bool:
+    """
+    Check whether a request carries no credentials.
+
+    Args:
+        request: The request
+
+    Returns:
+        bool: True if there is no auth cookie or Authorization header
+    """
+    return not request.cookies.get("token") and "authorization" not in request.headers
+
+def page_key(path: str, query_string: str, version: str) -> str:
+    """
+    Build the cache key of a page.
+
+    Args:
+        path: The request path
+        query_string: The raw query string; parameter order does not matter
+        version: Content version; changing it retires every cached page
+
+    Returns:
+        str: The cache key
+    """
+    query = urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))
+    return f"{PAGE_KEY_PREFIX}{version}:{path}?{query}"
+
+class PageCacheMiddleware:
+    """
+    ASGI middleware serving cached HTML pages to anonymous readers.
+
+    Hits are answered before the router runs. Misses run the app as usual,
+    streaming the response to the client while a copy is kept; the copy is
+    stored only if the page called cache_page(), the status is 200, the
+    body is HTML no larger than max_bytes and no cookie was set.
+    """
+
+    def __init__(self, app, cache: CacheInterface, version: str = "1", max_bytes: int = 1024 * 1024):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The ASGI application
+            cache: Cache the pages are stored in
+            version: Content version, part of every key
+            max_bytes: Largest page body that is stored
+        """
+        self.app = app
+        self.cache = cache
+        self.version = version
+        self.max_bytes = max_bytes
+        self._tasks = set()
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or not is_anonymous(Request(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        key = page_key(scope["path"], scope.get("query_string", b"").decode("latin-1"), self.version)
+        try:
+            entry = await self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"Page cache lookup failed: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        if entry is not None:
+            await self._send_entry(entry, send)
+            self._run_hit_handler(entry.get("on_hit"))
+            return
+
+        await self._run_and_store(key, scope, receive, send)
+
+    async def _send_entry(self, entry: Dict[str, Any], send) -> None:
+        body = bytes(entry["body"])
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in entry["headers"]]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        headers.append((b"x-page-cache", b"HIT"))
+        await send({"type": "http.response.start", "status": entry["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _run_and_store(self, key: str, scope, receive, send) -> None:
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        size = 0
+        complete = False
+
+        async def capture(message) -> None:
+            nonlocal size, complete
+            if message["type"] == "http.response.start":
+                start.update(message)
+                message = {**message, "headers": [*message.get("headers", []), (b"x-page-cache", b"MISS")]}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= self.max_bytes:
+                    chunks.append(message.get("body", b""))
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        # Shared with request.state, where cache_page() leaves its options
+        state = scope.setdefault("state", {})
+        await self.app(scope, receive, capture)
+
+        options = state.get("page_cache")
+        if options is None or not complete or size > self.max_bytes or start.get("status") != 200:
+            return
+        headers = start.get("headers", [])
+        if any(name.lower() == b"set-cookie" for name, _ in headers):
+            return
+        if not any(name.lower() == b"content-type" and value.startswith(b"text/html") for name, value in headers):
+            return
+
+        entry = {
+            "status": 200,
+            "headers": [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in headers
+                if name.lower() not in _UNCACHED_HEADERS
+            ],
+            "body": b"".join(chunks),
+            "on_hit": options["on_hit"],
+        }
+        try:
+            await self.cache.set(key, entry, options["expiration"], tags=options["tags"])
+        except Exception as e:
+            logger.warning(f"Storing page {scope['path']} failed: {e}")
+
+    def _run_hit_handler(self, on_hit: Optional[List[Any]]) -> None:
+        if not on_hit:
+            return
+        handler = _hit_handlers.get(on_hit[0])
+        if handler is None:
+            return
+        # Off the response path; the page has already been sent
+        task = asyncio.create_task(handler(on_hit[1]))
+        self._tasks.add(task)
+        task.add_done_callback(self._finish_hit_handler)
+
+    def _finish_hit_handler(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Page cache hit handler failed: {task.exception()}")
@@ -1,17 +1,53 @@
 """
 Redis cache implementation for the Cryptopedia application.
 """
-import json
-from typing import Any, Optional, Union
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
 import redis.asyncio as redis
 from .base import CacheInterface
+from .codec import BsonCodec, CacheCodec
+
+logger = logging.getLogger(__name__)
+
+# Tags are Redis sets of the keys carrying them, stored under this prefix
+TAG_KEY_PREFIX = "tag:"
+# Lifetime of a tag set holding keys that were cached without expiration
+UNEXPIRING_TAG_TTL = 30 * 24 * 3600
+# Compute locks (see CacheInterface.get_or_compute) live under this prefix
+LOCK_KEY_PREFIX = "lock:"
+# Keys requested per SCAN step and removed per UNLINK when clearing
+SCAN_COUNT = 500
+
+# Deletes a lock only if it still holds the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
 
 class RedisCache(CacheInterface):
     """
     Redis-based cache implementation for production use.
+
+    Values are stored as BSON by default, so documents read from MongoDB
+    round-trip with their ObjectId and datetime fields intact. Each tag is a
+    set of keys at tag:<tag>, written in the same transaction as the value
+    and kept alive as long as the longest-lived key it holds. Every Redis key
+    (values, tags and locks) starts with the configured prefix, which is
+    what clear() and clear_prefix() scan for.
     """
     
-    def __init__(self, host: str, port: int, password: Optional[str] = None, db: int = 0):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: Optional[str] = None,
+        db: int = 0,
+        codec: Optional[CacheCodec] = None,
+        prefix: str = ""
+    ):
         """
         Initialize the Redis cache.
         
@@ -20,7 +56,11 @@ class RedisCache(CacheInterface):
             port: Redis server port
             password: Optional Redis password
             db: Redis database number
+            codec: Value codec (defaults to BsonCodec)
+            prefix: Prepended to every Redis key so the cache can share a database
         """
+        self.codec = codec or BsonCodec()
+        self.prefix = prefix
         self.redis = redis.Redis(
             host=host,
             port=port,
@@ -39,27 +79,20 @@ class RedisCache(CacheInterface):
         Returns:
             Any: The cached value, or None if not found
         """
-        value = await self.redis.get(key)
+        value = await self.redis.get(self._key(key))
         
         if value is None:
             return None
         
-        # Try to decode as UTF-8 string
-        try:
-            value = value.decode('utf-8')
-            
-            # Try to parse as JSON
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                # Not JSON, return as is
-                return value
-                
-        except UnicodeDecodeError:
-            # Binary data, return as is
-            return value
+        return self.codec.decode(value)
     
-    async def set(self, key: str, value: Any, expiration: Optional[int] = None) -> bool:
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
         """
         Set a value in the cache.
         
@@ -67,25 +100,180 @@ class RedisCache(CacheInterface):
             key: The cache key
             value: The value to cache
             expiration: Optional expiration time in seconds
+            tags: Optional tags; invalidating any of them deletes the key
             
         Returns:
             bool: True if the value was set successfully
         """
-        # Serialize complex types to JSON
-        if isinstance(value, (dict, list, tuple, set)):
+        try:
+            value = self.codec.encode(value)
+        except TypeError as e:
+            logger.warning(f"Not caching {key}: {e}")
+            return False
+        
+        if not tags:
+            # Set in Redis with optional expiration
+            result = await self.redis.set(self._key(key), value, ex=expiration)
+            return result is True
+        
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(self._key(key), value, ex=expiration)
+        for tag in tags:
+            self._add_to_tag(pipe, tag, [key], expiration)
+        results = await pipe.execute()
+        return results[0] is True
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values with a single MGET.
+        
+        Args:
+            keys: The cache keys
+            
+        Returns:
+            Dict[str, Any]: Cached values by key; missing keys are left out
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        
+        stored = await self.redis.mget([self._key(key) for key in keys])
+        return {
+            key: self.codec.decode(value)
+            for key, value in zip(keys, stored)
+            if value is not None
+        }
+    
+    async def set_many(
+        self,
+        values: Mapping[str, Any],
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set several values in one pipelined round trip.
+        
+        Args:
+            values: Values to cache by key
+            expiration: Optional expiration time in seconds, applied to every key
+            tags: Optional tags, applied to every key
+            
+        Returns:
+            bool: True if every value was set successfully
+        """
+        encoded = {}
+        for key, value in values.items():
             try:
-                value = json.dumps(value)
-            except (TypeError, ValueError):
-                # If serialization fails, convert to string
-                value = str(value)
+                encoded[key] = self.codec.encode(value)
+            except TypeError as e:
+                logger.warning(f"Not caching {key}: {e}")
+        if not encoded:
+            return not values
+        
+        tags = list(tags or [])
+        pipe = self.redis.pipeline(transaction=bool(tags))
+        for key, value in encoded.items():
+            pipe.set(self._key(key), value, ex=expiration)
+        for tag in tags:
+            self._add_to_tag(pipe, tag, list(encoded), expiration)
+        results = await pipe.execute()
+        return len(encoded) == len(values) and all(result is True for result in results[:len(encoded)])
+    
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several values with a single DEL.
+        
+        Args:
+            keys: The cache keys
+            
+        Returns:
+            int: Number of keys that were deleted
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        return await self.redis.delete(*[self._key(key) for key in keys])
+    
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Delete every key set with any of the given tags.
+        
+        Args:
+            tags: The tags to invalidate
+            
+        Returns:
+            int: Number of keys that were deleted
+        """
+        return await self.delete_many(await self.pop_tagged_keys(tags))
+    
+    async def pop_tagged_keys(self, tags: Iterable[str]) -> List[str]:
+        """
+        Remove tags and return the keys they held, without deleting the keys.
+        
+        Args:
+            tags: The tags to remove
+            
+        Returns:
+            List[str]: Keys that carried any of the tags
+        """
+        tag_keys = [self._key(f"{TAG_KEY_PREFIX}{tag}") for tag in tags]
+        if not tag_keys:
+            return []
+        
+        # Read and drop the tag sets atomically so no key tagged meanwhile is lost
+        pipe = self.redis.pipeline(transaction=True)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        pipe.delete(*tag_keys)
+        results = await pipe.execute()
         
-        # If value is a string, encode to bytes
-        if isinstance(value, str):
-            value = value.encode('utf-8')
+        keys = set()
+        for members in results[:-1]:
+            keys.update(member.decode("utf-8") if isinstance(member, bytes) else member for member in members)
+        return sorted(keys)
+    
+    async def acquire_lock(self, name: str, timeout: float) -> Optional[str]:
+        """
+        Take a lock shared by every process using this Redis database.
         
-        # Set in Redis with optional expiration
-        result = await self.redis.set(key, value, ex=expiration)
-        return result is True
+        Args:
+            name: The lock name
+            timeout: Seconds after which the lock is released regardless
+            
+        Returns:
+            Optional[str]: A token for release_lock, or None if the lock is held elsewhere
+        """
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(
+            self._key(f"{LOCK_KEY_PREFIX}{name}"), token, nx=True, px=max(int(timeout * 1000), 1)
+        )
+        return token if acquired else None
+    
+    async def release_lock(self, name: str, token: str) -> None:
+        """
+        Release a lock taken with acquire_lock, if it has not expired and been retaken.
+        
+        Args:
+            name: The lock name
+            token: The token acquire_lock returned
+        """
+        try:
+            await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, self._key(f"{LOCK_KEY_PREFIX}{name}"), token)
+        except Exception as e:
+            # The lock expires on its own
+            logger.warning(f"Releasing cache lock {name} failed: {e}")
+    
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+    
+    def _add_to_tag(self, pipe, tag: str, keys: List[str], expiration: Optional[int]) -> None:
+        tag_key = self._key(f"{TAG_KEY_PREFIX}{tag}")
+        ttl = expiration or UNEXPIRING_TAG_TTL
+        pipe.sadd(tag_key, *keys)
+        # Start the TTL on a new tag set, otherwise only ever extend it
+        # (EXPIRE NX/GT need Redis 7)
+        pipe.expire(tag_key, ttl, nx=True)
+        pipe.expire(tag_key, ttl, gt=True)
     
     async def delete(self, key: str) -> bool:
         """
@@ -97,7 +285,7 @@ class RedisCache(CacheInterface):
         Returns:
             bool: True if the value was deleted, False if key not found
         """
-        result = await self.redis.delete(key)
+        result = await self.redis.delete(self._key(key))
         return result > 0
     
     async def exists(self, key: str) -> bool:
@@ -110,22 +298,62 @@ class RedisCache(CacheInterface):
         Returns:
             bool: True if the key exists
         """
-        result = await self.redis.exists(key)
+        result = await self.redis.exists(self._key(key))
         return result > 0
     
     async def clear(self) -> bool:
         """
-        Clear all cached values.
-        WARNING: This will flush the entire Redis database.
+        Clear all cached values under this cache's key prefix.
+        
+        Keys are found with incremental SCAN and removed with UNLINK, so
+        Redis is not blocked and other data in the database is left alone.
+        With an empty prefix this still removes every key in the database.
         
         Returns:
             bool: True if the operation was successful
         """
-        result = await self.redis.flushdb()
-        return result is True
+        await self.clear_prefix([""])
+        return True
+    
+    async def clear_prefix(self, prefixes: Iterable[str]) -> int:
+        """
+        Delete every key starting with any of the given prefixes.
+        
+        Args:
+            prefixes: Key prefixes, relative to this cache's key prefix
+            
+        Returns:
+            int: Number of keys that were deleted
+        """
+        deleted = 0
+        for prefix in prefixes:
+            pattern = _glob_escape(self._key(prefix)) + "*"
+            batch = []
+            async for key in self.redis.scan_iter(match=pattern, count=SCAN_COUNT):
+                batch.append(key)
+                if len(batch) >= SCAN_COUNT:
+                    deleted += await self.redis.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis.unlink(*batch)
+        return deleted
     
     async def close(self) -> None:
         """
         Close the Redis connection.
         """
         await self.redis.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get codec statistics (compression ratio and time, when compressing).
+        
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        get_codec_stats = getattr(self.codec, "get_stats", None)
+        return {"codec": get_codec_stats()} if get_codec_stats else {}
+
+def _glob_escape(text: str) -> str:
+    """Escape the characters SCAN MATCH treats as pattern syntax."""
+    return "".join(f"\\{char}" if char in "*?[]\\" else char for char in text)
@@ -0,0 +1,32 @@
+"""
+Cache tag names for the Cryptopedia application.
+
+Entries derived from an article or user are set with that object's tag,
+and listing pages with a listing tag, so one invalidate_tags() call
+purges every copy without knowing the keys.
+"""
+from typing import Any, Dict, List
+
+# Paginated article listings and recent changes
+ARTICLE_LISTINGS = "listing:articles"
+# Paginated category listings
+CATEGORY_LISTINGS = "listing:categories"
+
+# Key prefixes by category, for clearing part of the cache from the admin API
+CACHE_CATEGORIES: Dict[str, List[str]] = {
+    "articles": ["article:", "featured_article"],
+    "listings": ["articles_list_", "categories_list_", "recent_changes_", "homepage_data", "user_profile:"],
+    "stats": [
+        "statistics", "admin_dashboard_", "community_", "donation_stats", "crypto_admin_dashboard"
+    ],
+    # Full rendered pages (see services.cache.page)
+    "pages": ["page:"],
+}
+
+def article_tag(article_id: Any) -> str:
+    """Tag for entries derived from one article (by id and by slug)."""
+    return f"article:{article_id}"
+
+def user_tag(user_id: Any) -> str:
+    """Tag for entries derived from one user (their profile page lists)."""
+    return f"user:{user_id}"
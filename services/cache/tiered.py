@@ -0,0 +1,377 @@
+"""
+Two-tier cache for the Cryptopedia application.
+
+A small per-process InMemoryCache (L1) sits in front of the shared
+RedisCache (L2). Writes and deletes go to both tiers and are broadcast on
+a Redis pub/sub channel, so every worker drops its L1 copy of the key.
+Prefix clears are broadcast the same way.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .base import CacheInterface
+from .memory import InMemoryCache
+from .redis import RedisCache
+
+logger = logging.getLogger(__name__)
+
+class TieredCache(CacheInterface):
+    """
+    Per-process L1 cache in front of Redis with pub/sub invalidation.
+
+    L1 entries live at most local_ttl seconds, which bounds staleness if an
+    invalidation message is ever lost. Whenever the subscription is
+    (re)established the whole L1 is dropped for the same reason.
+    """
+
+    def __init__(
+        self,
+        remote: RedisCache,
+        local: Optional[InMemoryCache] = None,
+        local_ttl: int = 30,
+        channel: str = "cache:invalidate",
+        reconnect_delay: float = 1.0
+    ):
+        """
+        Initialize the two-tier cache.
+
+        Args:
+            remote: Shared Redis cache (L2)
+            local: Per-process cache (L1); a small InMemoryCache by default
+            local_ttl: Longest time in seconds an L1 entry is served
+            channel: Redis pub/sub channel for invalidation messages
+            reconnect_delay: Seconds to wait before resubscribing after an error
+        """
+        self.remote = remote
+        self.local = local or InMemoryCache(max_entries=2000, max_bytes=16 * 1024 * 1024)
+        self.local_ttl = local_ttl
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+
+        # Identifies this process's messages so it skips its own broadcasts
+        self.origin = uuid.uuid4().hex
+        # Bumped on every invalidation; a read that saw it change does not fill L1
+        self._generation = 0
+        self._task: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+        self.stats = {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "invalidations_sent": 0,
+            "invalidations_received": 0,
+            "resubscribes": 0,
+        }
+
+    async def start(self) -> None:
+        """
+        Subscribe to invalidation messages in a background task.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def get(self, key: str) -> Any:
+        """
+        Get a value from L1, falling back to Redis.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Any: The cached value, or None if not found
+        """
+        value = await self.local.get(key)
+        if value is not None:
+            self.stats["l1_hits"] += 1
+            return value
+
+        generation = self._generation
+        value = await self.remote.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["l2_hits"] += 1
+        # An invalidation during the read may mean the value is already stale
+        if generation == self._generation and self._subscribed.is_set():
+            await self.local.set(key, value, self.local_ttl)
+        return value
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set a value in both tiers and evict it from other workers' L1.
+
+        Args:
+            key: The cache key
+            value: The value to cache
+            expiration: Optional expiration time in seconds
+            tags: Optional tags, recorded in Redis
+
+        Returns:
+            bool: True if the value was set in Redis
+        """
+        await self.local.delete(key)
+        result = await self.remote.set(key, value, expiration, tags)
+        await self._publish({"keys": [key]})
+        if result and self._subscribed.is_set():
+            await self.local.set(key, value, min(expiration or self.local_ttl, self.local_ttl))
+        return result
+
+    async def delete(self, key: str) -> bool:
+        """
+        Delete a value from both tiers and from other workers' L1.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            bool: True if the value was deleted from Redis
+        """
+        await self.local.delete(key)
+        result = await self.remote.delete(key)
+        await self._publish({"keys": [key]})
+        return result
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get several values from L1, fetching the rest from Redis in one MGET.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            Dict[str, Any]: Cached values by key; missing keys are left out
+        """
+        keys = list(keys)
+        values = await self.local.get_many(keys)
+        self.stats["l1_hits"] += len(values)
+
+        remaining = [key for key in keys if key not in values]
+        if not remaining:
+            return values
+
+        generation = self._generation
+        fetched = await self.remote.get_many(remaining)
+        self.stats["l2_hits"] += len(fetched)
+        self.stats["misses"] += len(remaining) - len(fetched)
+        if fetched and generation == self._generation and self._subscribed.is_set():
+            await self.local.set_many(fetched, self.local_ttl)
+
+        values.update(fetched)
+        return values
+
+    async def set_many(
+        self,
+        values: Mapping[str, Any],
+        expiration: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Set several values in both tiers with a single invalidation message.
+
+        Args:
+            values: Values to cache by key
+            expiration: Optional expiration time in seconds, applied to every key
+            tags: Optional tags, recorded in Redis
+
+        Returns:
+            bool: True if every value was set in Redis
+        """
+        keys = list(values)
+        await self.local.delete_many(keys)
+        result = await self.remote.set_many(values, expiration, tags)
+        await self._publish({"keys": keys})
+        if result and self._subscribed.is_set():
+            await self.local.set_many(values, min(expiration or self.local_ttl, self.local_ttl))
+        return result
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several values from both tiers with a single invalidation message.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            int: Number of keys deleted from Redis
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        await self.local.delete_many(keys)
+        deleted = await self.remote.delete_many(keys)
+        await self._publish({"keys": keys})
+        return deleted
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Delete every key carrying any of the tags, in Redis and in every L1.
+
+        The tag index lives only in Redis; the keys it held are broadcast
+        like any other delete.
+
+        Args:
+            tags: The tags to invalidate
+
+        Returns:
+            int: Number of keys deleted from Redis
+        """
+        keys = await self.remote.pop_tagged_keys(tags)
+        return await self.delete_many(keys)
+
+    async def clear_prefix(self, prefixes: Iterable[str]) -> int:
+        """
+        Delete every key starting with any of the prefixes, in Redis and in every L1.
+
+        Args:
+            prefixes: The key prefixes
+
+        Returns:
+            int: Number of keys deleted from Redis
+        """
+        prefixes = list(prefixes)
+        if not prefixes:
+            return 0
+        await self.local.clear_prefix(prefixes)
+        deleted = await self.remote.clear_prefix(prefixes)
+        await self._publish({"prefixes": prefixes})
+        return deleted
+
+    async def acquire_lock(self, name: str, timeout: float) -> Optional[str]:
+        """
+        Take a compute lock in Redis, shared by every worker.
+
+        Args:
+            name: The lock name
+            timeout: Seconds after which the lock is released regardless
+
+        Returns:
+            Optional[str]: A token for release_lock, or None if the lock is held elsewhere
+        """
+        return await self.remote.acquire_lock(name, timeout)
+
+    async def release_lock(self, name: str, token: str) -> None:
+        """
+        Release a lock taken with acquire_lock.
+
+        Args:
+            name: The lock name
+            token: The token acquire_lock returned
+        """
+        await self.remote.release_lock(name, token)
+
+    async def exists(self, key: str) -> bool:
+        """
+        Check if a key exists in either tier.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            bool: True if the key exists
+        """
+        return await self.local.exists(key) or await self.remote.exists(key)
+
+    async def clear(self) -> bool:
+        """
+        Clear both tiers and every worker's L1.
+
+        Returns:
+            bool: True if Redis was cleared
+        """
+        await self.local.clear()
+        result = await self.remote.clear()
+        await self._publish({"clear": True})
+        return result
+
+    async def close(self) -> None:
+        """
+        Stop the subscription and close the Redis connection.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._subscribed.clear()
+        await self.remote.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get tier hit counts, invalidation counts and per-tier statistics.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        return {
+            **self.stats,
+            "subscribed": self._subscribed.is_set(),
+            "l1": self.local.get_stats(),
+            "l2": self.remote.get_stats()
+        }
+
+    async def _publish(self, message: Dict[str, Any]) -> None:
+        try:
+            await self.remote.redis.publish(self.channel, json.dumps({"origin": self.origin, **message}))
+            self.stats["invalidations_sent"] += 1
+        except Exception as e:
+            # Other workers fall back on local_ttl
+            logger.warning(f"Cache invalidation broadcast failed: {e}")
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.remote.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Messages may have been missed while unsubscribed
+                await self._invalidate(None)
+                self._subscribed.set()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscription failed: {e}")
+            finally:
+                self._subscribed.clear()
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+            self.stats["resubscribes"] += 1
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _handle_message(self, data: Any) -> None:
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed cache invalidation message: {data!r}")
+            return
+        if message.get("origin") == self.origin:
+            return
+        self.stats["invalidations_received"] += 1
+        if message.get("prefixes"):
+            self._generation += 1
+            await self.local.clear_prefix(message["prefixes"])
+            return
+        await self._invalidate(None if message.get("clear") else message.get("keys", []))
+
+    async def _invalidate(self, keys: Optional[List[str]]) -> None:
+        self._generation += 1
+        if keys is None:
+            await self.local.clear()
+            return
+        await self.local.delete_many(keys)
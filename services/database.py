@@ -2,44 +2,230 @@
 Database service for the Kryptopedia application.
 """
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo import ASCENDING, TEXT
+from pymongo import monitoring
 from pymongo.errors import DuplicateKeyError
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import importlib.util
 import logging
+import threading
+
+from services.indexes import ensure_indexes
+from services.cache.instrumented import Histogram, LATENCY_BUCKETS, histogram_lines, prometheus_label
 
 logger = logging.getLogger(__name__)
 
+# Wire compressors and the module each needs; zlib is built in
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+# Commands whose collection is not the command's own value
+_COLLECTION_FIELDS = {"getMore": "collection"}
+# Group for commands that do not name a collection (hello, ping, ...)
+NO_COLLECTION = "-"
+
+def available_compressors(names: List[str]) -> List[str]:
+    """
+    Drop wire compressors whose module is not installed.
+    
+    Args:
+        names: Compressors in order of preference
+        
+    Returns:
+        List[str]: The compressors that can be used
+    """
+    available = []
+    for name in names:
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in _COMPRESSOR_MODULES:
+            logger.warning(f"Unknown MongoDB compressor: {name}")
+            continue
+        module = _COMPRESSOR_MODULES[name]
+        if module and importlib.util.find_spec(module) is None:
+            logger.info(f"MongoDB {name} compression unavailable: {module} is not installed")
+            continue
+        available.append(name)
+    return available
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Records MongoDB command counts, failures and latencies per collection.
+    
+    pymongo calls the listener from its own threads, so updates are locked.
+    """
+    
+    def __init__(self):
+        self.commands: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._collections: Dict[Tuple[Any, int], str] = {}
+        self._lock = threading.Lock()
+    
+    def started(self, event) -> None:
+        field = _COLLECTION_FIELDS.get(event.command_name, event.command_name)
+        collection = event.command.get(field)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else NO_COLLECTION
+            )
+    
+    def succeeded(self, event) -> None:
+        self._record(event, failed=False)
+    
+    def failed(self, event) -> None:
+        self._record(event, failed=True)
+    
+    def _record(self, event, failed: bool) -> None:
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), NO_COLLECTION)
+            stats = self.commands.get((collection, event.command_name))
+            if stats is None:
+                stats = self.commands[(collection, event.command_name)] = {
+                    "count": 0,
+                    "failures": 0,
+                    "latency": Histogram(LATENCY_BUCKETS),
+                }
+            stats["count"] += 1
+            if failed:
+                stats["failures"] += 1
+            stats["latency"].observe(event.duration_micros / 1_000_000)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the recorded command statistics.
+        
+        Returns:
+            Dict[str, Any]: Count, failures and latency per collection and command
+        """
+        with self._lock:
+            result: Dict[str, Any] = {}
+            for (collection, command), stats in sorted(self.commands.items()):
+                result.setdefault(collection, {})[command] = {
+                    "count": stats["count"],
+                    "failures": stats["failures"],
+                    "latency_seconds": stats["latency"].snapshot(),
+                }
+            return result
+    
+    def render_metrics(self, namespace: str = "kryptopedia_mongodb") -> str:
+        """
+        Render the command metrics in the Prometheus text format.
+        
+        Args:
+            namespace: Prefix for the metric names
+            
+        Returns:
+            str: The metrics, one sample per line
+        """
+        with self._lock:
+            items = sorted(self.commands.items())
+            labels = {
+                key: f'collection="{prometheus_label(key[0])}",command="{prometheus_label(key[1])}"'
+                for key, _ in items
+            }
+            lines = []
+            for counter in ("count", "failures"):
+                metric = f"{namespace}_commands_total" if counter == "count" else f"{namespace}_command_failures_total"
+                lines.append(f"# TYPE {metric} counter")
+                for key, stats in items:
+                    lines.append(f"{metric}{{{labels[key]}}} {stats[counter]}")
+            
+            lines.append(f"# TYPE {namespace}_command_latency_seconds histogram")
+            for key, stats in items:
+                lines.extend(histogram_lines(f"{namespace}_command_latency_seconds", labels[key], stats["latency"]))
+            return "\n".join(lines) + "\n"
+
 class Database:
     """
     Database service for MongoDB operations.
+    
+    The application shares one instance (dependencies.database.db_service),
+    and so one connection pool.
     """
-    def __init__(self, mongo_uri: str, db_name: str):
+    def __init__(
+        self,
+        mongo_uri: str,
+        db_name: str,
+        max_pool_size: int = 100,
+        min_pool_size: int = 0,
+        max_idle_time_ms: Optional[int] = None,
+        connect_timeout_ms: int = 20000,
+        server_selection_timeout_ms: int = 30000,
+        socket_timeout_ms: Optional[int] = None,
+        compressors: Optional[List[str]] = None,
+        read_preference: str = "primary",
+        monitor_commands: bool = True
+    ):
         """
         Initialize database connection.
         
         Args:
             mongo_uri: MongoDB connection URI
             db_name: Database name
+            max_pool_size: Most connections per server
+            min_pool_size: Connections kept open when idle
+            max_idle_time_ms: Close pooled connections idle this long (None: never)
+            connect_timeout_ms: Timeout for opening a connection
+            server_selection_timeout_ms: How long to wait for a usable server
+            socket_timeout_ms: Timeout for a reply on an open connection (None: no limit)
+            compressors: Wire compressors in order of preference (zstd, snappy, zlib)
+            read_preference: Read preference mode, e.g. "primary" or "secondaryPreferred"
+            monitor_commands: Whether to record per-collection command metrics
         """
         self.client: Optional[AsyncIOMotorClient] = None
         self.db: Optional[AsyncIOMotorDatabase] = None
         self.mongo_uri = mongo_uri
         self.db_name = db_name
+        self.client_options: Dict[str, Any] = {
+            "maxPoolSize": max_pool_size,
+            "minPoolSize": min_pool_size,
+            "maxIdleTimeMS": max_idle_time_ms,
+            "connectTimeoutMS": connect_timeout_ms,
+            "serverSelectionTimeoutMS": server_selection_timeout_ms,
+            "socketTimeoutMS": socket_timeout_ms,
+            "readPreference": read_preference,
+        }
+        compressors = available_compressors(compressors or [])
+        if compressors:
+            self.client_options["compressors"] = ",".join(compressors)
+        self.metrics: Optional[CommandMetrics] = CommandMetrics() if monitor_commands else None
+        self._connect_lock = asyncio.Lock()
     
     async def connect(self):
         """
         Connect to the MongoDB database.
+        
+        Does nothing if already connected, so concurrent callers share one client.
         """
-        try:
-            self.client = AsyncIOMotorClient(self.mongo_uri)
-            self.db = self.client[self.db_name]
-            logger.info(f"Connected to MongoDB database: {self.db_name}")
-            
-            # Create indices when connecting
-            await self.create_indices()
-        except Exception as e:
-            logger.error(f"Error connecting to MongoDB: {str(e)}")
-            raise
+        async with self._connect_lock:
+            if self.client is not None:
+                return
+            try:
+                client = AsyncIOMotorClient(
+                    self.mongo_uri,
+                    event_listeners=[self.metrics] if self.metrics else [],
+                    **self.client_options
+                )
+                self.client = client
+                self.db = client[self.db_name]
+                logger.info(f"Connected to MongoDB database: {self.db_name}")
+                
+                # Create indices when connecting
+                await self.create_indices()
+            except Exception as e:
+                logger.error(f"Error connecting to MongoDB: {str(e)}")
+                raise
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get connection settings and command statistics.
+        
+        Returns:
+            Dict[str, Any]: Pool options and per-collection command metrics
+        """
+        return {
+            "connected": self.client is not None,
+            "options": {name: value for name, value in self.client_options.items() if value is not None},
+            "commands": self.metrics.get_stats() if self.metrics else None,
+        }
     
     async def close(self):
         """
@@ -47,43 +233,20 @@ class Database:
         """
         if self.client is not None:  # Changed from 'if self.client:' to avoid bool() evaluation
             self.client.close()
+            self.client = None
+            self.db = None
             logger.info("Closed MongoDB connection")
     
     async def create_indices(self):
         """
-        Create necessary indices for the application.
+        Create necessary indices for the application (see services.indexes).
         """
         try:
             if self.db is None:  # Changed from 'if not self.db:' to avoid bool() evaluation
                 await self.connect()
                 
-            # Articles collection indices
-            await self.db["articles"].create_index([("title", TEXT), ("content", TEXT), ("summary", TEXT)])
-            await self.db["articles"].create_index([("slug", ASCENDING)], unique=True)
-            await self.db["articles"].create_index([("status", ASCENDING)])
-            await self.db["articles"].create_index([("createdAt", ASCENDING)])
-            await self.db["articles"].create_index([("categories", ASCENDING)])
-            await self.db["articles"].create_index([("tags", ASCENDING)])
-            
-            # Users collection indices
-            await self.db["users"].create_index([("username", ASCENDING)], unique=True)
-            await self.db["users"].create_index([("email", ASCENDING)], unique=True)
-            
-            # Revisions collection indices
-            await self.db["revisions"].create_index([("articleId", ASCENDING)])
-            await self.db["revisions"].create_index([("createdAt", ASCENDING)])
-            
-            # Proposals collection indices
-            await self.db["proposals"].create_index([("articleId", ASCENDING)])
-            await self.db["proposals"].create_index([("status", ASCENDING)])
-            
-            # Media collection indices
-            await self.db["media"].create_index([("filename", ASCENDING)], unique=True)
-            
-            # Rewards collection indices
-            await self.db["rewards"].create_index([("articleId", ASCENDING)])
-            
-            logger.info("Created MongoDB indices")
+            # Declared in services.indexes, with the queries they serve
+            await ensure_indexes(self.db)
         except Exception as e:
             logger.error(f"Error creating MongoDB indices: {str(e)}")
             raise
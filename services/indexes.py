@@ -0,0 +1,356 @@
+"""
+MongoDB index specification for the Cryptopedia application.
+
+INDEXES declares every index the application relies on, and QUERY_SHAPES
+lists the hot queries of the routes and pages (with sample values) that
+those indexes are meant to serve. ensure_indexes() creates the indexes;
+audit_query_shapes() explains each shape against a live database and
+flags collection scans and in-memory sorts (see audit_indexes.py).
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+logger = logging.getLogger(__name__)
+
+# Case-insensitive comparison of page titles (see services.links.page_key)
+TITLE_COLLATION = {"locale": "en", "strength": 2}
+
+# Indexes per collection: "keys" as passed to create_index, plus index options
+INDEXES: Dict[str, List[Dict[str, Any]]] = {
+    "articles": [
+        {"keys": [("title", TEXT), ("content", TEXT), ("summary", TEXT)]},
+        {"keys": [("slug", ASCENDING)], "unique": True},
+        # Published listings: newest/oldest, most viewed, by title
+        {"keys": [("status", ASCENDING), ("createdAt", DESCENDING)]},
+        {"keys": [("status", ASCENDING), ("views", DESCENDING)]},
+        {"keys": [("status", ASCENDING), ("title", ASCENDING)]},
+        # Unfiltered admin listing
+        {"keys": [("createdAt", ASCENDING)]},
+        # Category pages, sorted by title by default
+        {"keys": [("categories", ASCENDING), ("status", ASCENDING), ("title", ASCENDING)]},
+        {"keys": [("tags", ASCENDING)]},
+        # A user's articles on their profile
+        {"keys": [("createdBy", ASCENDING), ("createdAt", DESCENDING)]},
+        # Reverse template dependency index: which articles transclude a template
+        {"keys": [("templates", ASCENDING)]},
+        {"keys": [("namespace", ASCENDING), ("title", ASCENDING)]},
+        # Red-link checks match titles regardless of case
+        {
+            "keys": [("namespace", ASCENDING), ("title", ASCENDING)],
+            "name": "namespace_1_title_1_ci",
+            "collation": TITLE_COLLATION,
+        },
+    ],
+    # Outgoing links per article, and "What links here" / existence checks per target
+    "links": [
+        {
+            "keys": [("sourceId", ASCENDING), ("targetNamespace", ASCENDING), ("targetTitle", ASCENDING)],
+            "unique": True,
+        },
+        {"keys": [("targetNamespace", ASCENDING), ("targetTitle", ASCENDING), ("sourceId", ASCENDING)]},
+    ],
+    "users": [
+        {"keys": [("username", ASCENDING)], "unique": True},
+        {"keys": [("email", ASCENDING)], "unique": True},
+        # Admin user list and new-user activity
+        {"keys": [("joinDate", DESCENDING)]},
+    ],
+    "revisions": [
+        # An article's history, newest first
+        {"keys": [("articleId", ASCENDING), ("createdAt", DESCENDING)]},
+        # Recent changes
+        {"keys": [("createdAt", ASCENDING)]},
+        # A user's contributions
+        {"keys": [("createdBy", ASCENDING), ("createdAt", DESCENDING)]},
+    ],
+    "proposals": [
+        {"keys": [("articleId", ASCENDING), ("proposedAt", DESCENDING)]},
+        # Pending (or any status) queue, newest first
+        {"keys": [("status", ASCENDING), ("proposedAt", DESCENDING)]},
+        # Recent changes and unfiltered listings
+        {"keys": [("proposedAt", DESCENDING)]},
+        {"keys": [("proposedBy", ASCENDING), ("proposedAt", DESCENDING)]},
+    ],
+    "media": [
+        {"keys": [("filename", ASCENDING)], "unique": True},
+    ],
+    "rewards": [
+        {"keys": [("articleId", ASCENDING)]},
+        # A user's rewards on their profile
+        {"keys": [("rewardedUser", ASCENDING), ("rewardedAt", DESCENDING)]},
+    ],
+    "categories": [
+        {"keys": [("status", ASCENDING), ("name", ASCENDING)]},
+        {"keys": [("parent_category", ASCENDING), ("status", ASCENDING), ("name", ASCENDING)]},
+        {"keys": [("status", ASCENDING), ("article_count", DESCENDING)]},
+    ],
+}
+
+_SAMPLE_ID = ObjectId("000000000000000000000000")
+_SAMPLE_DATE = datetime(2024, 1, 1)
+
+# The hot queries, with sample values, and where they are issued
+QUERY_SHAPES: List[Dict[str, Any]] = [
+    {
+        "name": "published articles, newest first",
+        "collection": "articles",
+        "filter": {"status": "published"},
+        "sort": [("createdAt", -1)],
+        "source": "pages/home.py, pages/articles_html.articles_list_page",
+    },
+    {
+        "name": "published articles, most viewed",
+        "collection": "articles",
+        "filter": {"status": "published"},
+        "sort": [("views", -1)],
+        "source": "pages/home.py, services/warmup.py",
+    },
+    {
+        "name": "published articles by title",
+        "collection": "articles",
+        "filter": {"status": "published"},
+        "sort": [("title", 1)],
+        "source": "pages/articles_html.articles_list_page",
+    },
+    {
+        "name": "category articles by title",
+        "collection": "articles",
+        "filter": {"categories": "Bitcoin", "status": "published"},
+        "sort": [("title", 1)],
+        "source": "pages/categories_html.category_page",
+    },
+    {
+        "name": "article by slug",
+        "collection": "articles",
+        "filter": {"slug": "bitcoin"},
+        "source": "pages/articles.py",
+    },
+    {
+        "name": "existing link targets",
+        "collection": "articles",
+        "filter": {"namespace": "Help", "title": {"$in": ["Editing", "Markup"]}, "status": {"$ne": "deleted"}},
+        "collation": TITLE_COLLATION,
+        "source": "services/links.PageIndex.find_missing",
+    },
+    {
+        "name": "user's articles",
+        "collection": "articles",
+        "filter": {"createdBy": _SAMPLE_ID},
+        "sort": [("createdAt", -1)],
+        "source": "routes/profile.profile_page",
+    },
+    {
+        "name": "all articles, newest first",
+        "collection": "articles",
+        "filter": {},
+        "sort": [("createdAt", -1)],
+        "source": "pages/admin.py, routes/admin.py",
+    },
+    {
+        "name": "recent revisions",
+        "collection": "revisions",
+        "filter": {},
+        "sort": [("createdAt", -1)],
+        "source": "pages/special.recent_changes_page, pages/home.py",
+    },
+    {
+        "name": "article history",
+        "collection": "revisions",
+        "filter": {"articleId": _SAMPLE_ID},
+        "sort": [("createdAt", -1)],
+        "source": "pages/articles_html.py, routes/articles.py",
+    },
+    {
+        "name": "user's contributions",
+        "collection": "revisions",
+        "filter": {"createdBy": _SAMPLE_ID},
+        "sort": [("createdAt", -1)],
+        "source": "routes/profile.profile_page",
+    },
+    {
+        "name": "recent proposals",
+        "collection": "proposals",
+        "filter": {},
+        "sort": [("proposedAt", -1)],
+        "source": "pages/special.recent_changes_page",
+    },
+    {
+        "name": "proposals by status",
+        "collection": "proposals",
+        "filter": {"status": "pending"},
+        "sort": [("proposedAt", -1)],
+        "source": "routes/proposals.get_pending_proposals, pages/articles_html.proposals_list_page",
+    },
+    {
+        "name": "article proposals",
+        "collection": "proposals",
+        "filter": {"articleId": _SAMPLE_ID},
+        "sort": [("proposedAt", -1)],
+        "source": "routes/proposals.get_article_proposals",
+    },
+    {
+        "name": "user's proposals",
+        "collection": "proposals",
+        "filter": {"proposedBy": _SAMPLE_ID},
+        "sort": [("proposedAt", -1)],
+        "source": "routes/proposals.get_all_proposals, routes/profile.profile_page",
+    },
+    {
+        "name": "user's rewards",
+        "collection": "rewards",
+        "filter": {"rewardedUser": _SAMPLE_ID},
+        "sort": [("rewardedAt", -1)],
+        "source": "routes/profile.profile_page",
+    },
+    {
+        "name": "users, newest first",
+        "collection": "users",
+        "filter": {},
+        "sort": [("joinDate", -1)],
+        "source": "pages/admin.py",
+    },
+    {
+        "name": "users joined since",
+        "collection": "users",
+        "filter": {"joinDate": {"$gte": _SAMPLE_DATE}},
+        "sort": [("joinDate", -1)],
+        "source": "pages/admin.py",
+    },
+    {
+        "name": "active categories by name",
+        "collection": "categories",
+        "filter": {"status": "active"},
+        "sort": [("name", 1)],
+        "source": "pages/categories_html.categories_list_page",
+    },
+    {
+        "name": "subcategories",
+        "collection": "categories",
+        "filter": {"parent_category": "Blockchain", "status": "active"},
+        "sort": [("name", 1)],
+        "source": "pages/categories_html.category_page",
+    },
+    {
+        "name": "popular categories",
+        "collection": "categories",
+        "filter": {"status": "active", "article_count": {"$gt": 0}},
+        "sort": [("article_count", -1)],
+        "source": "pages/categories_html.categories_list_page",
+    },
+]
+
+def index_models(collection: str) -> List[IndexModel]:
+    """
+    Build the index models declared for a collection.
+
+    Args:
+        collection: Collection name
+
+    Returns:
+        List[IndexModel]: The collection's indexes
+    """
+    return [
+        IndexModel(spec["keys"], **{name: value for name, value in spec.items() if name != "keys"})
+        for spec in INDEXES.get(collection, [])
+    ]
+
+async def ensure_indexes(db) -> None:
+    """
+    Create every declared index. Existing indexes are left as they are.
+
+    Args:
+        db: Database connection
+    """
+    for collection in INDEXES:
+        await db[collection].create_indexes(index_models(collection))
+    logger.info("Created MongoDB indices")
+
+def _plan_stages(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """List the stages of a query plan tree."""
+    if not plan:
+        return []
+    stages = [plan["stage"]] if "stage" in plan else []
+    if "queryPlan" in plan:
+        # Slot-based engine plans wrap the classic tree
+        stages.extend(_plan_stages(plan["queryPlan"]))
+    stages.extend(_plan_stages(plan.get("inputStage")))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+def _index_name(plan: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Find the name of the index a plan scans, if any."""
+    if not plan:
+        return None
+    if "indexName" in plan:
+        return plan["indexName"]
+    for child in [plan.get("queryPlan"), plan.get("inputStage"), *plan.get("inputStages", [])]:
+        name = _index_name(child)
+        if name:
+            return name
+    return None
+
+async def explain_query_shape(db, shape: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Explain one query shape and flag collection scans and in-memory sorts.
+
+    Args:
+        db: Database connection
+        shape: An entry of QUERY_SHAPES
+
+    Returns:
+        Dict[str, Any]: The shape's name, plan stages, index used and problems
+    """
+    find = {"find": shape["collection"], "filter": shape["filter"], "limit": shape.get("limit", 20)}
+    if shape.get("sort"):
+        find["sort"] = dict(shape["sort"])
+    if shape.get("collation"):
+        find["collation"] = shape["collation"]
+    explained = await db.command({"explain": find, "verbosity": "queryPlanner"})
+    plan = explained.get("queryPlanner", {}).get("winningPlan", {})
+    stages = _plan_stages(plan)
+
+    problems = []
+    if "COLLSCAN" in stages:
+        problems.append("collection scan")
+    if "SORT" in stages:
+        problems.append("in-memory sort")
+    return {
+        "name": shape["name"],
+        "collection": shape["collection"],
+        "source": shape.get("source"),
+        "stages": stages,
+        "index": _index_name(plan),
+        "problems": problems,
+    }
+
+async def audit_query_shapes(db, shapes: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Explain every registered query shape.
+
+    Args:
+        db: Database connection
+        shapes: Shapes to explain (default: QUERY_SHAPES)
+
+    Returns:
+        List[Dict[str, Any]]: One result per shape, see explain_query_shape
+    """
+    results = []
+    for shape in shapes if shapes is not None else QUERY_SHAPES:
+        try:
+            results.append(await explain_query_shape(db, shape))
+        except Exception as e:
+            logger.error(f"Explaining {shape['name']} failed: {e}")
+            results.append({
+                "name": shape["name"],
+                "collection": shape["collection"],
+                "source": shape.get("source"),
+                "stages": [],
+                "index": None,
+                "problems": [f"explain failed: {e}"],
+            })
+    return results
@@ -0,0 +1,566 @@
+# File: services/links.py
+"""
+Link table for the Kryptopedia application.
+
+Every internal link in an article's rendered markup (templates included)
+is stored as one document in the "links" collection:
+
+    {"sourceId": ObjectId, "targetNamespace": "", "targetTitle": "Bitcoin", "createdAt": ...}
+
+The collection is indexed from the source side (to diff an article's links
+on save) and from the target side (for "What links here" and red-link
+checks). Saves only insert and delete the links that changed.
+
+Red links are found with the per-process PageIndex: a set of the pages that
+exist, kept current from the articles change stream. Only targets missing
+from the set are checked against the database, with one query per document.
+"""
+import asyncio
+import logging
+import re
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+import config
+from services.indexes import TITLE_COLLATION
+from utils.namespace import parse_title_with_namespace, is_valid_namespace
+from utils.wiki_parser import tokenize_wiki_markup, transclude_templates, iter_internal_links
+
+logger = logging.getLogger(__name__)
+
+LINKS_COLLECTION = "links"
+
+# Category links categorize the page rather than link to it; they are
+# tracked through the article's "categories" field instead
+UNTRACKED_NAMESPACES = {"Category"}
+
+# Links into these namespaces point at media files and user profiles rather
+# than articles, so they are never shown as red links
+UNCHECKED_NAMESPACES = {"File", "User"}
+
+# Server error code for change streams on a standalone mongod
+_CHANGE_STREAMS_UNSUPPORTED = 40573
+
+_WHITESPACE_RE = re.compile(r'[\s_]+')
+
+def normalize_link_target(target: str) -> Optional[Tuple[str, str]]:
+    """
+    Normalize a link target to the (namespace, title) pair it points to.
+
+    Section anchors are dropped, underscores and runs of whitespace become a
+    single space and the first letter of the title is capitalized.
+
+    Args:
+        target: Link target as written, e.g. "category:blockchain#History"
+
+    Returns:
+        Optional[Tuple[str, str]]: (namespace, title), or None for targets
+        that are not tracked (anchors only, categories)
+    """
+    target = _WHITESPACE_RE.sub(' ', target.split('#', 1)[0]).strip()
+    if not target:
+        return None
+
+    if ':' in target:
+        prefix, rest = target.split(':', 1)
+        if is_valid_namespace(prefix.strip().capitalize()):
+            target = f"{prefix.strip().capitalize()}:{rest}"
+
+    namespace, title = parse_title_with_namespace(target)
+    if not title or namespace in UNTRACKED_NAMESPACES:
+        return None
+
+    return namespace, title[0].upper() + title[1:]
+
+def extract_link_targets(markup: str, templates: Optional[Dict[str, list]] = None) -> Set[Tuple[str, str]]:
+    """
+    Collect the normalized targets of every internal link in wiki markup.
+
+    Args:
+        markup: The wiki markup
+        templates: Compiled Template: pages to transclude before scanning
+
+    Returns:
+        Set[Tuple[str, str]]: (namespace, title) pairs
+    """
+    if templates:
+        markup = transclude_templates(markup, templates)
+
+    targets = set()
+    for target in iter_link_targets(markup):
+        normalized = normalize_link_target(target)
+        if normalized is not None:
+            targets.add(normalized)
+    return targets
+
+def iter_link_targets(markup: str) -> Iterable[str]:
+    """
+    Yield the distinct internal link targets of markup, as written.
+
+    Args:
+        markup: The wiki markup, with templates already transcluded
+
+    Returns:
+        Iterable[str]: Link targets
+    """
+    return set(iter_internal_links(tokenize_wiki_markup(markup or "")))
+
+def checked_link_target(target: str) -> Optional[Tuple[str, str]]:
+    """
+    Normalize a link target whose page existence is checked for red links.
+
+    Args:
+        target: Link target as written
+
+    Returns:
+        Optional[Tuple[str, str]]: (namespace, title), or None when the
+        target is never shown as a red link
+    """
+    normalized = normalize_link_target(target)
+    if normalized is None or normalized[0] in UNCHECKED_NAMESPACES:
+        return None
+    return normalized
+
+def page_key(namespace: str, title: str) -> str:
+    """
+    Build the PageIndex key for a page.
+
+    Keys ignore case, like title lookups elsewhere in the application.
+
+    Args:
+        namespace: The page namespace ("" for main)
+        title: The page title
+
+    Returns:
+        str: The key
+    """
+    return f"{namespace}:{_WHITESPACE_RE.sub(' ', title).strip().casefold()}"
+
+class PageIndex:
+    """
+    Per-process set of existing pages, used to find red links.
+
+    The set holds one short key per page (see page_key). It is filled by a
+    projection scan and kept current from the articles change stream, which
+    adds, moves or removes single keys using the page's _id; where change
+    streams are unavailable (a standalone mongod) it is reloaded every
+    refresh_interval seconds instead. Targets that are not in the set are
+    confirmed with a single case-insensitive $in query, so a page created a
+    moment ago through another worker is not shown as missing.
+    """
+
+    def __init__(self, refresh_interval: int = 300):
+        """
+        Initialize the index.
+
+        Args:
+            refresh_interval: Seconds between full reloads when change
+                streams are unavailable, and before retrying a failed stream
+        """
+        self.refresh_interval = refresh_interval
+        self.use_change_streams = True
+
+        self._pages: Set[str] = set()
+        # Page _id -> key, so change events can move or remove a page's key
+        self._keys_by_id: Dict[Any, str] = {}
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+        # Bumped whenever the set changes; part of the preview cache key
+        self.version = 0
+
+        self.stats = {
+            "checks": 0,
+            "index_hits": 0,
+            "queries": 0,
+            "reloads": 0,
+            "change_events": 0,
+        }
+
+    def add(self, namespace: str, title: str) -> None:
+        """
+        Record that a page exists.
+
+        Args:
+            namespace: The page namespace
+            title: The page title
+        """
+        if self._loaded:
+            key = page_key(namespace or "", title)
+            if key not in self._pages:
+                self._pages.add(key)
+                self.version += 1
+
+    def discard(self, namespace: str, title: str) -> None:
+        """
+        Record that a page no longer exists.
+
+        Args:
+            namespace: The page namespace
+            title: The page title
+        """
+        key = page_key(namespace or "", title)
+        if key in self._pages:
+            self._pages.discard(key)
+            self.version += 1
+
+    async def load(self, db) -> int:
+        """
+        Replace the set with every page that is not deleted.
+
+        Args:
+            db: Database connection
+
+        Returns:
+            int: Number of pages loaded
+        """
+        pages = set()
+        keys_by_id = {}
+        cursor = db["articles"].find(
+            {"status": {"$ne": "deleted"}},
+            {"_id": 1, "namespace": 1, "title": 1}
+        )
+        async for page in cursor:
+            key = page_key(page.get("namespace") or "", page["title"])
+            pages.add(key)
+            if page.get("_id") is not None:
+                keys_by_id[page["_id"]] = key
+
+        self._pages = pages
+        self._keys_by_id = keys_by_id
+        self._loaded = True
+        self.version += 1
+        self.stats["reloads"] += 1
+        return len(pages)
+
+    async def find_missing(self, db, targets: Iterable[str]) -> Set[str]:
+        """
+        Find the link targets whose pages do not exist.
+
+        Args:
+            db: Database connection
+            targets: Link targets as written
+
+        Returns:
+            Set[str]: The targets (as written) to render as red links
+        """
+        candidates: Dict[Tuple[str, str], List[str]] = {}
+        for target in targets:
+            normalized = checked_link_target(target)
+            if normalized is None:
+                continue
+            self.stats["checks"] += 1
+            if page_key(*normalized) in self._pages:
+                self.stats["index_hits"] += 1
+                continue
+            candidates.setdefault(normalized, []).append(target)
+
+        if not candidates:
+            return set()
+
+        titles_by_namespace: Dict[str, Set[str]] = {}
+        for namespace, title in candidates:
+            titles_by_namespace.setdefault(namespace, set()).add(title)
+
+        self.stats["queries"] += 1
+        found = set()
+        cursor = db["articles"].find(
+            {
+                "$or": [
+                    {"namespace": namespace or {"$in": ["", None]}, "title": {"$in": sorted(titles)}}
+                    for namespace, titles in titles_by_namespace.items()
+                ],
+                "status": {"$ne": "deleted"}
+            },
+            {"_id": 0, "namespace": 1, "title": 1},
+            # Matches titles regardless of case, like page_key; served by the
+            # collated namespace/title index in services.indexes
+            collation=TITLE_COLLATION
+        )
+        async for page in cursor:
+            namespace = page.get("namespace") or ""
+            found.add(page_key(namespace, page["title"]))
+            self.add(namespace, page["title"])
+
+        missing = set()
+        for (namespace, title), written in candidates.items():
+            if page_key(namespace, title) not in found:
+                missing.update(written)
+        return missing
+
+    def start(self, db) -> None:
+        """
+        Load the index and keep it current in a background task.
+
+        Args:
+            db: Database connection
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self) -> None:
+        """
+        Stop the background task.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, db) -> None:
+        while True:
+            try:
+                if self.use_change_streams:
+                    await self._watch(db)
+                else:
+                    await self.load(db)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == _CHANGE_STREAMS_UNSUPPORTED:
+                    logger.info(f"Change streams unavailable; reloading the page index every {self.refresh_interval}s")
+                    self.use_change_streams = False
+                    continue
+                logger.warning(f"Page index refresh failed: {e}")
+            except Exception as e:
+                logger.warning(f"Page index refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def _watch(self, db) -> None:
+        # Only changes that can create, delete or rename a page are delivered
+        pipeline = [
+            {"$match": {"$or": [
+                {"operationType": {"$in": ["insert", "replace", "delete"]}},
+                {"updateDescription.updatedFields.status": {"$exists": True}},
+                {"updateDescription.updatedFields.title": {"$exists": True}},
+                {"updateDescription.updatedFields.namespace": {"$exists": True}},
+            ]}},
+            {"$project": {
+                "operationType": 1,
+                "documentKey": 1,
+                "fullDocument.namespace": 1,
+                "fullDocument.title": 1,
+                "fullDocument.status": 1,
+                "updateDescription.updatedFields.title": 1,
+                "updateDescription.updatedFields.namespace": 1,
+            }}
+        ]
+        # updateLookup delivers the page as it is now, so renames need no reload
+        async with db["articles"].watch(pipeline, full_document="updateLookup") as stream:
+            # Loaded after the stream is open so no change is missed
+            await self.load(db)
+            async for change in stream:
+                self.stats["change_events"] += 1
+                self._apply_change(change)
+
+    def _apply_change(self, change: Dict[str, Any]) -> None:
+        self.version += 1
+        page_id = change.get("documentKey", {}).get("_id")
+        old_key = self._keys_by_id.pop(page_id, None)
+        if old_key is not None:
+            self._pages.discard(old_key)
+
+        page = change.get("fullDocument")
+        # Deleted, or removed again before the update was looked up
+        if change["operationType"] == "delete" or not page or "title" not in page:
+            return
+        if page.get("status") == "deleted":
+            return
+        key = page_key(page.get("namespace") or "", page["title"])
+        self._pages.add(key)
+        self._keys_by_id[page_id] = key
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index counters and size.
+
+        Returns:
+            Dict[str, Any]: Index statistics
+        """
+        return {
+            **self.stats,
+            "pages": len(self._pages),
+            "tracked_ids": len(self._keys_by_id),
+            "loaded": self._loaded,
+            "change_streams": self.use_change_streams,
+            "version": self.version,
+        }
+
+# Shared index used by renders in this process
+page_index = PageIndex(config.PAGE_INDEX_REFRESH_INTERVAL)
+
+async def find_missing_links(db, markup: str, templates: Optional[Dict[str, list]] = None) -> frozenset:
+    """
+    Find the internal links of markup that point to missing pages.
+
+    Args:
+        db: Database connection
+        markup: The wiki markup
+        templates: Compiled Template: pages to transclude before scanning
+
+    Returns:
+        frozenset: Link targets (as written) to render as red links
+    """
+    if templates:
+        markup = transclude_templates(markup, templates)
+    return frozenset(await page_index.find_missing(db, iter_link_targets(markup)))
+
+async def update_article_links(
+    db,
+    article_id: ObjectId,
+    markup: Optional[str],
+    templates: Optional[Dict[str, list]] = None
+) -> Tuple[int, int]:
+    """
+    Bring an article's rows in the links collection in line with its markup.
+
+    Args:
+        db: Database connection
+        article_id: The linking article
+        markup: The article's source markup; None removes all of its links
+        templates: Compiled Template: pages used by the markup. Resolved
+            through the template registry when not given.
+
+    Returns:
+        Tuple[int, int]: Number of links added and removed
+    """
+    if markup is not None and templates is None:
+        # Imported here; services.templates imports this module
+        from services.templates import template_registry
+        templates = await template_registry.resolve(db, markup)
+
+    wanted = extract_link_targets(markup, templates) if markup is not None else set()
+
+    existing = set()
+    cursor = db[LINKS_COLLECTION].find(
+        {"sourceId": article_id},
+        {"_id": 0, "targetNamespace": 1, "targetTitle": 1}
+    )
+    async for link in cursor:
+        existing.add((link["targetNamespace"], link["targetTitle"]))
+
+    added = wanted - existing
+    removed = existing - wanted
+
+    if removed:
+        await db[LINKS_COLLECTION].delete_many({
+            "sourceId": article_id,
+            "$or": [
+                {"targetNamespace": namespace, "targetTitle": title}
+                for namespace, title in removed
+            ]
+        })
+
+    if added:
+        now = datetime.now()
+        await db[LINKS_COLLECTION].insert_many([
+            {
+                "sourceId": article_id,
+                "targetNamespace": namespace,
+                "targetTitle": title,
+                "createdAt": now
+            }
+            for namespace, title in sorted(added)
+        ], ordered=False)
+
+    return len(added), len(removed)
+
+async def remove_article_links(db, article_id: ObjectId) -> int:
+    """
+    Delete every outgoing link of an article (e.g. when it is deleted).
+
+    Args:
+        db: Database connection
+        article_id: The linking article
+
+    Returns:
+        int: Number of links removed
+    """
+    result = await db[LINKS_COLLECTION].delete_many({"sourceId": article_id})
+    return result.deleted_count
+
+async def get_backlinks(
+    db,
+    namespace: str,
+    title: str,
+    skip: int = 0,
+    limit: int = 50
+) -> List[Dict[str, Any]]:
+    """
+    List the articles that link to a page ("What links here").
+
+    Args:
+        db: Database connection
+        namespace: Namespace of the target page
+        title: Title of the target page
+        skip: Number of linking articles to skip
+        limit: Maximum number of linking articles to return
+
+    Returns:
+        List[Dict[str, Any]]: Linking articles with _id, title, namespace and slug
+    """
+    target = normalize_link_target(f"{namespace}:{title}" if namespace else title)
+    if target is None:
+        return []
+
+    cursor = db[LINKS_COLLECTION].find(
+        {"targetNamespace": target[0], "targetTitle": target[1]},
+        {"_id": 0, "sourceId": 1}
+    ).sort("sourceId", 1).skip(skip).limit(limit)
+    source_ids = [link["sourceId"] async for link in cursor]
+    if not source_ids:
+        return []
+
+    articles = {}
+    cursor = db["articles"].find(
+        {"_id": {"$in": source_ids}, "status": {"$ne": "deleted"}},
+        {"title": 1, "namespace": 1, "slug": 1}
+    )
+    async for article in cursor:
+        articles[article["_id"]] = article
+
+    return [articles[source_id] for source_id in source_ids if source_id in articles]
+
+async def rerender_link_sources(db, namespace: str, title: str, cache=None) -> int:
+    """
+    Re-render the articles linking to a page that was created, deleted or renamed.
+
+    Intended to run as a background task, so links to the page turn blue or
+    red in stored HTML.
+
+    Args:
+        db: Database connection
+        namespace: Namespace of the page
+        title: Title of the page
+        cache: Optional cache whose article entries should be invalidated
+
+    Returns:
+        int: Number of articles updated
+    """
+    # Imported here; services.templates imports this module
+    from services.templates import rerender_matching_articles
+
+    target = normalize_link_target(f"{namespace}:{title}" if namespace else title)
+    if target is None:
+        return 0
+
+    cursor = db[LINKS_COLLECTION].find(
+        {"targetNamespace": target[0], "targetTitle": target[1]},
+        {"_id": 0, "sourceId": 1}
+    )
+    source_ids = [link["sourceId"] async for link in cursor]
+    if not source_ids:
+        return 0
+
+    updated = await rerender_matching_articles(
+        db,
+        {"_id": {"$in": source_ids}, "source": {"$exists": True}},
+        cache
+    )
+    logger.info(f"Re-rendered {updated} articles linking to {namespace + ':' if namespace else ''}{title}")
+    return updated
@@ -0,0 +1,135 @@
+"""
+Batched document loaders for the Cryptopedia application.
+
+Listing pages show the author and article of every row. Looking those up
+one find_one() at a time costs two round trips per row; a DocumentLoader
+instead collects the ids asked for while the page is working and fetches
+them with a single $in query per collection, projecting only the fields
+the pages display. Loaders cache what they fetched, so they are created
+per request (see dependencies.get_loaders) and never shared between users.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+# Fields listing pages read from related documents
+USER_FIELDS = {"username": 1}
+ARTICLE_FIELDS = {"title": 1, "slug": 1}
+
+def _normalize_id(document_id: Any) -> Any:
+    """Turn ObjectId strings into ObjectIds so both load the same document."""
+    if isinstance(document_id, str) and ObjectId.is_valid(document_id):
+        return ObjectId(document_id)
+    return document_id
+
+class DocumentLoader:
+    """
+    Loads documents of one collection by _id, batching and caching lookups.
+
+    Every load() made before the event loop next runs is answered by the
+    same find() call; ids already loaded are not fetched again.
+    """
+
+    def __init__(self, collection, projection: Optional[Dict[str, int]] = None, max_batch_size: int = 500):
+        """
+        Initialize the loader.
+
+        Args:
+            collection: Motor collection to read from
+            projection: Fields to fetch; _id is always included
+            max_batch_size: Most ids sent in one $in query
+        """
+        self.collection = collection
+        self.projection = projection
+        self.max_batch_size = max_batch_size
+        # Number of queries issued, for tests and logging
+        self.batches = 0
+        self._futures: Dict[Any, asyncio.Future] = {}
+        self._queue: List[Any] = []
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+    def load(self, document_id: Any) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        """
+        Ask for a document.
+
+        Args:
+            document_id: The document's _id, or its string form
+
+        Returns:
+            Future resolving to the document, or None if it does not exist
+        """
+        key = _normalize_id(document_id)
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if key is None:
+            future.set_result(None)
+            return future
+
+        self._futures[key] = future
+        self._queue.append(key)
+        if self._dispatch_task is None:
+            # Runs once the caller yields, after the rest of its loads are queued
+            self._dispatch_task = loop.create_task(self._dispatch())
+        return future
+
+    async def load_many(self, document_ids: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Fetch several documents with as few queries as possible.
+
+        Args:
+            document_ids: The _ids to load; None and duplicates are ignored
+
+        Returns:
+            Dict[Any, Dict[str, Any]]: Found documents keyed by _id
+        """
+        keys = list(dict.fromkeys(_normalize_id(i) for i in document_ids if i is not None))
+        documents = await asyncio.gather(*(self.load(key) for key in keys))
+        return {key: document for key, document in zip(keys, documents) if document is not None}
+
+    async def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        self._dispatch_task = None
+        for start in range(0, len(queue), self.max_batch_size):
+            await self._fetch(queue[start:start + self.max_batch_size])
+
+    async def _fetch(self, keys: List[Any]) -> None:
+        self.batches += 1
+        try:
+            cursor = self.collection.find({"_id": {"$in": keys}}, self.projection)
+            found = {document["_id"]: document for document in await cursor.to_list(length=None)}
+        except Exception as e:
+            logger.error(f"Batch load from {getattr(self.collection, 'name', 'collection')} failed: {e}")
+            for key in keys:
+                # Forget the failure so a later load() tries again
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(found.get(key))
+
+class Loaders:
+    """
+    The loaders of one request.
+    """
+
+    def __init__(self, db):
+        """
+        Initialize the loaders.
+
+        Args:
+            db: Database connection
+        """
+        self.users = DocumentLoader(db["users"], USER_FIELDS)
+        self.articles = DocumentLoader(db["articles"], ARTICLE_FIELDS)
@@ -0,0 +1,649 @@
+# File: services/render.py
+"""
+Wiki markup render executor for the Kryptopedia application.
+
+parse_wiki_markup is synchronous and CPU-bound. Small documents are rendered
+inline, larger ones are sent to a bounded process pool so a single large
+paste cannot stall the event loop for every other request on the worker.
+RenderCache keeps recent renders keyed by a hash of the markup, so repeated
+previews of the same document are served without parsing.
+
+Articles store their source markup next to the rendered HTML and the
+PARSER_VERSION that produced it; rerender_article refreshes stale HTML in the
+background when such an article is read.
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import signal
+import time
+from collections import OrderedDict
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Tuple, Optional, Dict, Any, List, Callable, Awaitable, Set, AbstractSet
+
+import config
+from services.cache import CacheInterface, article_tag
+from utils.wiki_parser import (
+    parse_wiki_markup,
+    extract_short_description,
+    split_sections,
+    prerender_section,
+    finish_sections,
+    PARSER_VERSION
+)
+
+logger = logging.getLogger(__name__)
+
+class RenderTimeoutError(Exception):
+    """Raised when a render does not finish within the configured timeout."""
+
+def _raise_render_timeout(signum, frame):
+    raise RenderTimeoutError("Render deadline reached")
+
+def _pool_processes(pool: ProcessPoolExecutor) -> List[multiprocessing.Process]:
+    """
+    Get the worker processes of a process pool.
+
+    ProcessPoolExecutor has no public API for its workers. CPython keeps them
+    in the private _processes dict (pid -> Process), which is None once the
+    pool shuts down and is not guaranteed to exist in other versions.
+
+    Args:
+        pool: The process pool
+
+    Returns:
+        List[multiprocessing.Process]: The workers, empty if they cannot be found
+    """
+    processes = getattr(pool, "_processes", None)
+    if not isinstance(processes, dict):
+        return []
+    return [process for process in processes.values() if hasattr(process, "kill")]
+
+def _render_until(deadline: float, renderer: Callable[[str], Any], markup: str) -> Any:
+    """
+    Run a render in a pool worker, aborting it at the deadline.
+
+    The worker is interrupted with SIGALRM, so a pathological document stops
+    using the process instead of running on after the caller gave up.
+
+    Args:
+        deadline: time.time() by which the render must finish
+        renderer: Module-level render function
+        markup: The wiki markup to parse
+
+    Returns:
+        Any: The renderer's result
+
+    Raises:
+        RenderTimeoutError: If the deadline passes, including while queued
+    """
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise RenderTimeoutError("Render deadline passed while queued")
+    if not hasattr(signal, "setitimer"):
+        # No SIGALRM (Windows): RenderExecutor recycles the pool instead
+        return renderer(markup)
+
+    previous = signal.signal(signal.SIGALRM, _raise_render_timeout)
+    signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        return renderer(markup)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+class RenderExecutor:
+    """
+    Run parse_wiki_markup inline or in a process pool depending on input size.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        inline_threshold: int = 20000,
+        timeout: float = 10.0,
+        max_pending: int = 32,
+        kill_grace: float = 2.0
+    ):
+        """
+        Initialize the render executor.
+
+        Args:
+            max_workers: Number of worker processes in the pool
+            inline_threshold: Markup length (characters) below which rendering stays inline
+            timeout: Seconds allowed for a pooled render, including time spent queued
+            max_pending: Maximum number of renders submitted to the pool at once
+            kill_grace: Extra seconds to wait for a worker to abort a render
+                itself before the pool's processes are killed and replaced
+        """
+        self.max_workers = max_workers
+        self.inline_threshold = inline_threshold
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.kill_grace = kill_grace
+
+        # The pool is created on first use so importing this module never spawns processes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.stats = {
+            "inline_renders": 0,
+            "pooled_renders": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "pool_restarts": 0,
+            "pending": 0,
+            "running": 0,
+            "max_queue_depth": 0,
+        }
+
+    async def render(self, markup: str, renderer: Callable[[str], Any] = parse_wiki_markup) -> Any:
+        """
+        Render wiki markup to HTML.
+
+        Args:
+            markup: The wiki markup to parse
+            renderer: Module-level render function to run, parse_wiki_markup by default
+
+        Returns:
+            Any: The renderer's result; for parse_wiki_markup, the parsed HTML
+            and extracted short description (if any)
+
+        Raises:
+            RenderTimeoutError: If a pooled render exceeds the timeout
+        """
+        markup = markup or ""
+        if self.max_workers <= 0 or len(markup) < self.inline_threshold:
+            self.stats["inline_renders"] += 1
+            return renderer(markup)
+
+        self.stats["pending"] += 1
+        self._record_queue_depth()
+        try:
+            return await self._render_pooled(markup, renderer, time.time() + self.timeout)
+        except RenderTimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning(f"Render of {len(markup)} characters timed out after {self.timeout}s")
+            raise RenderTimeoutError(f"Rendering timed out after {self.timeout} seconds")
+        finally:
+            self.stats["pending"] -= 1
+
+    async def _render_pooled(self, markup: str, renderer: Callable[[str], Any], deadline: float) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=max(deadline - time.time(), 0))
+        except asyncio.TimeoutError:
+            raise RenderTimeoutError("Render deadline passed while queued")
+
+        self.stats["running"] += 1
+        pool = self._get_pool()
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(pool, partial(_render_until, deadline, renderer), markup)
+            try:
+                # Workers abort at the deadline; the grace covers delivering that
+                result = await asyncio.wait_for(future, timeout=deadline - time.time() + self.kill_grace)
+            except asyncio.TimeoutError:
+                # The worker did not stop by itself (stuck outside Python code,
+                # or no SIGALRM): kill the pool so it does not keep a process busy
+                logger.error("Render worker ignored its deadline, restarting the render pool")
+                self._kill_pool(pool)
+                raise RenderTimeoutError("Render worker did not stop")
+            self.stats["pooled_renders"] += 1
+            return result
+        except BrokenProcessPool:
+            # A worker died, or the pool was killed under this render
+            self.stats["failures"] += 1
+            if self._executor is pool:
+                logger.error("Render pool is broken, recreating it")
+                self._reset_pool()
+            raise
+        finally:
+            self.stats["running"] -= 1
+            self._slots.release()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started render pool with {self.max_workers} workers")
+        return self._executor
+
+    def _reset_pool(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _kill_pool(self, pool: ProcessPoolExecutor) -> None:
+        # ProcessPoolExecutor has no public way to stop a running task
+        processes = _pool_processes(pool)
+        if not processes:
+            # The stuck render keeps its worker until it returns; new renders get a new pool
+            logger.warning("Render pool workers not found, abandoning the pool without killing them")
+        for process in processes:
+            process.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self._executor is pool:
+            self._executor = None
+        self.stats["pool_restarts"] += 1
+
+    def _record_queue_depth(self) -> None:
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.stats["pending"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get render counters and current queue depth.
+
+        Returns:
+            Dict[str, Any]: Executor statistics
+        """
+        return {
+            **self.stats,
+            "queue_depth": self.stats["pending"] - self.stats["running"],
+            "max_workers": self.max_workers,
+            "inline_threshold": self.inline_threshold,
+            "timeout": self.timeout,
+        }
+
+    def close(self) -> None:
+        """
+        Shut down the worker pool.
+        """
+        self._reset_pool()
+
+class RenderCache:
+    """
+    LRU cache of rendered markup keyed by content hash and parser version.
+
+    Entries are held in a bounded in-process LRU. When a shared cache backend
+    is supplied, renders are also stored there so identical documents are
+    parsed once across all workers.
+    """
+
+    def __init__(
+        self,
+        executor: RenderExecutor,
+        max_entries: int = 512,
+        max_bytes: int = 32 * 1024 * 1024,
+        shared_ttl: int = 3600
+    ):
+        """
+        Initialize the render cache.
+
+        Args:
+            executor: Executor used to render on a cache miss
+            max_entries: Maximum number of renders held in process
+            max_bytes: Maximum total size of held HTML in bytes (approximate)
+            shared_ttl: Expiration in seconds for renders stored in the shared cache
+        """
+        self.executor = executor
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared_ttl = shared_ttl
+
+        self._entries: "OrderedDict[str, Tuple[str, Optional[str]]]" = OrderedDict()
+        self._bytes = 0
+
+        self.stats = {
+            "hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def make_key(
+        markup: str,
+        kind: str = "document",
+        templates: Optional[Dict[str, list]] = None,
+        missing_links: Optional[AbstractSet[str]] = None
+    ) -> str:
+        """
+        Build the cache key for a piece of markup.
+
+        Args:
+            markup: The wiki markup
+            kind: "document" for full renders, "section" for prerendered sections,
+                "resolved:<version>" for renders keyed before their templates
+                and red links are looked up (see render_resolved)
+            templates: Compiled templates the markup is rendered with, if any
+            missing_links: Link targets rendered as red links, if any
+
+        Returns:
+            str: Key combining the parser version and a SHA-256 of the markup,
+            templates and red links
+        """
+        hasher = hashlib.sha256(markup.encode("utf-8"))
+        if templates:
+            hasher.update(b"\0")
+            hasher.update(repr(sorted(templates.items())).encode("utf-8"))
+        if missing_links:
+            hasher.update(b"\1")
+            hasher.update("\n".join(sorted(missing_links)).encode("utf-8"))
+        digest = hasher.hexdigest()
+        if kind == "document":
+            return f"render:v{PARSER_VERSION}:{digest}"
+        return f"render:v{PARSER_VERSION}:{kind}:{digest}"
+
+    async def render(
+        self,
+        markup: str,
+        shared_cache: Optional[CacheInterface] = None,
+        templates: Optional[Dict[str, list]] = None,
+        missing_links: Optional[AbstractSet[str]] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Render wiki markup, serving repeated documents from the cache.
+
+        Args:
+            markup: The wiki markup to parse
+            shared_cache: Optional cache backend shared between workers
+            templates: Compiled templates to transclude (see services.templates)
+            missing_links: Link targets to render as red links (see services.links)
+
+        Returns:
+            Tuple[str, Optional[str]]: The parsed HTML and extracted short description (if any)
+        """
+        key = self.make_key(markup or "", templates=templates, missing_links=missing_links)
+        result = await self._lookup(key, shared_cache)
+        if result is None:
+            result = await self._render_document(key, markup, shared_cache, templates, missing_links)
+        return result
+
+    async def render_resolved(
+        self,
+        markup: str,
+        resolve: Callable[[], Awaitable[Tuple[Dict[str, list], AbstractSet[str]]]],
+        version: str,
+        shared_cache: Optional[CacheInterface] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Render wiki markup whose templates and red links are looked up only on a miss.
+
+        The cache is checked first, keyed on the markup and a version of
+        everything resolve() reads, so a repeated document costs no database
+        queries.
+
+        Args:
+            markup: The wiki markup to parse
+            resolve: Returns the compiled templates and red link targets for the markup
+            version: Changes whenever resolve() could return something different
+            shared_cache: Optional cache backend shared between workers
+
+        Returns:
+            Tuple[str, Optional[str]]: The parsed HTML and extracted short description (if any)
+        """
+        key = self.make_key(markup or "", f"resolved:{version}")
+        result = await self._lookup(key, shared_cache)
+        if result is None:
+            templates, missing_links = await resolve()
+            result = await self._render_document(key, markup, shared_cache, templates, missing_links)
+        return result
+
+    async def _lookup(
+        self,
+        key: str,
+        shared_cache: Optional[CacheInterface]
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return result
+
+        if shared_cache is not None:
+            try:
+                cached = await shared_cache.get(key)
+            except Exception as e:
+                logger.warning(f"Shared render cache lookup failed: {e}")
+                cached = None
+            if isinstance(cached, dict) and "html" in cached:
+                result = (cached["html"], cached.get("short_description"))
+                self.stats["shared_hits"] += 1
+                self._store(key, result)
+                return result
+        return None
+
+    async def _render_document(
+        self,
+        key: str,
+        markup: str,
+        shared_cache: Optional[CacheInterface],
+        templates: Optional[Dict[str, list]],
+        missing_links: Optional[AbstractSet[str]]
+    ) -> Tuple[str, Optional[str]]:
+        self.stats["misses"] += 1
+        if templates or missing_links:
+            result = await self.executor.render(
+                markup,
+                partial(parse_wiki_markup, templates=templates, missing_links=missing_links)
+            )
+        else:
+            result = await self.executor.render(markup)
+        self._store(key, result)
+
+        if shared_cache is not None:
+            try:
+                await shared_cache.set(
+                    key,
+                    {"html": result[0], "short_description": result[1]},
+                    self.shared_ttl
+                )
+            except Exception as e:
+                logger.warning(f"Shared render cache store failed: {e}")
+
+        return result
+
+    async def render_sections(
+        self,
+        markup: str,
+        templates: Optional[Dict[str, list]] = None,
+        missing_links: Optional[AbstractSet[str]] = None
+    ) -> Tuple[List[str], List[str], Optional[str]]:
+        """
+        Render markup section by section, reusing cached sections.
+
+        Only sections whose source is not already cached are parsed.
+        Reference numbering and paragraphs are then applied across all
+        sections, which is cheap compared with parsing.
+
+        Args:
+            markup: The wiki markup to parse
+            templates: Compiled templates to transclude (see services.templates)
+            missing_links: Link targets to render as red links (see services.links)
+
+        Returns:
+            Tuple[List[str], List[str], Optional[str]]: The section sources,
+            the HTML fragment for each section and the short description (if any)
+        """
+        body, short_description = extract_short_description(markup or "")
+        sections = split_sections(body)
+
+        prerendered = []
+        for section in sections:
+            # Key sections on the red links they can contain, so one new red
+            # link does not invalidate every section
+            section_missing = missing_links
+            if missing_links and not templates:
+                section_missing = frozenset(target for target in missing_links if target in section)
+            key = self.make_key(section, "section", templates, section_missing)
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                prerendered.append(cached[0])
+                continue
+
+            self.stats["misses"] += 1
+            lines = await self.executor.render(
+                section,
+                partial(prerender_section, templates=templates, missing_links=section_missing)
+            )
+            self._store(key, (lines, None))
+            prerendered.append(lines)
+
+        return sections, finish_sections(prerendered), short_description
+
+    def _store(self, key: str, result: Tuple[str, Optional[str]]) -> None:
+        size = self._entry_size(result)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = result
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._entry_size(evicted)
+            self.stats["evictions"] += 1
+
+    @staticmethod
+    def _entry_size(result: Tuple[str, Optional[str]]) -> int:
+        return len(result[0]) + len(result[1] or "")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters, size and hit rate.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        lookups = self.stats["hits"] + self.stats["shared_hits"] + self.stats["misses"]
+        hits = self.stats["hits"] + self.stats["shared_hits"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """
+        Drop all in-process entries.
+        """
+        self._entries.clear()
+        self._bytes = 0
+
+# Shared executor used by routes and pages
+render_executor = RenderExecutor(
+    max_workers=config.RENDER_POOL_WORKERS,
+    inline_threshold=config.RENDER_INLINE_THRESHOLD,
+    timeout=config.RENDER_TIMEOUT,
+    max_pending=config.RENDER_MAX_PENDING
+)
+
+async def render_wiki_markup(markup: str) -> Tuple[str, Optional[str]]:
+    """
+    Render wiki markup through the shared render executor.
+
+    Args:
+        markup: The wiki markup to parse
+
+    Returns:
+        Tuple[str, Optional[str]]: The parsed HTML and extracted short description (if any)
+    """
+    return await render_executor.render(markup)
+
+# Render cache for editor previews
+render_cache = RenderCache(
+    render_executor,
+    max_entries=config.RENDER_CACHE_ENTRIES,
+    max_bytes=config.RENDER_CACHE_MAX_BYTES,
+    shared_ttl=config.RENDER_CACHE_TTL
+)
+
+# Articles with a background re-render in progress
+_rerendering: Set[str] = set()
+
+def article_render_fields(source: str, html: str, templates: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Build the stored render fields for an article.
+
+    Args:
+        source: The article's wiki markup
+        html: The HTML rendered from it
+        templates: Names of the templates transcluded while rendering
+
+    Returns:
+        Dict[str, Any]: content (HTML), source, parserVersion and templates fields
+    """
+    return {
+        "content": html,
+        "source": source,
+        "parserVersion": PARSER_VERSION,
+        "templates": templates or [],
+    }
+
+def needs_rerender(article: Dict[str, Any]) -> bool:
+    """
+    Check whether an article's stored HTML was produced by an older parser.
+
+    Articles saved before source markup was stored have nothing to re-render
+    from and are left alone.
+
+    Args:
+        article: The article document
+
+    Returns:
+        bool: True if the article has source markup and a stale parserVersion
+    """
+    return article.get("source") is not None and article.get("parserVersion") != PARSER_VERSION
+
+async def rerender_article(db, article: Dict[str, Any], cache: Optional[CacheInterface] = None) -> bool:
+    """
+    Re-render an article's stored HTML with the current parser.
+
+    The update only applies if the article still has the source and parser
+    version that were read, so a concurrent edit is never overwritten.
+
+    Args:
+        db: Database connection
+        article: The article document as read
+        cache: Optional cache whose article entries should be invalidated
+
+    Returns:
+        bool: True if the stored HTML was updated
+    """
+    article_id = str(article["_id"])
+    if article_id in _rerendering:
+        return False
+
+    # Imported here because services.templates builds on this module
+    from services.templates import render_with_templates
+
+    _rerendering.add(article_id)
+    try:
+        html, _, templates = await render_with_templates(db, article["source"])
+        result = await db["articles"].update_one(
+            {
+                "_id": article["_id"],
+                "source": article["source"],
+                "parserVersion": article.get("parserVersion"),
+            },
+            {"$set": {
+                "content": html,
+                "parserVersion": PARSER_VERSION,
+                "templates": templates,
+                "renderedAt": datetime.now(),
+            }}
+        )
+
+        if cache is not None:
+            await cache.invalidate_tag(article_tag(article_id))
+
+        return result.modified_count > 0
+    except Exception as e:
+        logger.error(f"Error re-rendering article {article_id}: {e}")
+        return False
+    finally:
+        _rerendering.discard(article_id)
@@ -0,0 +1,271 @@
+# File: services/templates.py
+"""
+Template transclusion support for the Kryptopedia application.
+
+Template: pages are compiled once and kept in a per-process cache. Every
+rendered article records the templates it transcludes in its "templates"
+field, which serves as the reverse dependency index: when a template is
+edited, only the articles listing it are re-rendered.
+"""
+import logging
+import time
+from datetime import datetime
+from functools import partial
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from pymongo import UpdateOne
+
+from services.cache import article_tag
+from services.links import update_article_links, find_missing_links
+from services.render import render_executor
+from utils.wiki_parser import (
+    parse_wiki_markup,
+    compile_template,
+    find_template_names,
+    transclude_templates,
+    normalize_template_name,
+    PARSER_VERSION
+)
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAMESPACE = "Template"
+
+class TemplateRegistry:
+    """
+    Cache of compiled Template: pages.
+
+    Entries expire after a short TTL so edits made through another worker
+    process are picked up; edits made through this process invalidate
+    the entry immediately.
+    """
+
+    def __init__(self, ttl: int = 60):
+        """
+        Initialize the registry.
+
+        Args:
+            ttl: Seconds a compiled template (or a missing one) is trusted
+        """
+        self.ttl = ttl
+        # name -> (loaded_at, compiled or None when the page does not exist)
+        self._compiled: Dict[str, Tuple[float, Optional[list]]] = {}
+        # Bumped whenever a template is invalidated or changes on reload
+        self._generation = 0
+
+    @property
+    def version(self) -> str:
+        """
+        Version of the templates this registry can resolve.
+
+        Changes when a template is invalidated or reloaded with new content,
+        and at least once every ttl seconds, so anything keyed on it is
+        re-resolved as often as the registry itself trusts its entries.
+
+        Returns:
+            str: The registry generation and the current TTL period
+        """
+        return f"{self._generation}.{int(time.time() // self.ttl)}"
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Drop a compiled template, or all of them.
+
+        Args:
+            name: Template name, or None to clear the registry
+        """
+        if name is None:
+            self._compiled.clear()
+        else:
+            self._compiled.pop(normalize_template_name(name), None)
+        self._generation += 1
+
+    async def resolve(self, db, markup: str) -> Dict[str, list]:
+        """
+        Load every template the markup uses, including templates used by templates.
+
+        Args:
+            db: Database connection
+            markup: The wiki markup to be rendered
+
+        Returns:
+            Dict[str, list]: Compiled templates by normalized name
+        """
+        resolved: Dict[str, list] = {}
+        pending = find_template_names(markup)
+        seen = set()
+
+        while pending:
+            seen |= pending
+            compiled = await self._load(db, pending)
+            pending = set()
+            for name, template in compiled.items():
+                if template is None:
+                    continue
+                resolved[name] = template
+                for part in template:
+                    if type(part) is str:
+                        pending |= find_template_names(part)
+            pending -= seen
+
+        return resolved
+
+    async def _load(self, db, names: Iterable[str]) -> Dict[str, Optional[list]]:
+        now = time.monotonic()
+        result: Dict[str, Optional[list]] = {}
+        missing = []
+
+        for name in names:
+            entry = self._compiled.get(name)
+            if entry is not None and now - entry[0] < self.ttl:
+                result[name] = entry[1]
+            else:
+                missing.append(name)
+
+        if missing:
+            cursor = db["articles"].find(
+                {"namespace": TEMPLATE_NAMESPACE, "title": {"$in": missing}, "status": {"$ne": "deleted"}},
+                {"title": 1, "source": 1, "content": 1}
+            )
+            found = {}
+            async for page in cursor:
+                source = page.get("source")
+                if source is None:
+                    source = page.get("content", "")
+                found[normalize_template_name(page["title"])] = compile_template(source)
+
+            for name in missing:
+                compiled = found.get(name)
+                previous = self._compiled.get(name)
+                if previous is not None and previous[1] != compiled:
+                    self._generation += 1
+                self._compiled[name] = (now, compiled)
+                result[name] = compiled
+
+        return result
+
+# Shared registry used by routes and background jobs
+template_registry = TemplateRegistry()
+
+async def render_with_templates(db, markup: str) -> Tuple[str, Optional[str], List[str]]:
+    """
+    Render wiki markup with Template: pages transcluded.
+
+    Args:
+        db: Database connection
+        markup: The wiki markup to parse
+
+    Returns:
+        Tuple[str, Optional[str], List[str]]: The parsed HTML, the short
+        description (if any) and the names of the templates used
+
+    Links to pages that do not exist are rendered as red links.
+    """
+    markup = markup or ""
+    templates = await template_registry.resolve(db, markup)
+
+    used = set()
+    expanded = transclude_templates(markup, templates, used) if templates else markup
+    missing_links = await find_missing_links(db, expanded)
+
+    if not templates and not missing_links:
+        html, short_description = await render_executor.render(markup)
+        return html, short_description, []
+
+    html, short_description = await render_executor.render(
+        markup,
+        partial(parse_wiki_markup, templates=templates, missing_links=missing_links)
+    )
+    return html, short_description, sorted(used)
+
+async def rerender_template_dependents(db, template_name: str, cache=None, batch_size: int = 100) -> int:
+    """
+    Re-render every article that transcludes a template.
+
+    Intended to run as a background task after a template is edited.
+    Updates are conditional on the article source being unchanged.
+
+    Args:
+        db: Database connection
+        template_name: Name of the edited template
+        cache: Optional cache whose article entries should be invalidated
+        batch_size: Articles per bulk write
+
+    Returns:
+        int: Number of articles updated
+    """
+    name = normalize_template_name(template_name)
+    template_registry.invalidate(name)
+
+    updated = await rerender_matching_articles(
+        db,
+        {"templates": name, "source": {"$exists": True}},
+        cache,
+        batch_size
+    )
+    logger.info(f"Re-rendered {updated} articles using Template:{name}")
+    return updated
+
+async def rerender_matching_articles(db, query: Dict[str, Any], cache=None, batch_size: int = 100) -> int:
+    """
+    Re-render stored articles matching a query, with batched writes.
+
+    Updates are conditional on the article source being unchanged.
+
+    Args:
+        db: Database connection
+        query: Filter selecting articles that have source markup
+        cache: Optional cache whose article entries should be invalidated
+        batch_size: Articles per bulk write
+
+    Returns:
+        int: Number of articles updated
+    """
+    updated = 0
+    operations: List[UpdateOne] = []
+    invalidated_tags: List[str] = []
+
+    async def flush() -> None:
+        nonlocal updated, operations, invalidated_tags
+        result = await db["articles"].bulk_write(operations, ordered=False)
+        updated += result.modified_count
+        # Invalidate as soon as the batch is written, so a later failure
+        # cannot leave these articles served stale from the cache
+        if cache is not None:
+            try:
+                await cache.invalidate_tags(invalidated_tags)
+            except Exception as e:
+                logger.error(f"Error invalidating re-rendered articles: {e}")
+        operations = []
+        invalidated_tags = []
+
+    try:
+        cursor = db["articles"].find(query, {"_id": 1, "source": 1})
+        async for article in cursor:
+            try:
+                html, _, used = await render_with_templates(db, article["source"])
+                # Links produced by templates may have changed too
+                await update_article_links(db, article["_id"], article["source"])
+            except Exception as e:
+                logger.error(f"Error re-rendering article {article['_id']}: {e}")
+                continue
+            operations.append(UpdateOne(
+                {"_id": article["_id"], "source": article["source"]},
+                {"$set": {
+                    "content": html,
+                    "templates": used,
+                    "parserVersion": PARSER_VERSION,
+                    "renderedAt": datetime.now()
+                }}
+            ))
+            invalidated_tags.append(article_tag(article["_id"]))
+
+            if len(operations) >= batch_size:
+                await flush()
+
+        if operations:
+            await flush()
+    except Exception as e:
+        logger.error(f"Error re-rendering articles matching {query}: {e}")
+
+    return updated
@@ -0,0 +1,114 @@
+"""
+Cache warm-up for the Cryptopedia application.
+
+After a deploy every worker starts with an empty L1 (and possibly an empty
+Redis), so the first minutes of traffic all go to MongoDB. warm_cache()
+fills the entries the busiest pages read: the most-viewed articles and the
+homepage and statistics data. It uses the same functions and keys as the
+pages, and skips entries that are already cached.
+"""
+import asyncio
+import logging
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from pages.articles import cache_article
+from pages.home import get_homepage_data
+from pages.special import get_statistics
+from services.cache import CacheInterface
+
+logger = logging.getLogger(__name__)
+
+# Warm-ups still running after their time budget, kept so they are not collected
+_background_warmups = set()
+
+async def warm_cache(
+    db,
+    cache: CacheInterface,
+    article_limit: int = 100,
+    concurrency: int = 8
+) -> Dict[str, Any]:
+    """
+    Fill the cache with the entries the busiest pages read.
+
+    Args:
+        db: Database connection
+        cache: Cache service
+        article_limit: Number of most-viewed articles to cache
+        concurrency: Most warm-up steps running at once
+
+    Returns:
+        Dict[str, Any]: Counts of warmed and failed entries and the time taken
+    """
+    started = time.perf_counter()
+    stats = {"articles": 0, "articles_already_cached": 0, "pages": 0, "failures": 0}
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(name: str, step: Callable[[], Awaitable[Any]], counter: str) -> None:
+        async with slots:
+            try:
+                await step()
+                stats[counter] += 1
+            except Exception as e:
+                stats["failures"] += 1
+                logger.warning(f"Warming {name} failed: {e}")
+
+    articles = []
+    if article_limit > 0:
+        articles = await db["articles"].find(
+            {"status": {"$in": ["published", None]}}
+        ).sort("views", -1).limit(article_limit).to_list(length=article_limit)
+
+    # Links use slugs; articles another worker has warmed are skipped
+    cached = await cache.get_many([f"article:{article['slug']}" for article in articles if article.get("slug")])
+    steps = [
+        run("homepage", partial(get_homepage_data, db, cache), "pages"),
+        run("statistics", partial(get_statistics, db, cache), "pages"),
+    ]
+    for article in articles:
+        slug = article.get("slug")
+        if not slug:
+            continue
+        if f"article:{slug}" in cached:
+            stats["articles_already_cached"] += 1
+            continue
+        steps.append(run(f"article:{slug}", partial(cache_article, cache, slug, article), "articles"))
+
+    await asyncio.gather(*steps)
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+async def warm_cache_within(budget: float, db, cache: CacheInterface, **kwargs) -> Optional[Dict[str, Any]]:
+    """
+    Warm the cache, waiting at most budget seconds.
+
+    A warm-up that runs over its budget carries on in the background.
+
+    Args:
+        budget: Seconds to wait for the warm-up
+        db: Database connection
+        cache: Cache service
+        **kwargs: Passed to warm_cache
+
+    Returns:
+        Optional[Dict[str, Any]]: The warm-up statistics, or None if it is still running
+    """
+    task = asyncio.create_task(warm_cache(db, cache, **kwargs))
+    done, _ = await asyncio.wait({task}, timeout=budget)
+    if task in done:
+        return task.result()
+
+    logger.warning(f"Cache warm-up still running after {budget}s, continuing in the background")
+    _background_warmups.add(task)
+    task.add_done_callback(_finish_background_warmup)
+    return None
+
+def _finish_background_warmup(task: asyncio.Task) -> None:
+    _background_warmups.discard(task)
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        logger.error(f"Cache warm-up failed: {task.exception()}")
+    else:
+        logger.info(f"Cache warm-up finished in the background: {task.result()}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# File: test/bench_wiki_parser.py
+"""
+Benchmark for the wiki markup parser.
+
+Renders adversarial inputs (unclosed links, templates and references, long
+runs of table markup, ...) at growing sizes and the corpus in
+test/fixtures/wiki_corpus/, and reports the time per KB. For a linear-time
+parser the time per KB stays flat as the input grows; the "growth" column
+is the time per KB at the largest size divided by that at the smallest.
+
+test/test_wiki_parser_limits.py runs the same adversarial cases with a
+growth bound.
+
+Usage:
+    python test/bench_wiki_parser.py [--sizes 1000,4000,16000] [--repeat 3] [--case NAME]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.wiki_parser import parse_wiki_markup
+
+CORPUS_DIR = Path(__file__).parent / "fixtures" / "wiki_corpus"
+
+# Adversarial inputs by name; each builds markup from a repeat count
+ADVERSARIAL_CASES: Dict[str, Callable[[int], str]] = {
+    "unclosed_links": lambda n: "[[a" * n,
+    "unclosed_link_displays": lambda n: "[[a|b" * n,
+    "unclosed_templates": lambda n: "{{a|" * n,
+    "unclosed_external_links": lambda n: "[http://x y" * n,
+    "unbroken_urls": lambda n: "[http://a" * n,
+    "unclosed_refs": lambda n: "<ref>" * n,
+    "unclosed_named_refs": lambda n: '<ref name="a">' * n,
+    "short_descriptions": lambda n: "{{Short description|" * n,
+    "table_header_run": lambda n: "{|\n|-\n" + "!" * n + "\n|a\n|}",
+    "table_cell_run": lambda n: "{|\n|-\n" + "|" * n + "\n|}",
+    "inline_tables": lambda n: "{|a|}" * n,
+    "unclosed_tables": lambda n: "{|\n" * n,
+    "quote_runs": lambda n: "'''" * n + "''",
+    "nested_brackets": lambda n: "[[" * n + "]]" * n,
+    "repeated_reference_lists": lambda n: "<ref>a</ref>" * n + "\n<references />" * n,
+    "headings": lambda n: "== a ==\n" * n,
+}
+
+def time_render(markup: str, repeat: int = 3) -> float:
+    """
+    Time parse_wiki_markup on markup.
+
+    Args:
+        markup: The wiki markup
+        repeat: Number of runs; the fastest is reported
+
+    Returns:
+        float: Seconds for the fastest run
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_wiki_markup(markup)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def per_kb(markup: str, seconds: float) -> float:
+    """Convert a render time to milliseconds per KB of markup."""
+    return seconds * 1000 / max(len(markup.encode("utf-8")) / 1024, 1e-9)
+
+def measure_case(build: Callable[[int], str], sizes: List[int], repeat: int = 3) -> List[float]:
+    """
+    Measure milliseconds per KB for one adversarial case at each size.
+
+    Args:
+        build: Builds the markup from a repeat count
+        sizes: Repeat counts to measure
+        repeat: Runs per size
+
+    Returns:
+        List[float]: Milliseconds per KB, by size
+    """
+    results = []
+    for size in sizes:
+        markup = build(size)
+        results.append(per_kb(markup, time_render(markup, repeat)))
+    return results
+
+def run_benchmark(sizes: List[int], repeat: int, case: str = None) -> None:
+    """Print time per KB for the adversarial cases and the corpus."""
+    print(f"🔧 Adversarial inputs (ms/KB at sizes {', '.join(map(str, sizes))})")
+    for name, build in ADVERSARIAL_CASES.items():
+        if case and name != case:
+            continue
+        results = measure_case(build, sizes, repeat)
+        growth = results[-1] / results[0] if results[0] else 0.0
+        columns = "  ".join(f"{value:8.3f}" for value in results)
+        print(f"   {name:<26} {columns}  growth {growth:5.1f}x")
+
+    if case:
+        return
+
+    print(f"\n📚 Corpus ({CORPUS_DIR})")
+    total_bytes = 0
+    total_seconds = 0.0
+    for path in sorted(CORPUS_DIR.glob("*.wiki")):
+        markup = path.read_text(encoding="utf-8")
+        seconds = time_render(markup, repeat)
+        total_bytes += len(markup.encode("utf-8"))
+        total_seconds += seconds
+        print(f"   {path.name[:60]:<60} {per_kb(markup, seconds):8.3f} ms/KB")
+    if total_bytes:
+        print(f"   {'total':<60} {total_seconds * 1000 / (total_bytes / 1024):8.3f} ms/KB")
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the wiki markup parser")
+    parser.add_argument("--sizes", default="1000,4000,16000", help="Comma-separated repeat counts for adversarial cases")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the fastest is reported")
+    parser.add_argument("--case", choices=sorted(ADVERSARIAL_CASES), help="Only run one adversarial case")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    run_benchmark([int(size) for size in args.sizes.split(",")], args.repeat, args.case)
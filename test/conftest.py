@@ -0,0 +1,9 @@
+# File: test/conftest.py
+"""
+Pytest configuration for Kryptopedia unit tests.
+"""
+import os
+import sys
+
+# Make the application packages importable when pytest is run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
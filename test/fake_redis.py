@@ -0,0 +1,200 @@
+# File: test/fake_redis.py
+"""
+In-process stand-in for the redis.asyncio client, for cache tests.
+
+Clients created from the same FakeRedisServer share keys and pub/sub
+channels, like separate workers connected to one Redis. Only the commands
+the cache services use are implemented.
+"""
+import asyncio
+import fnmatch
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.cache import RedisCache
+
+class FakeRedisServer:
+    def __init__(self):
+        # key -> (bytes or set of bytes, expires_at monotonic time or None)
+        self.data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self.subscribers: Dict[str, List["FakePubSub"]] = {}
+        # Round trips made by all clients, pipelines counting once
+        self.commands = 0
+
+    def client(self) -> "FakeRedis":
+        return FakeRedis(self)
+
+    def cache(self, prefix: str = "") -> RedisCache:
+        """A RedisCache whose connection is a client of this server."""
+        cache = RedisCache(host="localhost", port=6379, prefix=prefix)
+        cache.redis = self.client()
+        return cache
+
+def _encode(value: Any) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+def _key(key: Any) -> str:
+    return key.decode("utf-8") if isinstance(key, bytes) else key
+
+def _command(name: str):
+    # Async command that runs the synchronous implementation _<name>
+    async def method(self, *args, **kwargs):
+        self.server.commands += 1
+        return getattr(self, f"_{name}")(*args, **kwargs)
+    return method
+
+class FakeRedis:
+    def __init__(self, server: FakeRedisServer):
+        self.server = server
+
+    get = _command("get")
+    set = _command("set")
+    mget = _command("mget")
+    delete = _command("delete")
+    unlink = _command("delete")
+    exists = _command("exists")
+    flushdb = _command("flushdb")
+    sadd = _command("sadd")
+    smembers = _command("smembers")
+    expire = _command("expire")
+    ttl = _command("ttl")
+    eval = _command("eval")
+
+    def _live(self, key: str) -> Any:
+        entry = self.server.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self.server.data[key]
+            return None
+        return entry[0]
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    def _set(self, key: str, value: Any, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if nx and self._live(key) is not None:
+            return None
+        ttl = ex if ex else (px / 1000 if px else None)
+        self.server.data[key] = (_encode(value), time.monotonic() + ttl if ttl else None)
+        return True
+
+    def _mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self._live(key) for key in keys]
+
+    def _delete(self, *keys: str) -> int:
+        keys = [_key(key) for key in keys]
+        return sum(self._live(key) is not None and self.server.data.pop(key) is not None for key in keys)
+
+    def _exists(self, *keys: str) -> int:
+        return sum(self._live(key) is not None for key in keys)
+
+    def _flushdb(self) -> bool:
+        self.server.data.clear()
+        return True
+
+    def _sadd(self, key: str, *members: Any) -> int:
+        current = self._live(key)
+        members = {_encode(member) for member in members}
+        if current is None:
+            self.server.data[key] = (members, None)
+            return len(members)
+        added = len(members - current)
+        current.update(members)
+        return added
+
+    def _smembers(self, key: str) -> set:
+        return set(self._live(key) or ())
+
+    def _expire(self, key: str, seconds: int, nx: bool = False, gt: bool = False) -> bool:
+        value = self._live(key)
+        if value is None:
+            return False
+        expires_at = self.server.data[key][1]
+        if nx and expires_at is not None:
+            return False
+        # Keys without a TTL count as infinite for GT
+        if gt and (expires_at is None or time.monotonic() + seconds <= expires_at):
+            return False
+        self.server.data[key] = (value, time.monotonic() + seconds)
+        return True
+
+    def _ttl(self, key: str) -> int:
+        if self._live(key) is None:
+            return -2
+        expires_at = self.server.data[key][1]
+        return -1 if expires_at is None else int(round(expires_at - time.monotonic()))
+
+    def _eval(self, script: str, numkeys: int, *args: Any) -> Any:
+        # Only the compare-and-delete lock release script is supported
+        assert "del" in script and numkeys == 1
+        key, token = args
+        if self._live(key) == _encode(token):
+            return self._delete(key)
+        return 0
+
+    async def scan_iter(self, match: str = "*", count: Optional[int] = None):
+        # One round trip per batch of count keys, like SCAN with COUNT
+        # Redis escapes with a backslash, fnmatch with brackets
+        match = re.sub(r"\\(.)", r"[\1]", match)
+        keys = [key for key in list(self.server.data) if self._live(key) is not None]
+        for start in range(0, len(keys), count or 10):
+            self.server.commands += 1
+            for key in keys[start:start + (count or 10)]:
+                if fnmatch.fnmatchcase(key, match):
+                    yield _encode(key)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    async def publish(self, channel: str, message: Any) -> int:
+        subscribers = self.server.subscribers.get(channel, [])
+        for pubsub in subscribers:
+            pubsub.queue.put_nowait({"type": "message", "channel": channel.encode(), "data": _encode(message)})
+        return len(subscribers)
+
+    def pubsub(self) -> "FakePubSub":
+        return FakePubSub(self.server)
+
+    async def close(self) -> None:
+        pass
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.operations: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if not hasattr(self.client, f"_{name}"):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs) -> "FakePipeline":
+            self.operations.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        self.client.server.commands += 1
+        results = [getattr(self.client, f"_{name}")(*args, **kwargs) for name, args, kwargs in self.operations]
+        self.operations = []
+        return results
+
+class FakePubSub:
+    def __init__(self, server: FakeRedisServer):
+        self.server = server
+        self.channels: List[str] = []
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.append(channel)
+        self.server.subscribers.setdefault(channel, []).append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self) -> None:
+        for channel in self.channels:
+            self.server.subscribers[channel].remove(self)
+        self.channels = []
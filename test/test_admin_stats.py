@@ -0,0 +1,85 @@
+# File: test/test_admin_stats.py
+"""
+Tests for the admin statistics endpoints, called through the application.
+"""
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from dependencies import get_cache, get_current_admin
+from dependencies.database import db_service
+from main import app
+from services.cache import InMemoryCache, InstrumentedCache
+from services.cache.codec import CompressingCodec
+from services.database import CommandMetrics
+
+@pytest.fixture
+def cache():
+    return InstrumentedCache(InMemoryCache(codec=CompressingCodec(threshold=10)), ["article:"])
+
+@pytest.fixture
+def admin_client(cache):
+    app.dependency_overrides[get_current_admin] = lambda: {"_id": "admin", "username": "admin", "role": "admin"}
+    app.dependency_overrides[get_cache] = lambda: cache
+    try:
+        yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    finally:
+        app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_render_stats(admin_client):
+    async with admin_client as http:
+        response = await http.get("/api/admin/render/stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert {"queue_depth", "timeouts", "pool_restarts"} <= set(stats)
+    assert {"hits", "misses", "hit_rate"} <= set(stats["preview_cache"])
+    assert "change_events" in stats["page_index"]
+
+@pytest.mark.asyncio
+async def test_cache_stats_include_compression(admin_client, cache):
+    await cache.set("article:bitcoin", {"content": "x" * 5000})
+    async with admin_client as http:
+        response = await http.get("/api/admin/cache/stats")
+    assert response.status_code == 200
+    codec = response.json()["backend"]["codec"]
+    assert codec["compressed"] == 1 and codec["compression_ratio"] > 1
+
+@pytest.mark.asyncio
+async def test_cache_metrics(admin_client, cache):
+    await cache.get("article:missing")
+    async with admin_client as http:
+        response = await http.get("/api/admin/cache/metrics")
+    assert response.status_code == 200
+    assert 'prefix="article:"' in response.text
+
+@pytest.mark.asyncio
+async def test_cache_metrics_need_an_instrumented_cache(admin_client):
+    app.dependency_overrides[get_cache] = lambda: InMemoryCache()
+    async with admin_client as http:
+        response = await http.get("/api/admin/cache/metrics")
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_database_stats_and_metrics(admin_client, monkeypatch):
+    metrics = CommandMetrics()
+    metrics.started(SimpleNamespace(command_name="find", command={"find": "articles"}, request_id=1, connection_id=None))
+    metrics.succeeded(SimpleNamespace(command_name="find", request_id=1, duration_micros=2000, connection_id=None))
+    monkeypatch.setattr(db_service, "metrics", metrics)
+
+    async with admin_client as http:
+        stats = await http.get("/api/admin/database/stats")
+        text = await http.get("/api/admin/database/metrics")
+
+    assert stats.status_code == 200
+    assert stats.json()["commands"]["articles"]["find"]["count"] == 1
+    assert text.status_code == 200
+    assert 'kryptopedia_mongodb_commands_total{collection="articles",command="find"} 1' in text.text
+
+@pytest.mark.asyncio
+async def test_database_metrics_need_command_monitoring(admin_client, monkeypatch):
+    monkeypatch.setattr(db_service, "metrics", None)
+    async with admin_client as http:
+        response = await http.get("/api/admin/database/metrics")
+    assert response.status_code == 404
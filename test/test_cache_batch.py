@@ -0,0 +1,46 @@
+# File: test/test_cache_batch.py
+"""
+Tests for the batch cache operations.
+"""
+import pytest
+
+from fake_redis import FakeRedisServer
+from services.cache import InMemoryCache, TieredCache
+
+def caches():
+    server = FakeRedisServer()
+    return {
+        "memory": (InMemoryCache(), None),
+        "redis": (server.cache(), server),
+        "tiered": (TieredCache(server.cache()), server),
+    }
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["memory", "redis", "tiered"])
+async def test_batch_operations(name):
+    cache, _ = caches()[name]
+
+    assert await cache.set_many({"a": {"n": 1}, "b": [2], "c": "three"}, 60)
+    assert await cache.get_many(["a", "b", "missing", "c"]) == {"a": {"n": 1}, "b": [2], "c": "three"}
+    assert await cache.get("b") == [2]
+
+    assert await cache.delete_many(["a", "c", "missing"]) == 2
+    assert await cache.get_many(["a", "b", "c"]) == {"b": [2]}
+    assert await cache.get_many([]) == {}
+    assert await cache.delete_many([]) == 0
+
+@pytest.mark.asyncio
+async def test_redis_batches_use_one_round_trip():
+    server = FakeRedisServer()
+    cache = server.cache()
+
+    await cache.set_many({f"k{i}": i for i in range(10)})
+    await cache.get_many([f"k{i}" for i in range(10)])
+    await cache.delete_many([f"k{i}" for i in range(10)])
+    assert server.commands == 3
+
+@pytest.mark.asyncio
+async def test_unencodable_values_are_skipped_in_batches():
+    cache = FakeRedisServer().cache()
+    assert not await cache.set_many({"ok": 1, "bad": object()})
+    assert await cache.get_many(["ok", "bad"]) == {"ok": 1}
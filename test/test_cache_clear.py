@@ -0,0 +1,75 @@
+# File: test/test_cache_clear.py
+"""
+Tests for namespaced Redis keys and prefix-scoped cache clearing.
+"""
+import pytest
+
+from fake_redis import FakeRedisServer
+from services.cache import InMemoryCache, TieredCache, CACHE_CATEGORIES
+
+PREFIX = "kryptopedia:"
+
+def make_cache(name, server):
+    if name == "memory":
+        return InMemoryCache()
+    if name == "redis":
+        return server.cache(PREFIX)
+    return TieredCache(server.cache(PREFIX))
+
+@pytest.mark.asyncio
+async def test_redis_keys_are_prefixed_and_clear_spares_other_keys():
+    server = FakeRedisServer()
+    cache = server.cache(PREFIX)
+    other = server.client()
+    await other.set("session:abc", "someone else's")
+
+    await cache.set("article:bitcoin", {"title": "Bitcoin"}, 3600, tags=["article:1"])
+    await cache.set_many({"a": 1, "b": 2})
+    assert await cache.acquire_lock("homepage_data", 10)
+    assert set(server.data) == {
+        "session:abc", f"{PREFIX}article:bitcoin", f"{PREFIX}tag:article:1",
+        f"{PREFIX}a", f"{PREFIX}b", f"{PREFIX}lock:homepage_data"
+    }
+    assert await cache.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+
+    assert await cache.clear() is True
+    assert set(server.data) == {"session:abc"}
+
+@pytest.mark.asyncio
+async def test_clear_is_incremental():
+    server = FakeRedisServer()
+    cache = server.cache(PREFIX)
+    await cache.set_many({f"k{i}": i for i in range(1200)})
+
+    server.commands = 0
+    assert await cache.clear_prefix(["k"]) == 1200
+    # Several SCAN steps and UNLINK batches rather than one blocking call
+    assert server.commands > 4
+    assert server.data == {}
+
+@pytest.mark.asyncio
+async def test_prefix_patterns_are_escaped():
+    server = FakeRedisServer()
+    cache = server.cache("app[1]:")
+    await cache.set("a*", 1)
+    await cache.set("ab", 2)
+    await server.client().set("app1:a*", "unrelated")
+
+    assert await cache.clear_prefix(["a*"]) == 1
+    assert await cache.get("ab") == 2
+    assert "app1:a*" in server.data
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["memory", "redis", "tiered"])
+async def test_clear_prefix_removes_only_one_category(name):
+    cache = make_cache(name, FakeRedisServer())
+    await cache.set("article:bitcoin", {"title": "Bitcoin"}, 3600)
+    await cache.set("featured_article", {"title": "Bitcoin"}, 3600)
+    await cache.set("articles_list_newest_0_20", [1], 300)
+    await cache.set("statistics_page", {"n": 1}, 300)
+
+    assert await cache.clear_prefix(CACHE_CATEGORIES["articles"]) == 2
+    assert await cache.get_many(
+        ["article:bitcoin", "featured_article", "articles_list_newest_0_20", "statistics_page"]
+    ) == {"articles_list_newest_0_20": [1], "statistics_page": {"n": 1}}
+    assert await cache.clear_prefix([]) == 0
@@ -0,0 +1,130 @@
+# File: test/test_cache_codec.py
+"""
+Tests for the cache value codecs.
+"""
+import copy
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from fake_redis import FakeRedisServer
+from services.cache import InMemoryCache, BsonCodec, CompressingCodec, freeze, thaw
+
+def article_document():
+    return {
+        "_id": ObjectId(),
+        "title": "Bitcoin",
+        "createdAt": datetime(2024, 5, 1, 12, 30, 15, 250000),
+        "tags": ["crypto", "currency"],
+        "revisions": [{"_id": ObjectId(), "at": datetime(2024, 5, 2)}]
+    }
+
+@pytest.mark.asyncio
+async def test_memory_hits_return_the_stored_snapshot():
+    cache = InMemoryCache()
+    article = article_document()
+    await cache.set("article:bitcoin", article)
+
+    # Later changes by the caller do not reach the cache
+    article["title"] = "Changed"
+    article["tags"].append("changed")
+
+    first = await cache.get("article:bitcoin")
+    assert first is await cache.get("article:bitcoin")
+    assert first["title"] == "Bitcoin"
+    assert first["tags"] == ["crypto", "currency"]
+    assert isinstance(first["_id"], ObjectId)
+
+def test_frozen_values_are_read_only():
+    value = freeze({"tags": ["a"], "meta": {"n": 1}})
+
+    with pytest.raises(TypeError):
+        value["title"] = "x"
+    with pytest.raises(TypeError):
+        value["tags"].append("b")
+    with pytest.raises(TypeError):
+        value["meta"].update(n=2)
+
+    # Copies are mutable and the usual helpers still work
+    mutable = thaw(value)
+    mutable["tags"].append("b")
+    assert copy.deepcopy(value)["tags"] == ["a"]
+    assert value["tags"][:1] + ["b"] == ["a", "b"]
+    assert json.loads(json.dumps(value)) == {"tags": ["a"], "meta": {"n": 1}}
+
+@pytest.mark.asyncio
+async def test_uncacheable_values_are_rejected():
+    cache = InMemoryCache()
+    assert not await cache.set("key", {"value": object()})
+    assert await cache.get("key") is None
+
+def test_bson_codec_round_trips_mongo_types():
+    codec = BsonCodec()
+    article = article_document()
+
+    decoded = codec.decode(codec.encode(article))
+    assert decoded == article
+    assert codec.decode(codec.encode("text")) == "text"
+    assert codec.decode(codec.encode([1, 2])) == [1, 2]
+    assert codec.decode(codec.encode(freeze({"a": [1]}))) == {"a": [1]}
+    with pytest.raises(TypeError):
+        decoded["title"] = "Changed"
+
+def test_bson_codec_reads_legacy_entries():
+    codec = BsonCodec()
+    assert codec.decode(b'{"a": 1}') == {"a": 1}
+    with pytest.raises(TypeError):
+        codec.decode(b'{"a": 1}')["a"] = 2
+    assert codec.decode(b"plain") == "plain"
+    assert codec.decode(b"\xff\xfe") == b"\xff\xfe"
+
+def test_bson_codec_rejects_unencodable_values():
+    with pytest.raises(TypeError):
+        BsonCodec().encode({"value": object()})
+
+@pytest.mark.asyncio
+async def test_large_values_are_compressed_in_redis():
+    server = FakeRedisServer()
+    cache = server.cache()
+    cache.codec = CompressingCodec(BsonCodec(), threshold=256)
+    article = {**article_document(), "html": "<p>Bitcoin is a cryptocurrency.</p>" * 200}
+
+    await cache.set("article:bitcoin", article)
+    await cache.set("small", {"n": 1})
+
+    stored = server.data["article:bitcoin"][0]
+    assert stored.startswith(CompressingCodec.ZLIB_MAGIC)
+    assert len(stored) < len(BsonCodec().encode(article)) / 10
+    assert server.data["small"][0].startswith(BsonCodec.PREFIX)
+    assert await cache.get("article:bitcoin") == article
+    assert await cache.get("small") == {"n": 1}
+
+    stats = cache.get_stats()["codec"]
+    assert stats["compressed"] == 1 and stats["uncompressed"] == 1
+    assert stats["decompressed"] == 1
+    assert stats["compression_ratio"] > 10
+
+def test_compressing_codec_reads_uncompressed_entries():
+    codec = CompressingCodec(threshold=0)
+    assert codec.decode(BsonCodec().encode({"n": 1})) == {"n": 1}
+    assert codec.decode(json.dumps({"n": 1}).encode("utf-8")) == {"n": 1}
+
+def test_incompressible_values_are_stored_as_is():
+    codec = CompressingCodec(threshold=0)
+    stored = codec.encode(bytes(range(256)))
+    assert not stored.startswith(CompressingCodec.ZLIB_MAGIC)
+    assert codec.decode(stored) == bytes(range(256))
+
+@pytest.mark.asyncio
+async def test_compressed_memory_cache_counts_stored_size():
+    plain = InMemoryCache()
+    compressed = InMemoryCache(codec=CompressingCodec(threshold=256))
+    value = {"html": "<p>Ethereum</p>" * 500}
+
+    await plain.set("article:ethereum", value)
+    await compressed.set("article:ethereum", value)
+
+    assert compressed.get_stats()["bytes"] < plain.get_stats()["bytes"] / 10
+    assert await compressed.get("article:ethereum") == value
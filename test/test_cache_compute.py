@@ -0,0 +1,158 @@
+# File: test/test_cache_compute.py
+"""
+Tests for get_or_compute: single-flight, cross-process locking and early refresh.
+"""
+import asyncio
+import time
+
+import pytest
+
+from fake_redis import FakeRedisServer
+from services.cache import InMemoryCache
+from services.cache import base
+
+class Counter:
+    def __init__(self, delay: float = 0.05, value="computed"):
+        self.calls = 0
+        self.delay = delay
+        self.value = value
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"value": self.value, "call": self.calls}
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once():
+    cache = InMemoryCache()
+    compute = Counter()
+
+    results = await asyncio.gather(*[cache.get_or_compute("stats", compute, 60) for _ in range(20)])
+
+    assert compute.calls == 1
+    assert all(result == {"value": "computed", "call": 1} for result in results)
+    assert await cache.get_or_compute("stats", compute, 60) == {"value": "computed", "call": 1}
+    assert compute.calls == 1
+
+@pytest.mark.asyncio
+async def test_processes_share_one_computation_through_the_lock():
+    server = FakeRedisServer()
+    workers = [server.cache() for _ in range(3)]
+    compute = Counter(delay=0.2)
+
+    results = await asyncio.gather(*[worker.get_or_compute("stats", compute, 60) for worker in workers])
+
+    assert compute.calls == 1
+    assert all(result["call"] == 1 for result in results)
+    # The lock is released once the value is stored
+    assert await server.client().get("lock:stats") is None
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter_and_nothing_is_cached():
+    cache = InMemoryCache()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    results = await asyncio.gather(*[cache.get_or_compute("stats", fail, 60) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await cache.get("stats") is None
+
+@pytest.mark.asyncio
+async def test_values_near_expiry_are_refreshed_early(monkeypatch):
+    cache = InMemoryCache()
+    await cache.set("stats", {
+        base.COMPUTED_MARKER: True,
+        "value": "old",
+        "delta": 2.0,
+        "staleAt": time.time() + 5
+    }, 60)
+    compute = Counter(delay=0, value="new")
+
+    # -log(1 - 0.9) * 2.0 is about 4.6 seconds: not yet
+    monkeypatch.setattr(base.random, "random", lambda: 0.9)
+    assert await cache.get_or_compute("stats", compute, 60) == "old"
+
+    # -log(1 - 0.99) * 2.0 is about 9.2 seconds: refresh now
+    monkeypatch.setattr(base.random, "random", lambda: 0.99)
+    assert (await cache.get_or_compute("stats", compute, 60))["value"] == "new"
+    assert compute.calls == 1
+
+    # beta=0 only recomputes after expiry
+    await cache.set("other", {base.COMPUTED_MARKER: True, "value": "old", "delta": 100.0, "staleAt": time.time() + 1}, 60)
+    assert await cache.get_or_compute("other", compute, 60, beta=0) == "old"
+
+@pytest.mark.asyncio
+async def test_current_value_is_served_during_a_refresh():
+    cache = InMemoryCache()
+    await cache.set("stats", {base.COMPUTED_MARKER: True, "value": "old", "delta": 0.0, "staleAt": time.time() - 1}, 60)
+    compute = Counter(delay=0.1, value="new")
+
+    refresh = asyncio.create_task(cache.get_or_compute("stats", compute, 60))
+    await asyncio.sleep(0.01)
+    assert await cache.get_or_compute("stats", compute, 60) == "old"
+    assert (await refresh)["value"] == "new"
+    assert compute.calls == 1
+
+@pytest.mark.asyncio
+async def test_stale_values_are_refreshed_in_the_background():
+    cache = InMemoryCache()
+    await cache.set("homepage_data", {base.COMPUTED_MARKER: True, "value": "old", "delta": 0.0, "staleAt": time.time() - 1}, 60)
+    compute = Counter(delay=0.05, value="new")
+
+    # Every request between the soft and hard TTL gets the stale value at once
+    results = await asyncio.gather(*[
+        cache.get_or_compute("homepage_data", compute, 300, hard_expiration=3600) for _ in range(5)
+    ])
+    assert results == ["old"] * 5
+
+    await asyncio.sleep(0.1)
+    assert compute.calls == 1
+    assert (await cache.get_or_compute("homepage_data", compute, 300, hard_expiration=3600))["value"] == "new"
+
+@pytest.mark.asyncio
+async def test_entries_are_kept_until_the_hard_ttl(monkeypatch):
+    cache = InMemoryCache()
+    stored = {}
+    original_set = cache.set
+
+    async def recording_set(key, value, expiration=None, tags=None):
+        stored[key] = expiration
+        return await original_set(key, value, expiration, tags)
+
+    monkeypatch.setattr(cache, "set", recording_set)
+    await cache.get_or_compute("stats", Counter(delay=0), 300, hard_expiration=3600)
+    assert stored["stats"] == 3600
+
+@pytest.mark.asyncio
+async def test_failed_background_refresh_keeps_the_stale_value():
+    cache = InMemoryCache()
+    await cache.set("stats", {base.COMPUTED_MARKER: True, "value": "old", "delta": 0.0, "staleAt": time.time() - 1}, 60)
+
+    async def fail():
+        raise RuntimeError("database down")
+
+    assert await cache.get_or_compute("stats", fail, 300, hard_expiration=3600) == "old"
+    await asyncio.sleep(0.01)
+    assert await cache.get_or_compute("stats", fail, 300, hard_expiration=3600) == "old"
+    # Let the second refresh finish before the loop closes
+    await asyncio.sleep(0.01)
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_other_waiters():
+    cache = InMemoryCache()
+    compute = Counter(delay=0.1)
+
+    first = asyncio.create_task(cache.get_or_compute("stats", compute, 60))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(cache.get_or_compute("stats", compute, 60))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == {"value": "computed", "call": 1}
+    assert first.cancelled()
+    assert compute.calls == 1
+    # The flight finished and stored its value even though its starter left
+    assert await cache.get_or_compute("stats", compute, 60) == {"value": "computed", "call": 1}
+    assert not cache._compute_flights()
@@ -0,0 +1,61 @@
+# File: test/test_cache_metrics.py
+"""
+Tests for per-prefix cache instrumentation.
+"""
+import pytest
+
+from services.cache import InMemoryCache, InstrumentedCache, CACHE_CATEGORIES, get_cache_service
+
+def make_cache():
+    prefixes = [prefix for category in CACHE_CATEGORIES.values() for prefix in category]
+    return InstrumentedCache(InMemoryCache(), prefixes)
+
+@pytest.mark.asyncio
+async def test_hits_and_misses_are_grouped_by_prefix():
+    cache = make_cache()
+    await cache.set("article:bitcoin", {"title": "Bitcoin"})
+    await cache.get("article:bitcoin")
+    await cache.get("article:ethereum")
+    await cache.get_many(["articles_list_newest_0_20", "articles_list_newest_20_20"])
+    await cache.get("render:v3:abc")
+    await cache.get("unprefixed")
+
+    prefixes = cache.get_stats()["prefixes"]
+    assert set(prefixes) == {"article:", "articles_list_", "render:", "other"}
+    assert prefixes["article:"]["hits"] == 1
+    assert prefixes["article:"]["misses"] == 1
+    assert prefixes["article:"]["hit_rate"] == 0.5
+    assert prefixes["articles_list_"]["misses"] == 2
+    assert prefixes["article:"]["value_bytes"]["count"] == 1
+    assert prefixes["article:"]["latency_seconds"]["get"]["count"] == 2
+    assert prefixes["articles_list_"]["latency_seconds"]["get_many"]["count"] == 1
+
+@pytest.mark.asyncio
+async def test_get_or_compute_is_counted_against_its_key():
+    cache = make_cache()
+
+    async def compute():
+        return {"articles": []}
+
+    await cache.get_or_compute("homepage_data", compute, 300)
+    await cache.get_or_compute("homepage_data", compute, 300)
+
+    stats = cache.get_stats()["prefixes"]["homepage_data"]
+    assert stats["misses"] >= 1 and stats["hits"] >= 1
+    assert stats["sets"] == 1
+
+@pytest.mark.asyncio
+async def test_backend_stats_and_prometheus_output():
+    cache = make_cache()
+    await cache.set("statistics_page", {"n": 1}, 300)
+    await cache.get("statistics_page")
+
+    assert cache.get_stats()["backend"]["entries"] == 1
+    metrics = cache.render_metrics()
+    assert 'kryptopedia_cache_hits_total{prefix="statistics"} 1' in metrics
+    assert 'kryptopedia_cache_latency_seconds_count{prefix="statistics",operation="get"} 1' in metrics
+    assert 'kryptopedia_cache_value_bytes_bucket{prefix="statistics",le="+Inf"} 1' in metrics
+
+def test_factory_wraps_the_cache_unless_disabled():
+    assert isinstance(get_cache_service(), InstrumentedCache)
+    assert isinstance(get_cache_service(metrics=False), InMemoryCache)
@@ -0,0 +1,156 @@
+# File: test/test_cache_tags.py
+"""
+Tests for tag-based cache invalidation.
+"""
+import asyncio
+
+import httpx
+import pytest
+from bson import ObjectId
+
+from dependencies import get_cache, get_db
+from fake_redis import FakeRedisServer
+from main import app
+from routes.votes import vote_article
+from services.cache import InMemoryCache, TieredCache, ARTICLE_LISTINGS, article_tag
+
+def make_cache(name, server):
+    if name == "memory":
+        return InMemoryCache()
+    if name == "redis":
+        return server.cache()
+    return TieredCache(server.cache())
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["memory", "redis", "tiered"])
+async def test_invalidate_tag_deletes_every_tagged_key(name):
+    cache = make_cache(name, FakeRedisServer())
+    tag = article_tag("64b000000000000000000001")
+
+    await cache.set("article:64b000000000000000000001", {"title": "Bitcoin"}, 3600, tags=[tag])
+    await cache.set("article:bitcoin", {"title": "Bitcoin"}, 3600, tags=[tag])
+    await cache.set_many(
+        {"articles_list_newest_0_20": [1], "articles_list_newest_20_20": [2]},
+        300,
+        tags=[ARTICLE_LISTINGS]
+    )
+    await cache.set("homepage_data", {"n": 1}, 300, tags=[ARTICLE_LISTINGS, tag])
+    await cache.set("untagged", 1)
+
+    assert await cache.invalidate_tag(tag) == 3
+    assert await cache.get_many(["article:64b000000000000000000001", "article:bitcoin", "homepage_data"]) == {}
+
+    assert await cache.invalidate_tags([ARTICLE_LISTINGS, "unknown"]) == 2
+    assert await cache.get("untagged") == 1
+
+    # A tag can be reused once invalidated
+    assert await cache.invalidate_tag(tag) == 0
+    await cache.set("article:bitcoin", {"title": "Bitcoin"}, 3600, tags=[tag])
+    assert await cache.invalidate_tag(tag) == 1
+
+@pytest.mark.asyncio
+async def test_memory_tag_index_follows_evictions():
+    cache = InMemoryCache(max_entries=1)
+    await cache.set("a", 1, tags=["t"])
+    await cache.set("b", 2, tags=["t"])
+    await cache.delete("b")
+    assert cache.get_stats()["tags"] == 0
+
+@pytest.mark.asyncio
+async def test_redis_tag_sets_outlive_their_keys():
+    server = FakeRedisServer()
+    cache = server.cache()
+    await cache.set("long", 1, 3600, tags=["t"])
+    await cache.set("short", 2, 60, tags=["t"])
+    assert await server.client().ttl("tag:t") == 3600
+
+    await cache.set("unexpiring", 3, tags=["u"])
+    assert await server.client().ttl("tag:u") > 3600
+
+@pytest.mark.asyncio
+async def test_tiered_invalidation_reaches_other_workers():
+    server = FakeRedisServer()
+    first, second = TieredCache(server.cache()), TieredCache(server.cache())
+    for cache in (first, second):
+        await cache.start()
+    await asyncio.sleep(0)
+    try:
+        await first.set("article:bitcoin", {"title": "Bitcoin"}, 3600, tags=[article_tag(1)])
+        assert await second.get("article:bitcoin") == {"title": "Bitcoin"}
+
+        await first.invalidate_tag(article_tag(1))
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+        assert not await second.local.exists("article:bitcoin")
+        assert await second.get("article:bitcoin") is None
+    finally:
+        await first.close()
+        await second.close()
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def skip(self, count):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(document) for document in self.documents]
+
+class FakeCollection:
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.finds = 0
+
+    def _matching(self, query):
+        return [d for d in self.documents if all(d.get(k) == v for k, v in query.items())]
+
+    def find(self, query=None):
+        self.finds += 1
+        return FakeCursor(self._matching(query or {}))
+
+    async def find_one(self, query, projection=None):
+        matching = self._matching(query)
+        return dict(matching[0]) if matching else None
+
+    async def count_documents(self, query):
+        return len(self._matching(query))
+
+    async def insert_one(self, document):
+        self.documents.append(document)
+
+    async def update_one(self, query, update):
+        pass
+
+@pytest.mark.asyncio
+async def test_votes_refresh_the_creators_profile():
+    author, article_id = ObjectId(), ObjectId()
+    db = {
+        "users": FakeCollection([{"_id": author, "username": "alice", "role": "user", "contributions": {}}]),
+        "articles": FakeCollection([{"_id": article_id, "title": "Bitcoin", "authorId": author, "createdBy": author}]),
+        "revisions": FakeCollection(),
+        "proposals": FakeCollection(),
+        "rewards": FakeCollection(),
+        "votes": FakeCollection(),
+    }
+    cache = InMemoryCache()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_cache] = lambda: cache
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            assert (await http.get("/profile/alice")).status_code == 200
+            await http.get("/profile/alice")
+            assert db["articles"].finds == 1
+
+            await vote_article(str(article_id), {"vote_type": "upvote"}, {"_id": ObjectId()}, db, cache)
+
+            await http.get("/profile/alice")
+            assert db["articles"].finds == 2
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,96 @@
+# File: test/test_cache_warmup.py
+"""
+Tests for cache warm-up.
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from services import warmup
+from services.cache import InMemoryCache, article_tag
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, field, direction):
+        self.documents = sorted(self.documents, key=lambda d: d.get(field, 0), reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+class FakeArticles:
+    def __init__(self, articles):
+        self.articles = articles
+
+    def find(self, query):
+        return FakeCursor([a for a in self.articles if a.get("status") in query["status"]["$in"]])
+
+@pytest.fixture
+def pages(monkeypatch):
+    calls = []
+
+    def fake_page(name, delay=0.0):
+        async def compute(*args):
+            calls.append(name)
+            await asyncio.sleep(delay)
+        return compute
+
+    monkeypatch.setattr(warmup, "get_homepage_data", fake_page("homepage"))
+    monkeypatch.setattr(warmup, "get_statistics", fake_page("statistics"))
+    return calls, fake_page
+
+def make_db(count):
+    articles = [
+        {"_id": ObjectId(), "slug": f"article-{i}", "views": i, "status": "published"}
+        for i in range(count)
+    ]
+    articles.append({"_id": ObjectId(), "slug": "draft", "views": 1000, "status": "draft"})
+    return {"articles": FakeArticles(articles)}
+
+@pytest.mark.asyncio
+async def test_most_viewed_articles_and_pages_are_warmed(pages):
+    calls, _ = pages
+    cache = InMemoryCache()
+    await cache.set("article:article-17", {"slug": "article-17"})
+
+    stats = await warmup.warm_cache(make_db(20), cache, article_limit=5, concurrency=2)
+
+    assert sorted(calls) == ["homepage", "statistics"]
+    assert stats["articles"] == 4
+    assert stats["articles_already_cached"] == 1
+    assert stats["pages"] == 2 and stats["failures"] == 0
+    assert await cache.get("article:draft") is None
+    assert await cache.get("article:article-19") is not None
+    assert await cache.get("article:article-14") is None
+
+    # Warmed articles are invalidated with the rest of the article's entries
+    article = await cache.get("article:article-18")
+    assert await cache.invalidate_tag(article_tag(article["_id"])) == 1
+
+@pytest.mark.asyncio
+async def test_failed_steps_are_counted(pages, monkeypatch):
+    async def broken(*args):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(warmup, "get_statistics", broken)
+    stats = await warmup.warm_cache(make_db(0), InMemoryCache())
+    assert stats["pages"] == 1 and stats["failures"] == 1
+
+@pytest.mark.asyncio
+async def test_warm_up_over_budget_continues_in_background(pages, monkeypatch):
+    calls, fake_page = pages
+    monkeypatch.setattr(warmup, "get_homepage_data", fake_page("homepage", delay=0.2))
+
+    assert await warmup.warm_cache_within(0.01, make_db(0), InMemoryCache()) is None
+    assert len(warmup._background_warmups) == 1
+
+    await asyncio.gather(*warmup._background_warmups)
+    assert "homepage" in calls
+    assert await warmup.warm_cache_within(1.0, make_db(0), InMemoryCache()) is not None
@@ -0,0 +1,87 @@
+# File: test/test_database.py
+"""
+Tests for the shared MongoDB client and its command monitoring.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.database import CommandMetrics, Database, NO_COLLECTION, available_compressors
+
+def started(name, command, request_id, connection_id=("localhost", 27017)):
+    return SimpleNamespace(command_name=name, command=command, request_id=request_id, connection_id=connection_id)
+
+def finished(name, request_id, micros, connection_id=("localhost", 27017)):
+    return SimpleNamespace(command_name=name, request_id=request_id, duration_micros=micros, connection_id=connection_id)
+
+def test_commands_are_recorded_per_collection():
+    metrics = CommandMetrics()
+    metrics.started(started("find", {"find": "articles", "filter": {}}, 1))
+    metrics.started(started("find", {"find": "users"}, 2))
+    metrics.succeeded(finished("find", 2, 800))
+    metrics.succeeded(finished("find", 1, 3000))
+    metrics.started(started("getMore", {"getMore": 123, "collection": "articles"}, 3))
+    metrics.failed(finished("getMore", 3, 50000))
+    metrics.started(started("ping", {"ping": 1}, 4))
+    metrics.succeeded(finished("ping", 4, 100))
+
+    stats = metrics.get_stats()
+    assert stats["articles"]["find"]["count"] == 1
+    assert stats["articles"]["find"]["latency_seconds"]["sum"] == 0.003
+    assert stats["articles"]["getMore"]["failures"] == 1
+    assert stats["users"]["find"]["latency_seconds"]["buckets"]["0.001"] == 1
+    assert stats[NO_COLLECTION]["ping"]["count"] == 1
+
+    text = metrics.render_metrics()
+    assert 'kryptopedia_mongodb_commands_total{collection="articles",command="find"} 1' in text
+    assert 'kryptopedia_mongodb_command_failures_total{collection="articles",command="getMore"} 1' in text
+    assert 'kryptopedia_mongodb_command_latency_seconds_count{collection="users",command="find"} 1' in text
+
+def test_unavailable_compressors_are_dropped(monkeypatch):
+    monkeypatch.setattr("services.database.importlib.util.find_spec", lambda name: None)
+    assert available_compressors(["zstd", " snappy", "zlib", "lz4", ""]) == ["zlib"]
+
+def test_client_options_come_from_the_constructor():
+    database = Database(
+        "mongodb://localhost:27017", "test",
+        max_pool_size=20, socket_timeout_ms=None, compressors=["zlib"],
+        read_preference="secondaryPreferred", monitor_commands=False
+    )
+    options = database.get_stats()["options"]
+    assert options["maxPoolSize"] == 20 and options["compressors"] == "zlib"
+    assert options["readPreference"] == "secondaryPreferred"
+    assert "socketTimeoutMS" not in options
+    assert database.get_stats()["commands"] is None
+
+@pytest.mark.asyncio
+async def test_concurrent_connects_share_one_client(monkeypatch):
+    created = []
+
+    class FakeClient(dict):
+        def __init__(self, uri, **options):
+            super().__init__()
+            created.append(options)
+
+        def __missing__(self, name):
+            return SimpleNamespace(name=name)
+
+        def close(self):
+            pass
+
+    async def no_indices():
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr("services.database.AsyncIOMotorClient", FakeClient)
+    database = Database("mongodb://localhost:27017", "test", max_pool_size=10)
+    monkeypatch.setattr(database, "create_indices", no_indices)
+
+    await asyncio.gather(*(database.connect() for _ in range(5)))
+
+    assert len(created) == 1
+    assert created[0]["maxPoolSize"] == 10
+    assert created[0]["event_listeners"] == [database.metrics]
+    assert database.db.name == "test"
+
+    await database.close()
+    assert database.client is None
@@ -0,0 +1,95 @@
+# File: test/test_indexes.py
+"""
+Tests for the declared indexes and the query shape audit.
+"""
+import pytest
+
+from services.indexes import INDEXES, QUERY_SHAPES, audit_query_shapes, ensure_indexes, explain_query_shape
+
+def serves(index, shape):
+    """Whether an index serves a shape: equality fields, then the sort, then ranges."""
+    if index.get("collation") != shape.get("collation"):
+        return False
+    fields = [field for field, _ in index["keys"]]
+    equality = [f for f, v in shape["filter"].items() if not isinstance(v, dict)]
+    # $ne is left to the FETCH filter
+    ranges = [f for f, v in shape["filter"].items() if isinstance(v, dict) and "$ne" not in v]
+    sort = [field for field, _ in shape.get("sort", [])]
+    if set(fields[:len(equality)]) != set(equality):
+        return False
+    rest = fields[len(equality):]
+    if rest[:len(sort)] != sort:
+        return False
+    return set(ranges) <= set(fields)
+
+@pytest.mark.parametrize("shape", QUERY_SHAPES, ids=[shape["name"] for shape in QUERY_SHAPES])
+def test_every_query_shape_has_an_index(shape):
+    assert any(serves(index, shape) for index in INDEXES[shape["collection"]])
+
+class FakeDatabase(dict):
+    def __init__(self, plans):
+        super().__init__()
+        self.plans = plans
+        self.explained = []
+
+    async def command(self, command):
+        self.explained.append(command)
+        plan = self.plans[command["explain"]["find"]]
+        if isinstance(plan, Exception):
+            raise plan
+        return {"queryPlanner": {"winningPlan": plan}}
+
+@pytest.mark.asyncio
+async def test_scans_and_in_memory_sorts_are_flagged():
+    db = FakeDatabase({
+        "articles": {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "status_1_createdAt_-1"}}},
+        "revisions": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}},
+        # Slot-based engine plans nest the classic tree under queryPlan
+        "users": {"queryPlan": {"stage": "SORT", "inputStage": {"stage": "IXSCAN", "indexName": "email_1"}}},
+        "rewards": RuntimeError("not authorized"),
+    })
+    shapes = [
+        {"name": "articles", "collection": "articles", "filter": {"status": "published"}, "sort": [("createdAt", -1)]},
+        {"name": "revisions", "collection": "revisions", "filter": {}, "sort": [("createdAt", -1)]},
+        {"name": "users", "collection": "users", "filter": {}, "sort": [("joinDate", -1)]},
+        {"name": "rewards", "collection": "rewards", "filter": {}},
+    ]
+
+    results = {result["name"]: result for result in await audit_query_shapes(db, shapes)}
+
+    assert results["articles"]["problems"] == [] and results["articles"]["index"] == "status_1_createdAt_-1"
+    assert results["revisions"]["problems"] == ["collection scan", "in-memory sort"]
+    assert results["users"]["problems"] == ["in-memory sort"] and results["users"]["index"] == "email_1"
+    assert results["rewards"]["problems"][0].startswith("explain failed")
+    assert db.explained[0]["explain"]["sort"] == {"createdAt": -1}
+    assert db.explained[0]["verbosity"] == "queryPlanner"
+
+@pytest.mark.asyncio
+async def test_explain_without_sort():
+    db = FakeDatabase({"articles": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "slug_1"}}})
+    result = await explain_query_shape(db, {"name": "slug", "collection": "articles", "filter": {"slug": "bitcoin"}})
+    assert "sort" not in db.explained[0]["explain"]
+    assert result["stages"] == ["FETCH", "IXSCAN"] and result["problems"] == []
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_creates_every_collection():
+    created = {}
+
+    class FakeCollection:
+        def __init__(self, name):
+            self.name = name
+
+        async def create_indexes(self, models):
+            created[self.name] = [model.document for model in models]
+
+    class Database(dict):
+        def __missing__(self, name):
+            return FakeCollection(name)
+
+    await ensure_indexes(Database())
+
+    assert set(created) == set(INDEXES)
+    assert {"key": {"rewardedUser": 1, "rewardedAt": -1}, "name": "rewardedUser_1_rewardedAt_-1"} in [
+        {"key": dict(doc["key"]), "name": doc["name"]} for doc in created["rewards"]
+    ]
+    assert any(doc.get("unique") for doc in created["articles"])
@@ -0,0 +1,146 @@
+# File: test/test_links.py
+"""
+Tests for the links collection.
+"""
+import pytest
+from bson import ObjectId
+
+from services.links import (
+    PageIndex,
+    normalize_link_target,
+    extract_link_targets,
+    update_article_links
+)
+from utils.wiki_parser import compile_template, parse_wiki_markup
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+class FakeLinks:
+    def __init__(self):
+        self.documents = []
+        self.writes = 0
+
+    def find(self, query, projection=None):
+        return FakeCursor([d for d in self.documents if d["sourceId"] == query["sourceId"]])
+
+    async def delete_many(self, query):
+        removed = {(c["targetNamespace"], c["targetTitle"]) for c in query.get("$or", [])}
+        self.documents = [
+            d for d in self.documents
+            if d["sourceId"] != query["sourceId"] or (d["targetNamespace"], d["targetTitle"]) not in removed
+        ]
+        self.writes += 1
+
+    async def insert_many(self, documents, ordered=True):
+        self.documents.extend(documents)
+        self.writes += 1
+
+class FakeArticles:
+    def __init__(self, pages):
+        self.pages = pages
+        self.queries = []
+
+    def find(self, query, projection=None, collation=None):
+        self.queries.append(query)
+        if "$or" not in query:
+            return FakeCursor(self.pages)
+        fold = str.casefold if collation else (lambda title: title)
+        return FakeCursor([
+            page for page in self.pages
+            if any(fold(page["title"]) in {fold(t) for t in clause["title"]["$in"]} for clause in query["$or"])
+        ])
+
+def test_normalize_link_target():
+    assert normalize_link_target("bitcoin_basics#History") == ("", "Bitcoin basics")
+    assert normalize_link_target("help: editing  pages") == ("Help", "Editing pages")
+    assert normalize_link_target("BTC:Fork") == ("", "BTC:Fork")
+    assert normalize_link_target("Category:Blockchain") is None
+    assert normalize_link_target("#Section") is None
+
+def test_extract_link_targets_includes_templates():
+    templates = {"Nav": compile_template("See [[Ethereum]]")}
+    targets = extract_link_targets("* [[Bitcoin]] and [[bitcoin|coin]]\n{{Nav}}", templates)
+    assert targets == {("", "Bitcoin"), ("", "Ethereum")}
+
+@pytest.mark.asyncio
+async def test_update_article_links_writes_only_changes():
+    links = FakeLinks()
+    db = {"links": links}
+    article_id = ObjectId()
+
+    assert await update_article_links(db, article_id, "[[A]] [[B]]", {}) == (2, 0)
+    assert await update_article_links(db, article_id, "[[A]] [[B]]", {}) == (0, 0)
+    assert links.writes == 1
+
+    assert await update_article_links(db, article_id, "[[B]] [[C]]", {}) == (1, 1)
+    assert {d["targetTitle"] for d in links.documents} == {"B", "C"}
+
+    assert await update_article_links(db, article_id, None) == (0, 2)
+    assert links.documents == []
+
+def test_missing_links_render_as_red_links():
+    html, _ = parse_wiki_markup("[[Bitcoin]] and [[Nowhere|a page]]", missing_links={"Nowhere"})
+    assert '<a href="/articles/Bitcoin">Bitcoin</a>' in html
+    assert '<a href="/articles/Nowhere" class="wiki-redlink" title="Nowhere (page does not exist)">a page</a>' in html
+
+@pytest.mark.asyncio
+async def test_page_index_queries_only_unknown_targets():
+    articles = FakeArticles([
+        {"namespace": "", "title": "Bitcoin"},
+        {"namespace": "Help", "title": "Editing"},
+    ])
+    db = {"articles": articles}
+    index = PageIndex()
+
+    # Before loading, every target is checked with one query
+    missing = await index.find_missing(db, ["bitcoin", "Help:Editing", "Nowhere", "File:X.png", "Category:Y"])
+    assert missing == {"Nowhere"}
+    assert len(articles.queries) == 1
+
+    await index.load(db)
+    assert await index.find_missing(db, ["Bitcoin", "help:editing"]) == set()
+    assert len(articles.queries) == 2
+
+    index.discard("", "Bitcoin")
+    assert await index.find_missing(db, ["Bitcoin"]) == set()
+    assert len(articles.queries) == 3
+    assert index.get_stats()["index_hits"] == 2
+
+@pytest.mark.asyncio
+async def test_page_index_fallback_ignores_case():
+    db = {"articles": FakeArticles([{"namespace": "", "title": "Proof of Stake"}])}
+    index = PageIndex()
+    assert await index.find_missing(db, ["proof of stake", "PROOF OF STAKE", "Proof of Work"]) == {"Proof of Work"}
+
+@pytest.mark.asyncio
+async def test_page_index_applies_change_events_incrementally():
+    first, second = ObjectId(), ObjectId()
+    articles = FakeArticles([
+        {"_id": first, "namespace": "", "title": "Bitcoin"},
+        {"_id": second, "namespace": "", "title": "Ethereum"},
+    ])
+    db = {"articles": articles}
+    index = PageIndex()
+    await index.load(db)
+
+    index._apply_change({"operationType": "update", "documentKey": {"_id": first},
+                         "fullDocument": {"namespace": "", "title": "Bitcoin (currency)"}})
+    index._apply_change({"operationType": "delete", "documentKey": {"_id": second}})
+    third = ObjectId()
+    index._apply_change({"operationType": "insert", "documentKey": {"_id": third},
+                         "fullDocument": {"namespace": "Help", "title": "Editing"}})
+
+    assert index._pages == {":bitcoin (currency)", "Help:editing"}
+    assert index.get_stats()["reloads"] == 1
+    # Known pages are answered from the index without a query
+    assert await index.find_missing(db, ["Bitcoin (currency)", "Help:Editing"]) == set()
+    assert len(articles.queries) == 1
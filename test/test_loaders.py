@@ -0,0 +1,133 @@
+# File: test/test_loaders.py
+"""
+Tests for the batched document loaders.
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from pages.home import build_homepage_data
+from services.cache import InMemoryCache
+from services.loaders import DocumentLoader, Loaders
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, field, direction):
+        self.documents = sorted(self.documents, key=lambda d: d.get(field, 0), reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+class FakeCollection:
+    def __init__(self, documents=(), fail=False):
+        self.documents = list(documents)
+        self.fail = fail
+        self.queries = []
+
+    def find(self, query=None, projection=None):
+        self.queries.append((query, projection))
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        query = query or {}
+        if "_id" in query:
+            wanted = query["_id"]["$in"]
+            found = [d for d in self.documents if d["_id"] in wanted]
+            if projection:
+                found = [{k: v for k, v in d.items() if k == "_id" or k in projection} for d in found]
+            return FakeCursor(found)
+        return FakeCursor([d for d in self.documents if all(d.get(k) == v for k, v in query.items())])
+
+    async def find_one(self, *args, **kwargs):
+        raise AssertionError("find_one should not be used for related documents")
+
+    async def count_documents(self, query):
+        return len(self.documents)
+
+def make_users(count):
+    return [{"_id": ObjectId(), "username": f"user{i}", "email": f"user{i}@example.com"} for i in range(count)]
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_share_one_projected_query():
+    users = make_users(3)
+    collection = FakeCollection(users)
+    loader = DocumentLoader(collection, {"username": 1})
+
+    missing = ObjectId()
+    found = await asyncio.gather(
+        loader.load(users[0]["_id"]),
+        loader.load(str(users[1]["_id"])),
+        loader.load(users[0]["_id"]),
+        loader.load(missing),
+        loader.load(None),
+    )
+
+    assert [doc["username"] if doc else None for doc in found] == ["user0", "user1", "user0", None, None]
+    assert "email" not in found[0]
+    assert loader.batches == 1
+    query, projection = collection.queries[0]
+    assert len(query["_id"]["$in"]) == 3 and projection == {"username": 1}
+
+    # Loaded documents are not fetched again
+    again = await loader.load_many([users[1]["_id"], users[2]["_id"]])
+    assert set(again) == {users[1]["_id"], users[2]["_id"]}
+    assert loader.batches == 2 and collection.queries[1][0]["_id"]["$in"] == [users[2]["_id"]]
+
+@pytest.mark.asyncio
+async def test_large_batches_are_split():
+    users = make_users(5)
+    loader = DocumentLoader(FakeCollection(users), max_batch_size=2)
+    found = await loader.load_many(user["_id"] for user in users)
+    assert len(found) == 5 and loader.batches == 3
+
+@pytest.mark.asyncio
+async def test_failed_queries_raise_and_are_retried():
+    users = make_users(1)
+    collection = FakeCollection(users, fail=True)
+    loader = DocumentLoader(collection)
+
+    with pytest.raises(RuntimeError):
+        await loader.load(users[0]["_id"])
+
+    collection.fail = False
+    assert (await loader.load(users[0]["_id"]))["username"] == "user0"
+
+@pytest.mark.asyncio
+async def test_homepage_uses_one_query_per_collection():
+    users = make_users(5)
+    articles = [
+        {"_id": ObjectId(), "title": f"Article {i}", "slug": f"article-{i}", "status": "published",
+         "views": i, "createdAt": i, "createdBy": users[i]["_id"]}
+        for i in range(5)
+    ]
+    revisions = [
+        {"_id": ObjectId(), "articleId": articles[i % 5]["_id"], "createdBy": users[i % 5]["_id"],
+         "createdAt": 10 + i, "comment": f"edit {i}"}
+        for i in range(5)
+    ]
+    db = {
+        "users": FakeCollection(users),
+        "articles": FakeCollection(articles),
+        "revisions": FakeCollection(revisions),
+    }
+
+    cache = InMemoryCache()
+    await cache.set("featured_article", articles[4])
+    data = await build_homepage_data(db, cache)
+
+    assert [change["title"] for change in data["recent_changes"]] == [f"Article {i}" for i in range(4, -1, -1)]
+    assert data["recent_changes"][0]["user"] == "user4"
+    assert len(db["users"].queries) == 1
+    assert sum(1 for query, _ in db["articles"].queries if "_id" in query) == 1
+
+def test_loaders_project_only_displayed_fields():
+    loaders = Loaders({"users": FakeCollection(), "articles": FakeCollection()})
+    assert loaders.users.projection == {"username": 1}
+    assert loaders.articles.projection == {"title": 1, "slug": 1}
@@ -0,0 +1,75 @@
+# File: test/test_memory_cache.py
+"""
+Tests for the bounded in-memory cache.
+"""
+import pytest
+
+from services.cache import memory
+from services.cache.memory import InMemoryCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(memory.time, "monotonic", fake)
+    return fake
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted():
+    cache = InMemoryCache(max_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    assert await cache.get("a") == 1
+
+    await cache.set("c", 3)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert cache.get_stats()["evictions"] == 1
+
+@pytest.mark.asyncio
+async def test_size_limit_evicts_and_rejects_oversized_values():
+    cache = InMemoryCache(max_bytes=100)
+    await cache.set("a", "x" * 40)
+    await cache.set("b", "y" * 40)
+    await cache.set("c", "z" * 40)
+
+    assert not await cache.exists("a")
+    assert await cache.get("c") == "z" * 40
+    assert cache.get_stats()["bytes"] <= 100
+
+    assert not await cache.set("huge", "x" * 200)
+    assert await cache.get("huge") is None
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_swept_on_write(clock):
+    cache = InMemoryCache()
+    for i in range(10):
+        await cache.set(f"page:{i}", {"i": i}, expiration=60)
+    await cache.set("kept", "value", expiration=600)
+
+    clock.now += 120
+    await cache.set("other", "value")
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["expirations"] == 10
+    assert await cache.get("kept") == "value"
+
+@pytest.mark.asyncio
+async def test_overwritten_expiry_is_not_swept_early(clock):
+    cache = InMemoryCache()
+    await cache.set("key", "old", expiration=10)
+    await cache.set("key", "new", expiration=100)
+
+    clock.now += 50
+    assert await cache.cleanup_expired() == 0
+    assert await cache.get("key") == "new"
+
+    clock.now += 100
+    assert await cache.get("key") is None
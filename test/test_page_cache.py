@@ -0,0 +1,108 @@
+# File: test/test_page_cache.py
+"""
+Tests for the full-page HTML cache middleware.
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse
+
+from services.cache import InMemoryCache, PageCacheMiddleware, article_tag, cache_page, register_hit_handler
+
+def make_app(cache):
+    app = FastAPI()
+    app.state.renders = 0
+    app.add_middleware(PageCacheMiddleware, cache=cache, version="1")
+
+    @app.get("/articles/{slug}", response_class=HTMLResponse)
+    async def article(request: Request, slug: str, mode: str = "wiki"):
+        app.state.renders += 1
+        cache_page(request, 3600, tags=[article_tag(slug)], on_hit=("test_view", slug))
+        return f"<h1>{slug} {mode} #{app.state.renders}</h1>"
+
+    @app.get("/uncached", response_class=HTMLResponse)
+    async def uncached():
+        app.state.renders += 1
+        return "<p>fresh</p>"
+
+    @app.get("/broken", response_class=HTMLResponse)
+    async def broken(request: Request):
+        cache_page(request, 3600)
+        return HTMLResponse("<p>error</p>", status_code=500)
+
+    @app.get("/api/data")
+    async def data(request: Request):
+        cache_page(request, 3600)
+        return JSONResponse({"n": 1})
+
+    return app
+
+def client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+@pytest.mark.asyncio
+async def test_anonymous_hits_skip_the_router():
+    cache = InMemoryCache()
+    app = make_app(cache)
+    async with client(app) as http:
+        first = await http.get("/articles/bitcoin?mode=wiki&x=1")
+        second = await http.get("/articles/bitcoin?x=1&mode=wiki")
+
+    assert first.headers["x-page-cache"] == "MISS"
+    assert second.headers["x-page-cache"] == "HIT"
+    assert second.text == first.text == "<h1>bitcoin wiki #1</h1>"
+    assert second.headers["content-type"].startswith("text/html")
+    assert app.state.renders == 1
+
+@pytest.mark.asyncio
+async def test_logged_in_readers_are_not_served_cached_pages():
+    app = make_app(InMemoryCache())
+    async with client(app) as http:
+        await http.get("/articles/bitcoin")
+        with_cookie = await http.get("/articles/bitcoin", headers={"Cookie": "token=abc"})
+        with_header = await http.get("/articles/bitcoin", headers={"Authorization": "Bearer abc"})
+
+    assert "x-page-cache" not in with_cookie.headers
+    assert "x-page-cache" not in with_header.headers
+    assert app.state.renders == 3
+
+@pytest.mark.asyncio
+async def test_only_opted_in_successful_html_is_stored():
+    cache = InMemoryCache()
+    app = make_app(cache)
+    async with client(app) as http:
+        for path in ["/uncached", "/broken", "/api/data"]:
+            await http.get(path)
+            assert (await http.get(path)).headers["x-page-cache"] == "MISS"
+    assert cache.get_stats()["entries"] == 0
+
+@pytest.mark.asyncio
+async def test_invalidating_the_article_tag_drops_the_page():
+    cache = InMemoryCache()
+    app = make_app(cache)
+    async with client(app) as http:
+        await http.get("/articles/bitcoin")
+        await http.get("/articles/ethereum")
+        await cache.invalidate_tag(article_tag("bitcoin"))
+
+        assert (await http.get("/articles/bitcoin")).headers["x-page-cache"] == "MISS"
+        assert (await http.get("/articles/ethereum")).headers["x-page-cache"] == "HIT"
+
+@pytest.mark.asyncio
+async def test_hit_handlers_run_for_cached_pages():
+    views = []
+
+    async def count_view(slug):
+        views.append(slug)
+
+    register_hit_handler("test_view", count_view)
+    app = make_app(InMemoryCache())
+    async with client(app) as http:
+        await http.get("/articles/bitcoin")
+        await http.get("/articles/bitcoin")
+        await http.get("/articles/bitcoin")
+    await asyncio.sleep(0)
+
+    assert views == ["bitcoin", "bitcoin"]
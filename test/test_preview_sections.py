@@ -0,0 +1,104 @@
+# File: test/test_preview_sections.py
+"""
+Tests for section-level incremental preview rendering.
+"""
+import pytest
+import pytest_asyncio
+
+from routes.preview import preview_wiki_markup, preview_section_patch
+from services.cache import InMemoryCache
+from services.render import render_cache
+from services.templates import template_registry
+
+DOCUMENT = (
+    "Lead paragraph.<ref>First</ref>\n\n"
+    "== History ==\nHistory text.\n\n"
+    "== Usage ==\nUsage text.<ref>Second</ref>\n\n"
+    "== References ==\n<references />"
+)
+
+@pytest_asyncio.fixture
+async def cache():
+    cache = InMemoryCache()
+    await cache.clear()
+    yield cache
+    await cache.clear()
+
+@pytest.mark.asyncio
+async def test_full_section_preview(cache):
+    response = await preview_wiki_markup({"content": DOCUMENT, "sections": True}, {}, cache, None)
+
+    assert len(response["sections"]) == 4
+    assert response["html"] == "\n".join(response["sections"])
+    assert response["base_hash"]
+
+@pytest.mark.asyncio
+async def test_patch_returns_only_changed_sections(cache):
+    base = await preview_wiki_markup({"content": DOCUMENT, "sections": True}, {}, cache, None)
+
+    patch = await preview_section_patch({
+        "base_hash": base["base_hash"],
+        "section": 1,
+        "section_content": "== History ==\nRewritten history.\n"
+    }, cache)
+
+    assert patch["replace"] == {"start": 1, "old_count": 1, "new_count": 1}
+    assert [fragment["index"] for fragment in patch["fragments"]] == [1]
+    assert "Rewritten history." in patch["fragments"][0]["html"]
+
+@pytest.mark.asyncio
+async def test_patch_renumbers_references(cache):
+    base = await preview_wiki_markup({"content": DOCUMENT, "sections": True}, {}, cache, None)
+
+    patch = await preview_section_patch({
+        "base_hash": base["base_hash"],
+        "section": 1,
+        "section_content": "== History ==\nCited.<ref>New</ref>\n\n== Origins ==\nMore.\n"
+    }, cache)
+
+    assert patch["section_count"] == 5
+    assert patch["replace"] == {"start": 1, "old_count": 1, "new_count": 2}
+    changed = {fragment["index"]: fragment["html"] for fragment in patch["fragments"]}
+    assert set(changed) == {1, 2, 3, 4}
+    assert "[3]" in changed[3]
+    assert '<li id="ref-2">New</li>' in changed[4]
+
+class EmptyCursor:
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+class CountingArticles:
+    def __init__(self):
+        self.queries = 0
+
+    def find(self, *args, **kwargs):
+        self.queries += 1
+        return EmptyCursor()
+
+@pytest.mark.asyncio
+async def test_repeated_preview_skips_the_database(cache, monkeypatch):
+    monkeypatch.setattr(template_registry, "ttl", 3600)
+    articles = CountingArticles()
+    content = "{{Preview cache probe}} links to [[Preview cache probe page]]."
+
+    first = await preview_wiki_markup({"content": content}, {}, cache, {"articles": articles})
+    queries = articles.queries
+    assert queries > 0
+
+    render_cache.clear()
+    second = await preview_wiki_markup({"content": content}, {}, cache, {"articles": articles})
+
+    # Served from the configured cache backend without looking up templates or red links
+    assert second == first
+    assert articles.queries == queries
+
+@pytest.mark.asyncio
+async def test_patch_with_unknown_base_hash(cache):
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as error:
+        await preview_section_patch({"base_hash": "missing", "section": 0, "section_content": ""}, cache)
+    assert error.value.status_code == 409
@@ -0,0 +1,214 @@
+# File: test/test_render_executor.py
+"""
+Tests for the wiki markup render executor.
+"""
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from services.cache import InMemoryCache
+from services.render import (
+    RenderExecutor, RenderCache, RenderTimeoutError, needs_rerender, rerender_article, _pool_processes
+)
+from utils.wiki_parser import parse_wiki_markup, PARSER_VERSION
+
+MARKUP = "== Heading ==\n\nSome '''bold''' text with a [[Link]].\n"
+
+def spin(markup):
+    while True:
+        pass
+
+def spin_ignoring_deadline(markup):
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(60)
+
+@pytest.mark.asyncio
+async def test_small_markup_renders_inline():
+    executor = RenderExecutor(max_workers=1, inline_threshold=len(MARKUP) + 1)
+
+    assert await executor.render(MARKUP) == parse_wiki_markup(MARKUP)
+    assert executor.get_stats()["inline_renders"] == 1
+    assert executor._executor is None
+
+@pytest.mark.asyncio
+async def test_large_markup_renders_in_pool():
+    executor = RenderExecutor(max_workers=1, inline_threshold=10, timeout=60)
+    try:
+        assert await executor.render(MARKUP) == parse_wiki_markup(MARKUP)
+        stats = executor.get_stats()
+        assert stats["pooled_renders"] == 1
+        assert stats["max_queue_depth"] == 1
+        assert stats["queue_depth"] == 0
+    finally:
+        executor.close()
+
+@pytest.mark.asyncio
+async def test_render_timeout():
+    executor = RenderExecutor(max_workers=1, inline_threshold=10, timeout=0.001)
+    try:
+        with pytest.raises(RenderTimeoutError):
+            await executor.render(MARKUP * 1000)
+        assert executor.get_stats()["timeouts"] == 1
+        assert executor.get_stats()["pending"] == 0
+    finally:
+        executor.close()
+
+@pytest.mark.asyncio
+async def test_timed_out_render_stops_in_the_worker():
+    executor = RenderExecutor(max_workers=1, inline_threshold=10, timeout=2)
+    try:
+        # Warm up the pool so process start-up does not count against the deadline
+        await executor.render(MARKUP)
+        with pytest.raises(RenderTimeoutError):
+            await executor.render(MARKUP, renderer=spin)
+
+        # The single worker is free again; no restart was needed
+        assert await executor.render(MARKUP) == parse_wiki_markup(MARKUP)
+        stats = executor.get_stats()
+        assert stats["timeouts"] == 1 and stats["pool_restarts"] == 0
+    finally:
+        executor.close()
+
+@pytest.mark.asyncio
+async def test_worker_ignoring_its_deadline_is_killed():
+    executor = RenderExecutor(max_workers=1, inline_threshold=10, timeout=2, kill_grace=0.5)
+    try:
+        await executor.render(MARKUP)
+        started = time.monotonic()
+        with pytest.raises(RenderTimeoutError):
+            await executor.render(MARKUP, renderer=spin_ignoring_deadline)
+        assert time.monotonic() - started < 10
+
+        assert await executor.render(MARKUP) == parse_wiki_markup(MARKUP)
+        stats = executor.get_stats()
+        assert stats["timeouts"] == 1 and stats["pool_restarts"] == 1 and stats["running"] == 0
+    finally:
+        executor.close()
+
+def test_pool_workers_are_found():
+    # _kill_pool relies on ProcessPoolExecutor's private _processes attribute
+    pool = ProcessPoolExecutor(max_workers=1)
+    try:
+        assert pool.submit(abs, -1).result(timeout=30) == 1
+        processes = _pool_processes(pool)
+        assert len(processes) == 1 and processes[0].is_alive()
+    finally:
+        pool.shutdown()
+
+def test_pool_is_dropped_when_workers_cannot_be_found():
+    class OpaquePool:
+        def __init__(self):
+            self.shut_down = False
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut_down = True
+
+    pool = OpaquePool()
+    executor = RenderExecutor(max_workers=1)
+    executor._executor = pool
+
+    executor._kill_pool(pool)
+
+    assert pool.shut_down and executor._executor is None
+    assert executor.get_stats()["pool_restarts"] == 1
+
+@pytest.mark.asyncio
+async def test_render_cache_serves_repeated_markup():
+    cache = RenderCache(RenderExecutor(max_workers=0))
+
+    first = await cache.render(MARKUP)
+    second = await cache.render(MARKUP)
+
+    assert first == second == parse_wiki_markup(MARKUP)
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+@pytest.mark.asyncio
+async def test_render_cache_evicts_least_recently_used():
+    cache = RenderCache(RenderExecutor(max_workers=0), max_entries=2)
+
+    await cache.render("one")
+    await cache.render("two")
+    await cache.render("one")
+    await cache.render("three")
+
+    assert cache.get_stats()["evictions"] == 1
+    assert RenderCache.make_key("one") in cache._entries
+    assert RenderCache.make_key("two") not in cache._entries
+
+@pytest.mark.asyncio
+async def test_render_cache_uses_shared_backend():
+    shared = InMemoryCache()
+    await shared.clear()
+    await RenderCache(RenderExecutor(max_workers=0)).render(MARKUP, shared_cache=shared)
+
+    other_worker = RenderCache(RenderExecutor(max_workers=0))
+    assert await other_worker.render(MARKUP, shared_cache=shared) == parse_wiki_markup(MARKUP)
+    assert other_worker.get_stats()["shared_hits"] == 1
+    await shared.clear()
+
+@pytest.mark.asyncio
+async def test_render_resolved_looks_up_templates_only_on_a_miss():
+    cache = RenderCache(RenderExecutor(max_workers=0))
+    resolved = []
+
+    async def resolve():
+        resolved.append(1)
+        return {}, frozenset(["Link"])
+
+    first = await cache.render_resolved(MARKUP, resolve, "t0.p0")
+    second = await cache.render_resolved(MARKUP, resolve, "t0.p0")
+    assert first == second and 'class="wiki-redlink"' in first[0]
+    assert len(resolved) == 1
+
+    # A new page or template version resolves again
+    await cache.render_resolved(MARKUP, resolve, "t0.p1")
+    assert len(resolved) == 2
+
+class FakeUpdateResult:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+class FakeArticles:
+    def __init__(self, pages=()):
+        self.pages = list(pages)
+        self.updates = []
+
+    def find(self, query, projection=None, collation=None):
+        return FakeCursor(self.pages)
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+        return FakeUpdateResult(1)
+
+def test_needs_rerender():
+    assert not needs_rerender({"content": "<p>Legacy</p>"})
+    assert needs_rerender({"content": "<p>Old</p>", "source": "Old", "parserVersion": 1})
+    assert not needs_rerender({"content": "<p>New</p>", "source": "New", "parserVersion": PARSER_VERSION})
+
+@pytest.mark.asyncio
+async def test_rerender_article_is_conditional():
+    articles = FakeArticles([{"title": "Link"}])
+    article = {"_id": "abc", "source": MARKUP, "parserVersion": 1, "content": "<p>stale</p>"}
+
+    assert await rerender_article({"articles": articles}, article)
+
+    query, update = articles.updates[0]
+    assert query == {"_id": "abc", "source": MARKUP, "parserVersion": 1}
+    assert update["$set"]["content"] == parse_wiki_markup(MARKUP)[0]
+    assert update["$set"]["parserVersion"] == PARSER_VERSION
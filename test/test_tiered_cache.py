@@ -0,0 +1,122 @@
+# File: test/test_tiered_cache.py
+"""
+Tests for the two-tier (L1 + Redis) cache.
+"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from fake_redis import FakeRedisServer
+from services.cache import TieredCache
+from services.cache.codec import FrozenDict, FrozenList
+
+async def settle():
+    # Let published messages reach the subscriber tasks
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest_asyncio.fixture
+async def workers():
+    server = FakeRedisServer()
+    caches = [TieredCache(server.cache()) for _ in range(2)]
+    for cache in caches:
+        await cache.start()
+    await settle()
+    yield caches
+    for cache in caches:
+        await cache.close()
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_l1(workers):
+    first, second = workers
+    await first.set("article:bitcoin", {"title": "Bitcoin"}, 3600)
+
+    assert await second.get("article:bitcoin") == {"title": "Bitcoin"}
+    assert await second.get("article:bitcoin") == {"title": "Bitcoin"}
+    assert second.get_stats()["l2_hits"] == 1
+    assert second.get_stats()["l1_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_both_tiers_return_read_only_values(workers):
+    first, second = workers
+    await first.set("article:bitcoin", {"title": "Bitcoin", "tags": ["coin"]}, 3600)
+
+    from_l2 = await second.get("article:bitcoin")
+    from_l1 = await second.get("article:bitcoin")
+    from_redis = await second.remote.get("article:bitcoin")
+
+    for value in (from_l2, from_l1, from_redis):
+        assert isinstance(value, FrozenDict) and isinstance(value["tags"], FrozenList)
+        with pytest.raises(TypeError):
+            value["title"] = "Changed"
+
+@pytest.mark.asyncio
+async def test_delete_evicts_every_worker(workers):
+    first, second = workers
+    await first.set("article:bitcoin", {"title": "Bitcoin"}, 3600)
+    await second.get("article:bitcoin")
+    assert await second.local.exists("article:bitcoin")
+
+    await first.delete("article:bitcoin")
+    await settle()
+
+    assert not await second.local.exists("article:bitcoin")
+    assert await second.get("article:bitcoin") is None
+
+@pytest.mark.asyncio
+async def test_set_replaces_other_workers_copies(workers):
+    first, second = workers
+    await first.set("homepage_data", {"version": 1})
+    await second.get("homepage_data")
+
+    await first.set("homepage_data", {"version": 2})
+    await settle()
+
+    assert await second.get("homepage_data") == {"version": 2}
+
+@pytest.mark.asyncio
+async def test_clear_empties_every_l1(workers):
+    first, second = workers
+    await first.set("a", 1)
+    await second.get("a")
+
+    await first.clear()
+    await settle()
+
+    assert second.local.get_stats()["entries"] == 0
+
+@pytest.mark.asyncio
+async def test_reads_racing_an_invalidation_do_not_fill_l1(workers):
+    first, second = workers
+    await first.set("key", "old")
+
+    original_get = second.remote.get
+
+    async def get_then_invalidate(key):
+        value = await original_get(key)
+        # Another worker writes while this read is in flight
+        await first.set(key, "new")
+        await settle()
+        return value
+
+    second.remote.get = get_then_invalidate
+    assert await second.get("key") == "old"
+    second.remote.get = original_get
+
+    assert not await second.local.exists("key")
+    assert await second.get("key") == "new"
+
+@pytest.mark.asyncio
+async def test_prefix_clear_evicts_every_worker(workers):
+    first, second = workers
+    await first.set("article:bitcoin", {"title": "Bitcoin"}, 3600)
+    await first.set("statistics_page", {"n": 1}, 300)
+    await settle()
+    await second.get_many(["article:bitcoin", "statistics_page"])
+
+    await first.clear_prefix(["article:"])
+    await settle()
+
+    assert not await second.local.exists("article:bitcoin")
+    assert await second.local.exists("statistics_page")
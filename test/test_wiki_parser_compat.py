@@ -0,0 +1,89 @@
+# File: test/test_wiki_parser_compat.py
+"""
+Compatibility tests for the single-pass wiki parser.
+
+Every document in test/fixtures/wiki_corpus (built from db_exports by
+scripts/build_wiki_corpus.py, plus hand-written constructs.wiki) must render
+identically with the current parser and the legacy multi-pass parser, except
+where the legacy parser is known to corrupt its own output.
+"""
+import os
+import glob
+
+import pytest
+
+from utils.wiki_parser import (
+    parse_wiki_markup,
+    tokenize_wiki_markup,
+    iter_internal_links,
+    extract_short_description,
+    split_sections,
+    prerender_section,
+    finish_sections
+)
+from utils.wiki_parser_legacy import parse_wiki_markup_legacy
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "wiki_corpus")
+CORPUS_FILES = sorted(glob.glob(os.path.join(CORPUS_DIR, "*.wiki")))
+
+# Documents where the legacy parser pairs stray '=' characters (here, in URL
+# query strings) into <h1> elements. Headings are now matched per line only.
+KNOWN_DIVERGENCES = {
+    "20250521_213047_articles_004_voiced-palatal-approximant.wiki",
+}
+
+def read_corpus_file(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def heading_line_count(markup: str) -> int:
+    return sum(1 for line in markup.split("\n") if line.startswith("= ") and line.rstrip().endswith(" ="))
+
+@pytest.mark.parametrize("path", CORPUS_FILES, ids=os.path.basename)
+def test_corpus_matches_legacy_parser(path):
+    markup = read_corpus_file(path)
+    html, short_description = parse_wiki_markup(markup)
+    legacy_html, legacy_short_description = parse_wiki_markup_legacy(markup)
+
+    assert short_description == legacy_short_description
+    if os.path.basename(path) in KNOWN_DIVERGENCES:
+        assert html.count('<h1 class="wiki-heading-1">') == heading_line_count(markup)
+        assert html.count('<h1 class="wiki-heading-1">') < legacy_html.count('<h1 class="wiki-heading-1">')
+    else:
+        assert html == legacy_html
+
+def test_corpus_is_present():
+    assert "constructs.wiki" in [os.path.basename(path) for path in CORPUS_FILES]
+    assert len(CORPUS_FILES) > 1
+
+def test_attribute_values_are_not_headings():
+    html, _ = parse_wiki_markup('{{Quote|text=Knowledge is power|author=Francis Bacon}}')
+    assert html == (
+        '<blockquote class="wiki-quote"><p>Knowledge is power</p>'
+        '<footer><cite>Francis Bacon</cite></footer></blockquote>'
+    )
+
+def test_iter_internal_links():
+    blocks = tokenize_wiki_markup("See [[Alpha]] and [[Help:Beta|beta]].\n* [[Gamma]]\n== [[Delta]] ==")
+    assert list(iter_internal_links(blocks)) == ["Alpha", "Help:Beta", "Gamma", "Delta"]
+
+@pytest.mark.parametrize("path", CORPUS_FILES, ids=os.path.basename)
+def test_sections_join_to_full_render(path):
+    markup = read_corpus_file(path)
+    body, _ = extract_short_description(markup)
+    sections = split_sections(body)
+
+    assert "\n".join(sections) == body
+    if body.startswith("\n"):
+        # A lead section without a trailing blank line is its own paragraph
+        return
+    fragments = finish_sections([prerender_section(section) for section in sections])
+    assert "\n".join(fragments) == parse_wiki_markup(markup)[0]
+
+def test_references_are_numbered_across_sections():
+    sections = split_sections("Lead.<ref>One</ref>\n\n== A ==\nText.<ref>Two</ref>\n\n== Notes ==\n<references />")
+    fragments = finish_sections([prerender_section(section) for section in sections])
+
+    assert len(fragments) == 3
+    assert '[2]' in fragments[1]
+    assert '<li id="ref-1">One</li><li id="ref-2">Two</li>' in fragments[2]
@@ -0,0 +1,96 @@
+# File: test/test_wiki_parser_limits.py
+"""
+Worst-case cost tests for the wiki markup parser.
+
+Adversarial inputs from test/bench_wiki_parser.py must render in time
+linear in their size, and the scanners that replaced lazy regexes are
+fuzzed against the regexes they replaced.
+"""
+import random
+import re
+
+import pytest
+
+from bench_wiki_parser import ADVERSARIAL_CASES, measure_case
+from utils.wiki_parser import (
+    parse_wiki_markup,
+    compile_template,
+    transclude_templates,
+    extract_short_description,
+    finish_sections,
+    prerender_section,
+    split_sections,
+    MAX_EXPANDED_SIZE,
+    _number_references,
+    _table_header_cells
+)
+
+# Time per KB may grow this much while the input grows 8x; quadratic
+# behaviour shows up as roughly 8x
+MAX_GROWTH = 3.0
+
+FUZZ_FRAGMENTS = [
+    "a", " ", "\n", "|", "!", "}}", "{{", "[[", "]]", "]", "[http://x", "<ref>", "</ref>",
+    '<ref name="n">', "<references />", "{{Short description|", "{|", "|}", "|-", "''", "'''", "== h =="
+]
+
+def fuzz_inputs(count: int = 300, seed: int = 1234):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(FUZZ_FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+@pytest.mark.parametrize("name", sorted(ADVERSARIAL_CASES))
+def test_adversarial_inputs_render_in_linear_time(name):
+    build = ADVERSARIAL_CASES[name]
+    small, large = measure_case(build, [2000, 16000])
+
+    # Noise on very fast cases is not meaningful
+    if large < 0.05:
+        return
+    assert large / small < MAX_GROWTH, f"{name}: {small:.3f} -> {large:.3f} ms/KB"
+
+def test_reference_scanner_matches_regex():
+    reference_re = re.compile(r'<ref(?:\s+name="[^"]+")?>(.*?)</ref>', re.DOTALL)
+
+    for markup in fuzz_inputs():
+        expected_refs = []
+
+        def replace(match):
+            expected_refs.append(f'<li id="ref-{len(expected_refs) + 1}">{match.group(1)}</li>')
+            return f'<sup class="wiki-reference">[{len(expected_refs)}]</sup>'
+
+        expected = reference_re.sub(replace, markup)
+        references = []
+        assert _number_references(markup, references) == expected, markup
+        assert references == expected_refs
+
+def test_table_header_scanner_matches_regex():
+    for row in fuzz_inputs():
+        assert _table_header_cells(row) == re.findall(r'!(.*?)(?=\||$)', row), row
+
+def test_short_description_scanner_matches_regex():
+    short_description_re = re.compile(r'\{\{Short description\|(.*?)\}\}')
+
+    for markup in fuzz_inputs():
+        match = short_description_re.search(markup)
+        expected = (markup.replace(match.group(0), ''), match.group(1).strip()) if match else (markup, None)
+        assert extract_short_description(markup) == expected, markup
+
+def test_fuzzed_markup_renders_whole_and_by_section():
+    for markup in fuzz_inputs():
+        html, _ = parse_wiki_markup(markup)
+        assert isinstance(html, str)
+        finish_sections([prerender_section(section) for section in split_sections(markup)])
+
+def test_reference_list_is_rendered_once():
+    html, _ = parse_wiki_markup("A<ref>one</ref>\n\n<references />\n\n{{reflist}}")
+    assert html.count('<li id="ref-1">') == 1
+    assert "<references />" not in html
+
+def test_transclusion_is_capped():
+    # Each level calls the next 64 times: 64**4 copies (1 GB) without the cap
+    templates = {f"T{i}": compile_template(f"{{{{T{i + 1}}}}}" * 64) for i in range(4)}
+    templates["T4"] = compile_template("x" * 64)
+
+    markup = transclude_templates("{{T0}}", templates)
+    assert len(markup) <= MAX_EXPANDED_SIZE
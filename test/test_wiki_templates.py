@@ -0,0 +1,169 @@
+# File: test/test_wiki_templates.py
+"""
+Tests for Template: page transclusion.
+"""
+import pytest
+from bson import ObjectId
+from fastapi import BackgroundTasks, HTTPException
+
+from routes import proposals as proposal_routes
+from services import templates as templates_service
+from services.cache import InMemoryCache, article_tag
+from services.render import RenderTimeoutError
+from services.templates import TemplateRegistry, rerender_matching_articles
+from utils.wiki_parser import (
+    parse_wiki_markup,
+    compile_template,
+    transclude_templates,
+    find_template_names,
+    normalize_template_name
+)
+
+TEMPLATES = {
+    "Greeting": compile_template("Hello, {{{name|world}}}!<noinclude> Usage notes.</noinclude> {{Signature|by={{{1}}}}}"),
+    "Signature": compile_template("''{{{by|anonymous}}}''"),
+    "Loop": compile_template("x{{Loop}}"),
+}
+
+def test_normalize_template_name():
+    assert normalize_template_name(" template:infobox_person ") == "Infobox person"
+
+def test_parameters_defaults_and_nesting():
+    used = set()
+    markup = transclude_templates("{{greeting|name=Ann|Bob}} / {{Greeting|Cy}} / {{Signature}}", TEMPLATES, used)
+
+    assert markup == "Hello, Ann! ''Bob'' / Hello, world! ''Cy'' / ''anonymous''"
+    assert used == {"Greeting", "Signature"}
+
+def test_recursion_is_bounded():
+    markup = transclude_templates("{{Loop}}", TEMPLATES)
+    assert markup.startswith("xxxx")
+    assert markup.endswith("{{Loop}}")
+
+def test_builtin_templates_are_not_overridden():
+    templates = {"Quote": compile_template("overridden")}
+    html, _ = parse_wiki_markup("{{Quote|text=Kept}}", templates)
+    assert "wiki-quote" in html
+
+def test_unknown_templates_render_generically():
+    html, _ = parse_wiki_markup("{{Missing|a=b}}", TEMPLATES)
+    assert '<div class="wiki-template"><strong>Missing</strong>' in html
+
+def test_find_template_names_skips_builtins():
+    assert find_template_names("{{Infobox|title=x}} {{greeting}} {{Short description|y}}") == {"Greeting"}
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+class FakeArticles:
+    def __init__(self, pages):
+        self.pages = pages
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        names = set(query["title"]["$in"])
+        return FakeCursor([page for page in self.pages if page["title"] in names])
+
+@pytest.mark.asyncio
+async def test_registry_resolves_nested_templates_and_caches():
+    articles = FakeArticles([
+        {"title": "Greeting", "source": "Hi {{Signature}}"},
+        {"title": "Signature", "source": "--{{{1|me}}}"},
+    ])
+    db = {"articles": articles}
+    registry = TemplateRegistry()
+
+    templates = await registry.resolve(db, "{{Greeting}} {{Unknown}}")
+    assert set(templates) == {"Greeting", "Signature"}
+    assert len(articles.queries) == 2
+
+    await registry.resolve(db, "{{Greeting}} {{Unknown}}")
+    assert len(articles.queries) == 2
+
+    registry.invalidate("Greeting")
+    await registry.resolve(db, "{{Greeting}}")
+    assert len(articles.queries) == 3
+
+class FakeBulkResult:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+class FakeRerenderArticles:
+    def __init__(self, pages, fail_on_batch=None):
+        self.pages = pages
+        self.fail_on_batch = fail_on_batch
+        self.batches = []
+
+    def find(self, query, projection=None):
+        return FakeCursor(self.pages)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append(operations)
+        if len(self.batches) == self.fail_on_batch:
+            raise RuntimeError("write failed")
+        return FakeBulkResult(len(operations))
+
+@pytest.mark.asyncio
+async def test_rerender_invalidates_each_written_batch(monkeypatch):
+    async def render(db, markup):
+        if markup == "broken":
+            raise ValueError("bad markup")
+        return f"<p>{markup}</p>", None, []
+
+    async def update_links(db, article_id, markup):
+        return 0, 0
+
+    monkeypatch.setattr(templates_service, "render_with_templates", render)
+    monkeypatch.setattr(templates_service, "update_article_links", update_links)
+
+    pages = [{"_id": f"a{i}", "source": "broken" if i == 1 else f"page {i}"} for i in range(6)]
+    articles = FakeRerenderArticles(pages, fail_on_batch=3)
+    cache = InMemoryCache()
+    for page in pages:
+        await cache.set(f"article:{page['_id']}", page, tags=[article_tag(page["_id"])])
+
+    updated = await rerender_matching_articles({"articles": articles}, {}, cache=cache, batch_size=2)
+
+    # The broken page is skipped; the third batch fails after two were written
+    assert updated == 4
+    assert [[op._filter["_id"] for op in batch] for batch in articles.batches] == [["a0", "a2"], ["a3", "a4"], ["a5"]]
+    for written in ["a0", "a2", "a3", "a4"]:
+        assert await cache.get(f"article:{written}") is None
+    assert await cache.get("article:a5") is not None
+
+class FakeProposals:
+    def __init__(self, proposal):
+        self.proposal = proposal
+        self.updates = []
+
+    async def find_one(self, query):
+        return self.proposal
+
+    async def update_one(self, query, update):
+        self.updates.append(update)
+
+@pytest.mark.asyncio
+async def test_approval_render_timeout_leaves_the_proposal_pending(monkeypatch):
+    async def render(db, markup):
+        raise RenderTimeoutError("Render did not finish within 1s")
+
+    monkeypatch.setattr(proposal_routes, "render_with_templates", render)
+    article_id, proposal_id = ObjectId(), ObjectId()
+    proposals = FakeProposals({"_id": proposal_id, "articleId": article_id, "status": "pending", "content": "x"})
+
+    with pytest.raises(HTTPException) as error:
+        await proposal_routes.review_proposal(
+            str(article_id), str(proposal_id), BackgroundTasks(), status="approved",
+            current_user={"_id": ObjectId()}, db={"proposals": proposals}, search=None, cache=InMemoryCache()
+        )
+    assert error.value.status_code == 503
+    assert proposals.updates == []
@@ -1,191 +1,798 @@
 # File: utils/wiki_parser.py
 """
 Wiki markup parser for Kryptopedia with namespace support.
+
+Markup is tokenized line by line into block nodes holding inline nodes, and
+the resulting tree is rendered to HTML in one pass. Tables, references and
+paragraphs are assembled from the rendered lines, matching the output of the
+original multi-pass parser (see utils/wiki_parser_legacy.py).
+
+Rendering takes time linear in the size of the markup: scanning uses
+str.find with memoized results instead of lazy regexes that rescan the rest
+of the input after every unclosed construct, and transclusion is capped at
+MAX_EXPANDED_SIZE. test/bench_wiki_parser.py measures time per KB on
+adversarial inputs.
 """
 import re
-from typing import Tuple, Optional, Dict, Any, List
+from typing import Tuple, Optional, Dict, Any, List, AbstractSet
+
+from utils.namespace import parse_title_with_namespace
+
+# Bumped whenever rendered output changes, so cached or stored HTML can be
+# recognised as stale.
+PARSER_VERSION = 4
+
+# Inline node kinds. Literal text is stored as plain strings.
+LINK = "link"
+EXTERNAL_LINK = "external_link"
+TEMPLATE = "template"
+
+# Block node kinds, one block per source line.
+HEADING = "heading"
+LIST_ITEM = "list_item"
+LINE = "line"
+
+_SHORT_DESCRIPTION_OPEN = '{{Short description|'
+_INLINE_TOKEN_RE = re.compile(r'\[\[|\[(?=https?://)|\{\{')
+_URL_END_RE = re.compile(r'[\s\]]')
+_TEMPLATE_NAME_RE = re.compile(r'[^|{}]+')
+_REFERENCE_OPEN_RE = re.compile(r'<ref(?:\s+name="[^"]+")?>')
+_TRANSCLUSION_RE = re.compile(r'\{\{([^|{}\n]+)(?:\|([^{}]*?))?\}\}')
+_TEMPLATE_PARAM_RE = re.compile(r'\{\{\{([^{}|]+)(?:\|([^{}]*))?\}\}\}')
+_NOINCLUDE_RE = re.compile(r'<noinclude>.*?</noinclude>', re.DOTALL)
 
-def parse_wiki_markup(markup: str) -> Tuple[str, Optional[str]]:
+# Templates rendered by render_template; Template: pages cannot override them
+BUILTIN_TEMPLATES = {'infobox', 'quote', 'cite', 'reflist', 'short description'}
+
+# Nested transclusion deeper than this is left unexpanded
+MAX_TRANSCLUSION_DEPTH = 8
+
+# Template calls that would grow the markup beyond this many characters are
+# left unexpanded, so a few nested templates cannot expand exponentially
+MAX_EXPANDED_SIZE = 2 * 1024 * 1024
+
+def parse_wiki_markup(
+    markup: str,
+    templates: Optional[Dict[str, list]] = None,
+    missing_links: Optional[AbstractSet[str]] = None
+) -> Tuple[str, Optional[str]]:
     """
     Parse wiki markup into HTML with namespace support.
     
+    The markup is tokenized once into a list of line blocks (see
+    tokenize_wiki_markup) which are then rendered in a single pass.
+    
     Args:
         markup: The wiki markup to parse
+        templates: Optional compiled Template: pages by normalized name
+            (see compile_template), transcluded before tokenizing
+        missing_links: Optional link targets, as written, whose pages do not
+            exist; these are rendered as red links
         
     Returns:
         Tuple[str, Optional[str]]: The parsed HTML and extracted short description (if any)
     """
-    # Extract short description if present
-    short_description = None
-    short_desc_match = re.search(r'\{\{Short description\|(.*?)\}\}', markup)
-    if short_desc_match:
-        short_description = short_desc_match.group(1).strip()
-        markup = markup.replace(short_desc_match.group(0), '')
-    
-    # Handle text formatting
-    markup = re.sub(r"'''(.*?)'''", r'<strong>\1</strong>', markup)  # Bold
-    markup = re.sub(r"''(.*?)''", r'<em>\1</em>', markup)  # Italic
-    markup = re.sub(r'<u>(.*?)</u>', r'<u>\1</u>', markup)  # Underline (already HTML)
-    markup = re.sub(r'<s>(.*?)</s>', r'<s>\1</s>', markup)  # Strikethrough (already HTML)
-    markup = re.sub(r'<sup>(.*?)</sup>', r'<sup>\1</sup>', markup)  # Superscript (already HTML)
-    markup = re.sub(r'<sub>(.*?)</sub>', r'<sub>\1</sub>', markup)  # Subscript (already HTML)
-    
-    # Handle headings
-    markup = re.sub(r'======\s*(.*?)\s*======', r'<h6 class="wiki-heading-6">\1</h6>', markup)
-    markup = re.sub(r'=====\s*(.*?)\s*=====', r'<h5 class="wiki-heading-5">\1</h5>', markup)
-    markup = re.sub(r'====\s*(.*?)\s*====', r'<h4 class="wiki-heading-4">\1</h4>', markup)
-    markup = re.sub(r'===\s*(.*?)\s*===', r'<h3 class="wiki-heading-3">\1</h3>', markup)
-    markup = re.sub(r'==\s*(.*?)\s*==', r'<h2 class="wiki-heading-2">\1</h2>', markup)
-    markup = re.sub(r'=\s*(.*?)\s*=', r'<h1 class="wiki-heading-1">\1</h1>', markup)
-    
-    # Handle links with namespace support
-    # Internal links [[Page name]] or [[Namespace:Page name]]
-    def process_internal_link(match):
-        link_text = match.group(1)
+    markup, short_description = extract_short_description(markup)
+    if templates:
+        markup = transclude_templates(markup, templates)
+    return render_blocks(tokenize_wiki_markup(markup), missing_links), short_description
+
+def normalize_template_name(name: str) -> str:
+    """
+    Normalize a template name the way page titles are compared.
+    
+    Args:
+        name: Template name as written, e.g. "infobox_person" or "Template:Foo"
         
-        # Check if there's a display text
-        if "|" in link_text:
-            target, display = link_text.split("|", 1)
-        else:
-            target = link_text
-            display = link_text
+    Returns:
+        str: The name with underscores as spaces, collapsed whitespace, no
+        Template: prefix and an upper-case first letter
+    """
+    name = ' '.join(name.replace('_', ' ').split())
+    if name[:9].lower() == 'template:':
+        name = name[9:].strip()
+    return name[:1].upper() + name[1:]
+
+def compile_template(source: str) -> list:
+    """
+    Compile a Template: page into literal text and parameter slots.
+    
+    <noinclude> sections are dropped and <includeonly> tags are unwrapped.
+    Parameters are written {{{name}}} or {{{name|default}}}.
+    
+    Args:
+        source: The template page's wiki markup
         
-        # Parse namespace from target
-        from models.article import parse_title_namespace
-        namespace, title = parse_title_namespace(target)
+    Returns:
+        list: Literal strings and (name, default) tuples, default None if absent
+    """
+    source = _NOINCLUDE_RE.sub('', source)
+    source = source.replace('<includeonly>', '').replace('</includeonly>', '')
+    
+    parts: list = []
+    pos = 0
+    for match in _TEMPLATE_PARAM_RE.finditer(source):
+        if match.start() > pos:
+            parts.append(source[pos:match.start()])
+        parts.append((match.group(1).strip(), match.group(2)))
+        pos = match.end()
+    if pos < len(source):
+        parts.append(source[pos:])
+    return parts
+
+def expand_template(compiled: list, params: Dict[str, str]) -> str:
+    """
+    Substitute call parameters into a compiled template.
+    
+    Args:
+        compiled: Output of compile_template
+        params: Named and positional ("1", "2", ...) parameters
         
-        # Generate appropriate URL based on namespace
-        if namespace == "Category":
-            url = f"/categories/{title.replace(' ', '_')}"
-        elif namespace == "File":
-            url = f"/media/{title}"
-        elif namespace == "Template":
-            url = f"/templates/{title.replace(' ', '_')}"
-        elif namespace == "Help":
-            url = f"/help/{title.replace(' ', '_')}"
-        elif namespace == "User":
-            url = f"/users/{title.replace(' ', '_')}"
-        elif namespace == "Kryptopedia":
-            url = f"/project/{title.replace(' ', '_')}"
+    Returns:
+        str: The expanded markup; unset parameters without a default expand to nothing
+    """
+    output = []
+    for part in compiled:
+        if type(part) is str:
+            output.append(part)
         else:
-            # Main namespace - regular article
-            url = f"/articles/{target.replace(' ', '_')}"
+            output.append(params.get(part[0], part[1] or ''))
+    return ''.join(output)
+
+def transclude_templates(
+    markup: str,
+    templates: Dict[str, list],
+    used: Optional[set] = None
+) -> str:
+    """
+    Replace {{Name|...}} calls with the expansion of the matching Template: page.
+    
+    Expanded text is scanned again so templates can use other templates, up
+    to MAX_TRANSCLUSION_DEPTH levels; this also stops self-inclusion. Calls
+    that would grow the markup past MAX_EXPANDED_SIZE are left unexpanded.
+    Built-in templates and names without a page are left for render_template.
+    
+    Args:
+        markup: The wiki markup
+        templates: Compiled templates by normalized name
+        used: Optional set that receives the names of transcluded templates
         
-        return f'<a href="{url}">{display}</a>'
+    Returns:
+        str: The markup with templates expanded
+    """
+    budget = MAX_EXPANDED_SIZE - len(markup)
     
-    markup = re.sub(r'\[\[([^\]]+)\]\]', process_internal_link, markup)
+    def replace(match):
+        nonlocal budget
+        name = normalize_template_name(match.group(1))
+        compiled = templates.get(name)
+        if compiled is None or name.lower() in BUILTIN_TEMPLATES:
+            return match.group(0)
+        if used is not None:
+            used.add(name)
+        if budget <= 0:
+            return match.group(0)
+        
+        # Unlike render_template, positional parameters are numbered on their own
+        params = {}
+        position = 0
+        for pair in (match.group(2) or '').split('|') if match.group(2) else []:
+            if '=' in pair:
+                key, value = pair.split('=', 1)
+                params[key.strip()] = value.strip()
+            else:
+                position += 1
+                params[str(position)] = pair.strip()
+        
+        expansion = expand_template(compiled, params)
+        growth = len(expansion) - len(match.group(0))
+        if growth > budget:
+            budget = 0
+            return match.group(0)
+        budget -= growth
+        return expansion
     
-    # External links [http://example.com Display text]
-    markup = re.sub(r'\[(https?://[^\s\]]+)\s+(.*?)\]', r'<a href="\1" target="_blank" rel="noopener">\2</a>', markup)
-    # External links without display text [http://example.com]
-    markup = re.sub(r'\[(https?://[^\s\]]+)\]', r'<a href="\1" target="_blank" rel="noopener">\1</a>', markup)
+    for _ in range(MAX_TRANSCLUSION_DEPTH):
+        if '{{' not in markup:
+            break
+        expanded = _TRANSCLUSION_RE.sub(replace, markup)
+        if expanded == markup:
+            break
+        markup = expanded
+    return markup
+
+def find_template_names(markup: str) -> set:
+    """
+    Find the normalized names of all non-built-in templates called in markup.
     
-    # Handle lists
-    lines = markup.split('\n')
-    in_list = False
-    list_type = None
-    list_level = 0
-    result_lines = []
-    
-    for line in lines:
-        # Unordered list
-        if line.startswith('* '):
-            if not in_list or list_type != 'ul':
-                if in_list:
-                    result_lines.append(f'</{list_type}>')
-                result_lines.append('<ul>')
-                in_list = True
-                list_type = 'ul'
-            result_lines.append(f'<li>{line[2:]}</li>')
-        # Ordered list
-        elif line.startswith('# '):
-            if not in_list or list_type != 'ol':
-                if in_list:
-                    result_lines.append(f'</{list_type}>')
-                result_lines.append('<ol>')
-                in_list = True
-                list_type = 'ol'
-            result_lines.append(f'<li>{line[2:]}</li>')
-        # Not a list item
-        else:
-            if in_list:
-                result_lines.append(f'</{list_type}>')
-                in_list = False
-                list_type = None
-            result_lines.append(line)
+    Args:
+        markup: The wiki markup
+        
+    Returns:
+        set: Template names
+    """
+    names = set()
+    for match in _TRANSCLUSION_RE.finditer(markup):
+        name = normalize_template_name(match.group(1))
+        if name and name.lower() not in BUILTIN_TEMPLATES:
+            names.add(name)
+    return names
+
+def extract_short_description(markup: str) -> Tuple[str, Optional[str]]:
+    """
+    Remove the {{Short description|...}} template from markup.
     
-    # Close any open list
-    if in_list:
-        result_lines.append(f'</{list_type}>')
+    Args:
+        markup: The wiki markup
+        
+    Returns:
+        Tuple[str, Optional[str]]: The remaining markup and the short description (if any)
+    """
+    # The first call closed on its own line
+    finder = _Finder(markup)
+    start = markup.find(_SHORT_DESCRIPTION_OPEN)
+    while start != -1:
+        body = start + len(_SHORT_DESCRIPTION_OPEN)
+        close = finder.find('}}', body)
+        if close == -1:
+            break
+        newline = finder.find('\n', body)
+        if newline == -1 or close < newline:
+            call = markup[start:close + 2]
+            return markup.replace(call, ''), markup[body:close].strip()
+        start = markup.find(_SHORT_DESCRIPTION_OPEN, start + 1)
     
-    markup = '\n'.join(result_lines)
+    return markup, None
+
+def tokenize_wiki_markup(markup: str) -> List[tuple]:
+    """
+    Tokenize wiki markup into a list of block nodes, one per source line.
     
-    # Handle templates
-    # Simple templates like {{TemplateName|param1=value1|param2=value2}}
-    markup = re.sub(r'\{\{([^|{}]+)(\|(.*?))?\}\}', process_template, markup)
+    Blocks are tuples of (HEADING, level, leading, content, trailing),
+    (LIST_ITEM, list_tag, block) or (LINE, content), where content is a list
+    of inline nodes: plain strings, (LINK, target, display),
+    (EXTERNAL_LINK, url, display) or (TEMPLATE, name, params).
     
-    # Handle tables
-    markup = re.sub(r'\{\|(.*?)\|\}', process_table, markup, flags=re.DOTALL)
+    Args:
+        markup: The wiki markup, without the short description
+        
+    Returns:
+        List[tuple]: The block nodes
+    """
+    return [_tokenize_line(line) for line in markup.split('\n')]
+
+def render_blocks(blocks: List[tuple], missing_links: Optional[AbstractSet[str]] = None) -> str:
+    """
+    Render block nodes produced by tokenize_wiki_markup into HTML.
     
-    # Handle images
-    # [[File:filename.jpg|options|caption]]
-    markup = re.sub(r'\[\[File:(.*?)(\|(.*?))?\]\]', process_image, markup)
+    Args:
+        blocks: The block nodes
+        missing_links: Optional link targets to render as red links
+        
+    Returns:
+        str: The rendered HTML
+    """
+    return _wrap_paragraphs(_render_references(_render_lines(blocks, missing_links)))
+
+def split_sections(markup: str) -> List[str]:
+    """
+    Split markup into sections, each starting at a heading line.
     
-    # Handle references
-    references = []
+    Lines before the first heading form the lead section. Headings inside an
+    open {| table do not start a section. Joining the sections with newlines
+    gives back the original markup.
     
-    def ref_replacer(match):
-        ref_content = match.group(1)
-        ref_name = None
+    Args:
+        markup: The wiki markup, without the short description
         
-        # Check if this is a named reference
-        name_match = re.search(r'name="([^"]+)"', match.group(0))
-        if name_match:
-            ref_name = name_match.group(1)
+    Returns:
+        List[str]: The section sources
+    """
+    sections = []
+    current: List[str] = []
+    open_tables = 0
+    
+    for line in markup.split('\n'):
+        if current and not open_tables and match_heading(line):
+            sections.append('\n'.join(current))
+            current = []
+        current.append(line)
+        open_tables = max(0, open_tables + line.count('{|') - line.count('|}'))
+    
+    sections.append('\n'.join(current))
+    return sections
+
+def prerender_section(
+    section: str,
+    templates: Optional[Dict[str, list]] = None,
+    missing_links: Optional[AbstractSet[str]] = None
+) -> str:
+    """
+    Render one section up to, but not including, references and paragraphs.
+    
+    This is the expensive part of rendering and depends only on the section
+    source, so results can be cached per section and combined with
+    finish_sections.
+    
+    Args:
+        section: Section markup from split_sections
+        templates: Optional compiled templates to transclude
+        missing_links: Optional link targets to render as red links
         
-        # Generate reference number
-        ref_num = len(references) + 1
-        references.append(f'<li id="ref-{ref_num}">{ref_content}</li>')
+    Returns:
+        str: The rendered lines of the section
+    """
+    if templates:
+        section = transclude_templates(section, templates)
+    return _render_lines(tokenize_wiki_markup(section), missing_links)
+
+def finish_sections(prerendered: List[str]) -> List[str]:
+    """
+    Number references across sections and wrap paragraphs.
+    
+    Sections are separate paragraphs. When every heading is preceded by a
+    blank line, joining the fragments with newlines gives the same HTML as
+    render_blocks on the whole document.
+    
+    Args:
+        prerendered: Output of prerender_section for each section, in order
         
-        return f'<sup class="wiki-reference">[{ref_num}]</sup>'
+    Returns:
+        List[str]: The HTML fragment for each section
+    """
+    references: List[str] = []
+    sections = [_number_references(section, references) for section in prerendered]
     
-    markup = re.sub(r'<ref(?:\s+name="[^"]+")?>(.*?)</ref>', ref_replacer, markup, flags=re.DOTALL)
+    fragments = []
+    listed = False
+    for i, section in enumerate(sections):
+        has_list = '<references />' in section
+        section = _insert_reference_list(section, references, listed)
+        listed = listed or has_list
+        if i < len(sections) - 1 and section.endswith('\n'):
+            # The blank line before the next heading ends this paragraph
+            section = section[:-1]
+        fragments.append(_wrap_paragraphs(section))
+    return fragments
+
+def _render_lines(blocks: List[tuple], missing: Optional[AbstractSet[str]] = None) -> str:
+    output = _BlockOutput()
+    list_type = None
     
-    # Handle reference list
-    if '<references />' in markup:
-        ref_list = '<div class="wiki-references"><h2>References</h2><ol>'
-        ref_list += ''.join(references)
-        ref_list += '</ol></div>'
-        markup = markup.replace('<references />', ref_list)
+    for block in blocks:
+        if block[0] == LIST_ITEM:
+            if block[1] != list_type:
+                if list_type:
+                    output.append(f'</{list_type}>')
+                list_type = block[1]
+                output.append(f'<{list_type}>')
+            output.append(f'<li>{_render_block(block[2], missing)}</li>')
+        else:
+            if list_type:
+                output.append(f'</{list_type}>')
+                list_type = None
+            output.append(_render_block(block, missing))
+    
+    if list_type:
+        output.append(f'</{list_type}>')
     
-    # Handle paragraphs
+    return output.getvalue()
+
+def _wrap_paragraphs(markup: str) -> str:
     paragraphs = markup.split('\n\n')
     for i, para in enumerate(paragraphs):
         if not (para.startswith('<') and para.endswith('>')):
             if para.strip():
                 paragraphs[i] = f'<p>{para}</p>'
     
-    markup = '\n'.join(paragraphs)
+    return '\n'.join(paragraphs)
+
+def iter_internal_links(blocks: List[tuple]):
+    """
+    Yield the target of every internal link in tokenized markup.
     
-    return markup, short_description
+    Args:
+        blocks: Block nodes produced by tokenize_wiki_markup
+        
+    Yields:
+        str: Link targets as written, e.g. "Category:Blockchain"
+    """
+    for block in blocks:
+        if block[0] == LIST_ITEM:
+            block = block[2]
+        content = block[3] if block[0] == HEADING else block[1]
+        yield from _iter_node_links(content)
+
+def _iter_node_links(nodes: List[Any]):
+    for node in nodes:
+        if type(node) is str:
+            continue
+        if node[0] == LINK:
+            yield node[1]
+            yield from _iter_node_links(node[2])
+        elif node[0] == EXTERNAL_LINK:
+            yield from _iter_node_links(node[2])
+        else:
+            yield from _iter_node_links(node[1])
+            if node[2] is not None:
+                yield from _iter_node_links(node[2])
+
+class _Finder:
+    """
+    str.find and regex search over one text, with memoized results.
+    
+    A search from a position inside the stretch covered by an earlier search
+    reuses its result, so retrying unclosed constructs from increasing
+    positions scans each stretch of text once.
+    """
+    __slots__ = ('text', '_results')
+    
+    def __init__(self, text: str):
+        self.text = text
+        # needle or pattern -> (searched from, position found or -1)
+        self._results: Dict[Any, Tuple[int, int]] = {}
+    
+    def find(self, needle: str, start: int) -> int:
+        result = self._results.get(needle)
+        if result is not None and result[0] <= start and (result[1] == -1 or result[1] >= start):
+            return result[1]
+        found = self.text.find(needle, start)
+        self._results[needle] = (start, found)
+        return found
+    
+    def search(self, pattern: 're.Pattern', start: int) -> int:
+        result = self._results.get(pattern)
+        if result is not None and result[0] <= start and (result[1] == -1 or result[1] >= start):
+            return result[1]
+        match = pattern.search(self.text, start)
+        found = match.start() if match else -1
+        self._results[pattern] = (start, found)
+        return found
+
+class _BlockOutput:
+    """
+    Collects rendered lines and folds {| ... |} spans into HTML tables.
+    
+    Tables are recognised on rendered lines, so links and templates inside
+    cells are already expanded when the cell grammar runs.
+    """
+    def __init__(self):
+        self.lines: List[str] = []
+        self.table: Optional[List[str]] = None
+        self.table_lines: List[str] = []
+    
+    def append(self, line: str) -> None:
+        # Rendered tables are collected in parts rather than spliced into the
+        # line, so a line holding many tables is not copied once per table
+        parts = []
+        if self.table is not None:
+            close = line.find('|}')
+            if close == -1:
+                self.table.append(line)
+                self.table_lines.append(line)
+                return
+            self.table.append(line[:close])
+            parts.append(self.table[0] + render_table('\n'.join(self.table[1:])))
+            line = line[close + 2:]
+            self.table = None
+            self.table_lines = []
+        
+        pos = 0
+        start = line.find('{|')
+        while start != -1:
+            close = line.find('|}', start + 2)
+            if close == -1:
+                head = ''.join(parts) + line[pos:start]
+                self.table = [head, line[start + 2:]]
+                self.table_lines = [head + line[start:]]
+                return
+            parts.append(line[pos:start])
+            parts.append(render_table(line[start + 2:close]))
+            pos = close + 2
+            start = line.find('{|', pos)
+        
+        if parts:
+            parts.append(line[pos:])
+            line = ''.join(parts)
+        self.lines.append(line)
+    
+    def getvalue(self) -> str:
+        if self.table is not None:
+            # Unterminated table: keep the lines as they were
+            self.lines.extend(self.table_lines)
+            self.table = None
+        return '\n'.join(self.lines)
+
+def _tokenize_line(line: str) -> tuple:
+    if "''" in line:
+        line = _replace_quote_pairs(line, "'''", '<strong>', '</strong>')
+        line = _replace_quote_pairs(line, "''", '<em>', '</em>')
+    
+    if line.startswith('* '):
+        return (LIST_ITEM, 'ul', _tokenize_line_body(line[2:]))
+    if line.startswith('# '):
+        return (LIST_ITEM, 'ol', _tokenize_line_body(line[2:]))
+    return _tokenize_line_body(line)
+
+def _tokenize_line_body(line: str) -> tuple:
+    heading = match_heading(line)
+    if heading:
+        level, leading, content, trailing = heading
+        return (HEADING, level, leading, _tokenize_inline(content), trailing)
+    return (LINE, _tokenize_inline(line))
+
+def match_heading(line: str) -> Optional[Tuple[int, str, str, str]]:
+    """
+    Match a heading line such as "== History ==".
+    
+    Args:
+        line: A single line of markup
+        
+    Returns:
+        Optional[Tuple[int, str, str, str]]: The level, leading whitespace,
+        stripped heading text and trailing whitespace, or None
+    """
+    stripped = line.strip()
+    if not stripped.startswith('='):
+        return None
+    
+    leading = line[:len(line) - len(line.lstrip())]
+    trailing = line[len(line.rstrip()):]
+    opening = len(stripped) - len(stripped.lstrip('='))
+    
+    if opening == len(stripped):
+        # A bare run of "=" pairs up into an empty heading
+        if opening % 2 or opening > 12:
+            return None
+        return opening // 2, leading, '', trailing
+    
+    closing = len(stripped) - len(stripped.rstrip('='))
+    if opening != closing or opening > 6:
+        return None
+    
+    content = stripped[opening:-closing]
+    if '=' in content:
+        return None
+    return opening, leading, content.strip(), trailing
+
+def _replace_quote_pairs(line: str, marker: str, open_tag: str, close_tag: str) -> str:
+    parts = []
+    pos = 0
+    width = len(marker)
+    start = line.find(marker)
+    
+    while start != -1:
+        end = line.find(marker, start + width)
+        if end == -1:
+            break
+        parts.append(line[pos:start])
+        parts.append(open_tag)
+        parts.append(line[start + width:end])
+        parts.append(close_tag)
+        pos = end + width
+        start = line.find(marker, pos)
+    
+    if not parts:
+        return line
+    parts.append(line[pos:])
+    return ''.join(parts)
+
+def _tokenize_inline(text: str) -> List[Any]:
+    if '[' not in text and '{{' not in text:
+        return [text]
+    
+    nodes = []
+    pos = 0
+    scan = 0
+    finder = _Finder(text)
+    
+    while True:
+        match = _INLINE_TOKEN_RE.search(text, scan)
+        if match is None:
+            break
+        
+        start = match.start()
+        token = match.group(0)
+        if token == '[[':
+            node, end = _tokenize_internal_link(text, start, finder)
+        elif token == '[':
+            node, end = _tokenize_external_link(text, start, finder)
+        else:
+            node, end = _tokenize_template(text, start, finder)
+        
+        if node is None:
+            scan = start + 1
+            continue
+        
+        if start > pos:
+            nodes.append(text[pos:start])
+        nodes.append(node)
+        pos = scan = end
+    
+    if pos < len(text):
+        nodes.append(text[pos:])
+    return nodes
+
+def _internal_link_close(text: str, start: int, finder: _Finder) -> int:
+    close = finder.find(']', start + 2)
+    if close > start + 2 and text.startswith(']]', close):
+        return close
+    return -1
+
+def _tokenize_internal_link(text: str, start: int, finder: _Finder) -> Tuple[Optional[tuple], int]:
+    close = _internal_link_close(text, start, finder)
+    if close == -1:
+        return None, start
+    
+    link_text = text[start + 2:close]
+    if "|" in link_text:
+        target, display = link_text.split("|", 1)
+    else:
+        target = display = link_text
+    return (LINK, target, _tokenize_inline(display)), close + 2
+
+def _tokenize_external_link(text: str, start: int, finder: _Finder) -> Tuple[Optional[tuple], int]:
+    # The URL runs to the first whitespace or "]"
+    scheme_end = text.index('//', start) + 2
+    pos = finder.search(_URL_END_RE, scheme_end)
+    if pos == -1:
+        pos = len(text)
+    if pos == scheme_end or pos >= len(text):
+        return None, start
+    if text[pos] == ']':
+        url = text[start + 1:pos]
+        return (EXTERNAL_LINK, url, [url]), pos + 1
+    
+    # [http://example.com Display text]: the display runs to the first "]"
+    # that does not close an internal link
+    display_start = pos
+    while display_start < len(text) and text[display_start].isspace():
+        display_start += 1
+    
+    search = display_start
+    while True:
+        close = finder.find(']', search)
+        if close == -1:
+            return None, start
+        link_start = text.find('[[', search, close)
+        if link_start == -1:
+            break
+        link_close = _internal_link_close(text, link_start, finder)
+        if link_close == -1:
+            break
+        search = link_close + 2
+    
+    # Sliced only once the link is known to close
+    url = text[start + 1:pos]
+    return (EXTERNAL_LINK, url, _tokenize_inline(text[display_start:close])), close + 1
+
+def _tokenize_template(text: str, start: int, finder: _Finder) -> Tuple[Optional[tuple], int]:
+    name_match = _TEMPLATE_NAME_RE.match(text, start + 2)
+    if name_match is None:
+        return None, start
+    
+    name = _tokenize_inline(name_match.group(0))
+    pos = name_match.end()
+    
+    if text.startswith('}}', pos):
+        return (TEMPLATE, name, None), pos + 2
+    if text.startswith('|', pos):
+        close = finder.find('}}', pos + 1)
+        if close != -1:
+            return (TEMPLATE, name, _tokenize_inline(text[pos + 1:close])), close + 2
+    return None, start
+
+def _render_block(block: tuple, missing: Optional[AbstractSet[str]] = None) -> str:
+    if block[0] == HEADING:
+        level = block[1]
+        content = _render_inline(block[3], missing)
+        return f'{block[2]}<h{level} class="wiki-heading-{level}">{content}</h{level}>{block[4]}'
+    return _render_inline(block[1], missing)
+
+def _render_inline(nodes: List[Any], missing: Optional[AbstractSet[str]] = None) -> str:
+    if len(nodes) == 1 and type(nodes[0]) is str:
+        return nodes[0]
+    
+    parts = []
+    for node in nodes:
+        if type(node) is str:
+            parts.append(node)
+        elif node[0] == LINK:
+            display = _render_inline(node[2], missing)
+            parts.append(_render_internal_link(node[1], display, bool(missing) and node[1] in missing))
+        elif node[0] == EXTERNAL_LINK:
+            parts.append(f'<a href="{node[1]}" target="_blank" rel="noopener">{_render_inline(node[2], missing)}</a>')
+        else:
+            params = _render_inline(node[2], missing) if node[2] is not None else ""
+            parts.append(render_template(_render_inline(node[1], missing), params))
+    return ''.join(parts)
+
+def _render_internal_link(target: str, display: str, missing: bool = False) -> str:
+    # Parse namespace from target
+    namespace, title = parse_title_with_namespace(target)
+    
+    # Generate appropriate URL based on namespace
+    if namespace == "Category":
+        url = f"/categories/{title.replace(' ', '_')}"
+    elif namespace == "File":
+        url = f"/media/{title}"
+    elif namespace == "Template":
+        url = f"/templates/{title.replace(' ', '_')}"
+    elif namespace == "Help":
+        url = f"/help/{title.replace(' ', '_')}"
+    elif namespace == "User":
+        url = f"/users/{title.replace(' ', '_')}"
+    elif namespace == "Kryptopedia":
+        url = f"/project/{title.replace(' ', '_')}"
+    else:
+        # Main namespace - regular article
+        url = f"/articles/{target.replace(' ', '_')}"
+    
+    if missing:
+        tooltip = target.replace('"', '&quot;')
+        return f'<a href="{url}" class="wiki-redlink" title="{tooltip} (page does not exist)">{display}</a>'
+    return f'<a href="{url}">{display}</a>'
+
+def _render_references(markup: str) -> str:
+    if '<ref' not in markup:
+        return markup
+    
+    references: List[str] = []
+    markup = _number_references(markup, references)
+    return _insert_reference_list(markup, references)
+
+def _number_references(markup: str, references: List[str]) -> str:
+    if '<ref' not in markup:
+        return markup
+    
+    parts = []
+    pos = 0
+    start = markup.find('<ref')
+    while start != -1:
+        opening = _REFERENCE_OPEN_RE.match(markup, start)
+        if opening is None:
+            start = markup.find('<ref', start + 1)
+            continue
+        close = markup.find('</ref>', opening.end())
+        if close == -1:
+            # No later reference can be closed either
+            break
+        
+        # Generate reference number
+        ref_num = len(references) + 1
+        references.append(f'<li id="ref-{ref_num}">{markup[opening.end():close]}</li>')
+        parts.append(markup[pos:start])
+        parts.append(f'<sup class="wiki-reference">[{ref_num}]</sup>')
+        pos = close + len('</ref>')
+        start = markup.find('<ref', pos)
+    
+    if not parts:
+        return markup
+    parts.append(markup[pos:])
+    return ''.join(parts)
+
+def _insert_reference_list(markup: str, references: List[str], listed: bool = False) -> str:
+    # The list is rendered at the first <references /> only; repeating it
+    # would duplicate the ref-N ids and grow the output quadratically
+    if '<references />' in markup:
+        if listed:
+            return markup.replace('<references />', '')
+        ref_list = '<div class="wiki-references"><h2>References</h2><ol>'
+        ref_list += ''.join(references)
+        ref_list += '</ol></div>'
+        head, tail = markup.split('<references />', 1)
+        markup = head + ref_list + tail.replace('<references />', '')
+    
+    return markup
 
 def process_template(match) -> str:
     """Process a template match and return HTML."""
-    template_name = match.group(1).strip()
-    params_str = match.group(3) if match.group(2) else ""
-    
-    # Parse parameters
-    params = {}
-    if params_str:
-        param_pairs = params_str.split('|')
-        for pair in param_pairs:
-            if '=' in pair:
-                key, value = pair.split('=', 1)
-                params[key.strip()] = value.strip()
-            elif pair.strip():
-                # Positional parameter
-                pos = len(params)
-                params[str(pos + 1)] = pair.strip()
+    return render_template(match.group(1), match.group(3) if match.group(2) else "")
+
+def render_template(template_name: str, params_str: str) -> str:
+    """Render a template call from its name and raw parameter string."""
+    template_name = template_name.strip()
+    params = parse_template_params(params_str)
     
     # Handle special templates
     if template_name.lower() == 'infobox':
@@ -201,6 +808,29 @@ def process_template(match) -> str:
         params_html = ''.join([f'<div><strong>{k}:</strong> {v}</div>' for k, v in params.items()])
         return f'<div class="wiki-template"><strong>{template_name}</strong>{params_html}</div>'
 
+def parse_template_params(params_str: str) -> Dict[str, str]:
+    """
+    Parse the "|"-separated parameters of a template call.
+    
+    Args:
+        params_str: Everything after the first "|" of the call
+        
+    Returns:
+        Dict[str, str]: Named parameters, with positional ones keyed "1", "2", ...
+    """
+    params = {}
+    if params_str:
+        param_pairs = params_str.split('|')
+        for pair in param_pairs:
+            if '=' in pair:
+                key, value = pair.split('=', 1)
+                params[key.strip()] = value.strip()
+            elif pair.strip():
+                # Positional parameter
+                pos = len(params)
+                params[str(pos + 1)] = pair.strip()
+    return params
+
 def process_infobox_template(params: Dict[str, str]) -> str:
     """Process an infobox template and return HTML."""
     html = '<table class="wiki-infobox">'
@@ -286,8 +916,10 @@ def process_citation_template(params: Dict[str, str]) -> str:
 
 def process_table(match) -> str:
     """Process a table match and return HTML."""
-    table_content = match.group(1)
-    
+    return render_table(match.group(1))
+
+def render_table(table_content: str) -> str:
+    """Render the content between {| and |} as an HTML table."""
     # Parse table attributes
     table_attrs = {}
     first_line = table_content.strip().split('\n')[0]
@@ -322,7 +954,7 @@ def process_table(match) -> str:
         html += '<tr>'
         
         # Process header cells (!), then regular cells (|)
-        header_cells = re.findall(r'!(.*?)(?=\||$)', row)
+        header_cells = _table_header_cells(row)
         regular_cells = re.findall(r'\|([^!]*?)(?=\||!|$)', row)
         
         # Add header cells
@@ -342,6 +974,31 @@ def process_table(match) -> str:
     html += '</table>'
     return html
 
+def _table_header_cells(row: str) -> List[str]:
+    # Same cells as re.findall(r'!(.*?)(?=\||$)', row) without rescanning the
+    # rest of the row for every "!": a cell runs to the next "|" or the end
+    # of the row, and fails if a line break comes first
+    cells = []
+    row_end = len(row) - 1 if row.endswith('\n') else len(row)
+    bar = newline = -1
+    start = row.find('!')
+    while start != -1:
+        if bar != len(row) and bar <= start:
+            bar = row.find('|', start + 1)
+            if bar == -1:
+                bar = len(row)
+        if newline != len(row) and newline <= start:
+            newline = row.find('\n', start + 1)
+            if newline == -1:
+                newline = len(row)
+        end = min(bar, row_end)
+        if newline < end:
+            start = row.find('!', start + 1)
+            continue
+        cells.append(row[start + 1:end])
+        start = row.find('!', end)
+    return cells
+
 def process_image(match) -> str:
     """Process an image match and return HTML."""
     filename = match.group(1)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# File: warm_cache.py
+"""
+Cache warm-up script.
+Run this from the project root directory after a deploy, or after clearing
+the cache, to fill Redis before traffic arrives. Workers also warm the cache
+at startup (see CACHE_WARMUP_ENABLED); this is useful when Redis is shared
+and the workers are already running.
+
+Usage:
+    python warm_cache.py [--articles 100] [--concurrency 8]
+"""
+import asyncio
+import argparse
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+import config
+from dependencies.cache import cache_service
+from dependencies.database import db_service
+from services.warmup import warm_cache
+
+async def run_warmup(args) -> None:
+    """Warm the configured cache and print what was done."""
+    await db_service.connect()
+    try:
+        print(f"🔥 Warming the cache ({'Redis' if config.USE_REDIS else 'in-memory'})...")
+        stats = await warm_cache(
+            db_service.db,
+            cache_service,
+            article_limit=args.articles,
+            concurrency=args.concurrency
+        )
+        print(
+            f"✅ {stats['articles']} articles cached ({stats['articles_already_cached']} already were), "
+            f"{stats['pages']} pages, {stats['failures']} failures in {stats['seconds']}s"
+        )
+    finally:
+        await cache_service.close()
+        await db_service.close()
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Fill the cache with the most-read pages")
+    parser.add_argument("--articles", type=int, default=config.CACHE_WARMUP_ARTICLES, help="Most-viewed articles to cache")
+    parser.add_argument("--concurrency", type=int, default=config.CACHE_WARMUP_CONCURRENCY, help="Warm-up steps run at once")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(run_warmup(parse_arguments()))